@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from pathlib import Path
 import os
@@ -7,6 +7,7 @@ import os
 from models.database import get_db
 from services.file_service import FileService
 from services.video_service import VideoService
+from services.range_streaming import RangeFileResponse
 from config import settings
 
 router = APIRouter()
@@ -29,56 +30,8 @@ async def stream_video(
         if not file_path or not file_path.exists():
             raise HTTPException(status_code=404, detail="Video file not found")
         
-        # Get file size
-        file_size = file_path.stat().st_size
-        
-        # Handle range requests
-        range_header = request.headers.get('range')
-        if range_header:
-            try:
-                range_start, range_end = range_header.replace('bytes=', '').split('-')
-                range_start = int(range_start)
-                range_end = int(range_end) if range_end else file_size - 1
-                
-                if range_start >= file_size:
-                    raise HTTPException(status_code=416, detail="Range not satisfiable")
-                
-                content_length = range_end - range_start + 1
-                
-                def read_file_chunk():
-                    with open(file_path, 'rb') as f:
-                        f.seek(range_start)
-                        remaining = content_length
-                        while remaining > 0:
-                            chunk_size = min(8192, remaining)
-                            chunk = f.read(chunk_size)
-                            if not chunk:
-                                break
-                            yield chunk
-                            remaining -= len(chunk)
-                
-                headers = {
-                    'Content-Range': f'bytes {range_start}-{range_end}/{file_size}',
-                    'Accept-Ranges': 'bytes',
-                    'Content-Length': str(content_length),
-                    'Content-Type': 'video/mp4'
-                }
-                
-                return StreamingResponse(
-                    read_file_chunk(),
-                    headers=headers,
-                    status_code=206
-                )
-                
-            except ValueError:
-                pass
-        
-        # Full file response
-        return FileResponse(
-            path=file_path,
-            media_type='video/mp4',
-            headers={'Accept-Ranges': 'bytes'}
-        )
+        # Single and multi-range requests, If-Range / ETag validation
+        return RangeFileResponse(file_path, request.headers, media_type='video/mp4')
         
     except HTTPException:
         raise
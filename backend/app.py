@@ -1,6 +1,6 @@
 from fastapi import FastAPI, BackgroundTasks, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
@@ -14,8 +14,6 @@ import json
 import sqlite3
 import asyncio
 import tempfile
-import base64
-from io import BytesIO
 
 # ------------------------------------------------------------
 # Optional AI/ML & Media libraries
@@ -70,10 +68,59 @@ except ImportError:  # pragma: no cover
     print("[startup] Warning: 'ffmpeg-python' package not available – video processing disabled.")
 
 try:
-    import httpx  # type: ignore
+    from services.frame_batch import FrameBatch  # type: ignore
 except ImportError:  # pragma: no cover
-    httpx = None  # type: ignore
-    print("[startup] Warning: 'httpx' package not available – outgoing HTTP calls disabled.")
+    FrameBatch = None  # type: ignore
+    print("[startup] Warning: frame batches not available – frame extraction disabled.")
+
+try:
+    # Worker side of frame extraction, kept out of this module so media workers never import the app
+    from services.frame_extraction import extract_video_frames_sync  # type: ignore
+except ImportError:  # pragma: no cover
+    extract_video_frames_sync = None  # type: ignore
+    print("[startup] Warning: frame extraction not available – video analysis disabled.")
+
+try:
+    from services.frame_cache import frame_cache  # type: ignore
+except ImportError:  # pragma: no cover
+    frame_cache = None  # type: ignore
+    print("[startup] Warning: frame cache not available – frames will be decoded on every analysis.")
+
+try:
+    from services.keyframe_index import KeyframeIndex, build_keyframe_index, get_keyframe_index  # type: ignore
+except ImportError:  # pragma: no cover
+    KeyframeIndex = build_keyframe_index = get_keyframe_index = None  # type: ignore
+    print("[startup] Warning: keyframe index not available – seeks will not be keyframe-aligned.")
+
+try:
+    from services.analysis_proxy import analysis_source, build_analysis_proxy, proxy_path  # type: ignore
+except ImportError:  # pragma: no cover
+    analysis_source = build_analysis_proxy = proxy_path = None  # type: ignore
+    print("[startup] Warning: analysis proxy not available – analysis will decode original videos.")
+
+try:
+    from services.response_cache import response_cache  # type: ignore
+except ImportError:  # pragma: no cover
+    response_cache = None  # type: ignore
+    print("[startup] Warning: AI response cache not available – every analysis calls the provider.")
+
+try:
+    from services.lmstudio_client import lmstudio_client  # type: ignore
+except ImportError:  # pragma: no cover
+    lmstudio_client = None  # type: ignore
+    print("[startup] Warning: LM Studio client not available – local analysis disabled.")
+
+# Shared pools for blocking decode / ffmpeg work (standard library only)
+from services.media_executor import media_executor
+
+# Per-provider concurrency and rate limits for AI calls (standard library only)
+from services.provider_governor import estimate_tokens, provider_governor
+
+# Resumable, streamed uploads (standard library only)
+from services.chunked_upload import ChunkedUploadStore, UploadError
+
+# Byte-range video playback (sendfile when the server supports it)
+from services.range_streaming import RangeFileResponse
 
 # Initialize FastAPI app
 app = FastAPI(title="OpenClip Pro API", version="1.0.0")
@@ -96,6 +143,10 @@ THUMBNAILS_DIR = UPLOAD_DIR / "thumbnails"
 for directory in [UPLOAD_DIR, VIDEOS_DIR, THUMBNAILS_DIR]:
     directory.mkdir(exist_ok=True)
 
+# In-progress uploads live outside the static /uploads mount, on the same
+# disk as the videos so finalizing is a rename
+upload_store = ChunkedUploadStore(BASE_DIR / "upload_sessions")
+
 # Database setup
 DATABASE_PATH = BASE_DIR / "app.db"
 
@@ -167,6 +218,30 @@ def init_database():
     )
     ''')
     
+    # Add keyframe_index column if it doesn't exist (migration)
+    try:
+        cursor.execute('ALTER TABLE video_files ADD COLUMN keyframe_index TEXT')
+        print("Added keyframe_index column to video_files table")
+    except sqlite3.OperationalError:
+        # Column already exists
+        pass
+    
+    # Add analysis_proxy column if it doesn't exist (migration)
+    try:
+        cursor.execute('ALTER TABLE video_files ADD COLUMN analysis_proxy TEXT')
+        print("Added analysis_proxy column to video_files table")
+    except sqlite3.OperationalError:
+        # Column already exists
+        pass
+    
+    # Add content_hash column if it doesn't exist (migration)
+    try:
+        cursor.execute('ALTER TABLE video_files ADD COLUMN content_hash TEXT')
+        print("Added content_hash column to video_files table")
+    except sqlite3.OperationalError:
+        # Column already exists
+        pass
+    
     conn.commit()
     conn.close()
 
@@ -221,6 +296,32 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/api/media-executor/stats")
+async def get_media_executor_stats():
+    """Queue depth and throughput of the media worker pools"""
+    return media_executor.stats()
+
+@app.get("/api/ai-cache/stats")
+async def get_ai_cache_stats():
+    """Occupancy and hit rate of the AI response cache"""
+    if not response_cache:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+@app.get("/api/ai-providers/stats")
+async def get_ai_provider_stats():
+    """Limits and queue state of the AI provider governor"""
+    return provider_governor.stats()
+
+@app.on_event("shutdown")
+async def shutdown_media_executor():
+    media_executor.shutdown(wait=False)
+
+@app.on_event("shutdown")
+async def shutdown_lmstudio_client():
+    if lmstudio_client:
+        await lmstudio_client.aclose()
+
 # Projects endpoints
 @app.get("/api/projects")
 async def get_projects():
@@ -403,6 +504,16 @@ async def delete_project(project_id: str):
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
+            if KeyframeIndex and os.path.exists(KeyframeIndex.sidecar_path(file_path)):
+                os.remove(KeyframeIndex.sidecar_path(file_path))
+            if frame_cache and os.path.exists(frame_cache.digest_path(file_path)):
+                os.remove(frame_cache.digest_path(file_path))
+            if proxy_path and os.path.exists(proxy_path(file_path)):
+                os.remove(proxy_path(file_path))
+                if KeyframeIndex and os.path.exists(KeyframeIndex.sidecar_path(proxy_path(file_path))):
+                    os.remove(KeyframeIndex.sidecar_path(proxy_path(file_path)))
+                if frame_cache and os.path.exists(frame_cache.digest_path(proxy_path(file_path))):
+                    os.remove(frame_cache.digest_path(proxy_path(file_path)))
         except:
             pass  # File might not exist
     
@@ -416,119 +527,219 @@ async def delete_project(project_id: str):
     return {"success": True, "message": "Project deleted successfully"}
 
 # Video upload endpoints
-@app.post("/api/projects/{project_id}/upload")
-async def upload_video(project_id: str, file: UploadFile = File(...)):
-    """Upload a video file for a project"""
-    
-    # Check if project exists
+def _upload_http_error(error: "UploadError") -> HTTPException:
+    """HTTP error for a rejected upload request; carries the confirmed offset to resume from"""
+    headers = {"Upload-Offset": str(error.offset)} if error.offset is not None else None
+    return HTTPException(status_code=error.status_code, detail=error.detail, headers=headers)
+
+def _project_exists(project_id: str) -> bool:
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT id FROM projects WHERE id = ?", (project_id,))
-    if not cursor.fetchone():
-        conn.close()
-        raise HTTPException(status_code=404, detail="Project not found")
+    exists = cursor.fetchone() is not None
+    conn.close()
+    return exists
+
+async def register_uploaded_video(project_id: str, file_id: str, filename: str, file_path: Path,
+                                  file_size: int, content_hash: str,
+                                  background_tasks: BackgroundTasks) -> Dict[str, Any]:
+    """Record a video that is already on disk and run the post-upload steps"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    # Save to database
+    cursor.execute('''
+    INSERT INTO video_files (id, project_id, filename, file_path, file_size, content_hash) 
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', (file_id, project_id, filename, str(file_path), file_size, content_hash))
+    
+    # Update project with video data
+    video_data = {
+        "file_id": file_id,
+        "file_path": str(file_path),
+        "filename": filename,
+        "size": file_size,
+        "sha256": content_hash,
+        "upload_time": datetime.now().isoformat(),
+        "processing_status": "uploaded"
+    }
+    
+    cursor.execute('''
+    UPDATE projects SET 
+    video_data = ?, 
+    file_size = ?, 
+    status = 'uploaded', 
+    updated_at = ? 
+    WHERE id = ?
+    ''', (json.dumps(video_data), file_size, datetime.now().isoformat(), project_id))
+    
+    conn.commit()
+    conn.close()
+    
+    # The upload's content hash doubles as the source's frame cache key
+    if frame_cache:
+        frame_cache.remember_digest(str(file_path), content_hash)
+    
+    # Index keyframes once so later seeks can land on them
+    await index_video_keyframes(file_id, str(file_path))
     
+    # Low-resolution proxy for analysis, created after the response is sent
+    background_tasks.add_task(create_analysis_proxy, file_id, str(file_path))
+    
+    # Generate thumbnail automatically after upload
+    thumbnail_url = None
     try:
-        # Validate file type
-        if not file.content_type or not file.content_type.startswith('video/'):
-            raise HTTPException(status_code=400, detail="File must be a video")
-        
-        # Read file content
-        content = await file.read()
-        file_size = len(content)
-        
-        # Check file size (500MB limit)
-        max_size = 500 * 1024 * 1024
-        if file_size > max_size:
-            raise HTTPException(status_code=413, detail=f"File too large. Maximum size is {max_size // (1024**2)}MB")
-        
-        # Generate unique filename
-        file_id = str(uuid.uuid4())
-        file_extension = Path(file.filename).suffix.lower()
-        filename = f"{file_id}_{file.filename}"
-        file_path = VIDEOS_DIR / filename
-        
-        # Save file
-        with open(file_path, 'wb') as f:
-            f.write(content)
-        
-        # Save to database
-        cursor.execute('''
-        INSERT INTO video_files (id, project_id, filename, file_path, file_size) 
-        VALUES (?, ?, ?, ?, ?)
-        ''', (file_id, project_id, file.filename, str(file_path), file_size))
-        
-        # Update project with video data
-        video_data = {
-            "file_id": file_id,
-            "file_path": str(file_path),
-            "filename": file.filename,
-            "size": file_size,
-            "upload_time": datetime.now().isoformat(),
-            "processing_status": "uploaded"
-        }
-        
-        cursor.execute('''
-        UPDATE projects SET 
-        video_data = ?, 
-        file_size = ?, 
-        status = 'uploaded', 
-        updated_at = ? 
-        WHERE id = ?
-        ''', (json.dumps(video_data), file_size, datetime.now().isoformat(), project_id))
-        
-        conn.commit()
-        conn.close()
-        
-        # Generate thumbnail automatically after upload
-        thumbnail_url = None
-        try:
-            thumbnail_result = await create_video_thumbnail(file_id)
-            if thumbnail_result.get("success"):
-                thumbnail_url = f"/api/videos/{file_id}/thumbnail"
+        thumbnail_result = await create_video_thumbnail(file_id)
+        if thumbnail_result.get("success"):
+            thumbnail_url = f"/api/videos/{file_id}/thumbnail"
+            
+            # Update the project with thumbnail URL
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            # Get current video_data and add thumbnail_url
+            cursor.execute("SELECT video_data FROM projects WHERE id = ?", (project_id,))
+            current_data = cursor.fetchone()
+            if current_data and current_data[0]:
+                updated_video_data = json.loads(current_data[0])
+                updated_video_data["thumbnail_url"] = thumbnail_url
                 
-                # Update the project with thumbnail URL
-                conn = get_db_connection()
-                cursor = conn.cursor()
+                # Update project with thumbnail URL
+                cursor.execute('''
+                UPDATE projects SET 
+                video_data = ?,
+                thumbnail_url = ?,
+                updated_at = ? 
+                WHERE id = ?
+                ''', (json.dumps(updated_video_data), thumbnail_url, datetime.now().isoformat(), project_id))
                 
-                # Get current video_data and add thumbnail_url
-                cursor.execute("SELECT video_data FROM projects WHERE id = ?", (project_id,))
-                current_data = cursor.fetchone()
-                if current_data and current_data[0]:
-                    updated_video_data = json.loads(current_data[0])
-                    updated_video_data["thumbnail_url"] = thumbnail_url
-                    
-                    # Update project with thumbnail URL
-                    cursor.execute('''
-                    UPDATE projects SET 
-                    video_data = ?,
-                    thumbnail_url = ?,
-                    updated_at = ? 
-                    WHERE id = ?
-                    ''', (json.dumps(updated_video_data), thumbnail_url, datetime.now().isoformat(), project_id))
-                    
-                    conn.commit()
-                conn.close()
-        except Exception as e:
-            print(f"Warning: Could not generate thumbnail: {e}")
-        
-        return {
-            "success": True,
-            "file_id": file_id,
-            "filename": file.filename,
-            "size": file_size,
-            "message": "Video uploaded successfully",
-            "project": await get_project(project_id),
-            "thumbnail_url": f"http://localhost:8001/api/videos/{file_id}/thumbnail" if thumbnail_url else None
-        }
-        
-    except HTTPException:
-        conn.close()
-        raise
+                conn.commit()
+            conn.close()
+    except Exception as e:
+        print(f"Warning: Could not generate thumbnail: {e}")
+    
+    return {
+        "success": True,
+        "file_id": file_id,
+        "filename": filename,
+        "size": file_size,
+        "sha256": content_hash,
+        "message": "Video uploaded successfully",
+        "project": await get_project(project_id),
+        "thumbnail_url": f"http://localhost:8001/api/videos/{file_id}/thumbnail" if thumbnail_url else None
+    }
+
+@app.post("/api/projects/{project_id}/upload")
+async def upload_video(project_id: str, background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    """Upload a video file for a project in one request (streamed to disk in fixed-size blocks)"""
+    
+    # Check if project exists
+    if not _project_exists(project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # Validate file type
+    if not file.content_type or not file.content_type.startswith('video/'):
+        raise HTTPException(status_code=400, detail="File must be a video")
+    
+    # Size of the spooled upload, without reading it into memory
+    file_size = file.size
+    if file_size is None:
+        file_size = await media_executor.run_io(file.file.seek, 0, os.SEEK_END)
+        await file.seek(0)
+    
+    async def blocks():
+        while True:
+            block = await file.read(upload_store.buffer_bytes)
+            if not block:
+                break
+            yield block
+    
+    try:
+        session = upload_store.create(project_id, file.filename, file_size)
+        try:
+            await upload_store.append(session.upload_id, 0, blocks())
+        except BaseException:
+            upload_store.abort(session.upload_id)
+            raise
+    except UploadError as e:
+        raise _upload_http_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    
+    return await _complete_upload(session.upload_id, None, background_tasks)
+
+# Chunked, resumable uploads: init -> PUT chunks at the confirmed offset -> finalize
+class ChunkedUploadInit(BaseModel):
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+
+class ChunkedUploadFinalize(BaseModel):
+    sha256: Optional[str] = None
+
+@app.post("/api/projects/{project_id}/uploads")
+async def init_chunked_upload(project_id: str, request: ChunkedUploadInit):
+    """Start a resumable upload of ``size`` bytes"""
+    if not _project_exists(project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    if request.content_type and not request.content_type.startswith('video/'):
+        raise HTTPException(status_code=400, detail="File must be a video")
+    
+    try:
+        session = upload_store.create(project_id, request.filename, request.size)
+    except UploadError as e:
+        raise _upload_http_error(e)
+    return {**session.status(), "chunk_size": upload_store.buffer_bytes * 8}
+
+@app.get("/api/uploads/{upload_id}")
+async def get_chunked_upload(upload_id: str):
+    """Confirmed offset of an upload, for resuming after an interruption"""
+    try:
+        return upload_store.get(upload_id).status()
+    except UploadError as e:
+        raise _upload_http_error(e)
+
+@app.put("/api/uploads/{upload_id}")
+async def append_upload_chunk(upload_id: str, offset: int, request: Request):
+    """Append the request body at ``offset``, which must be the confirmed offset"""
+    try:
+        session = await upload_store.append(upload_id, offset, request.stream())
+    except UploadError as e:
+        raise _upload_http_error(e)
+    return session.status()
+
+@app.post("/api/uploads/{upload_id}/finalize")
+async def finalize_chunked_upload(upload_id: str, background_tasks: BackgroundTasks,
+                                  request: Optional[ChunkedUploadFinalize] = None):
+    """Verify a completed upload (size, optional SHA-256) and add it to its project"""
+    return await _complete_upload(upload_id, request.sha256 if request else None, background_tasks)
+
+@app.delete("/api/uploads/{upload_id}")
+async def abort_chunked_upload(upload_id: str):
+    """Discard an unfinished upload"""
+    try:
+        upload_store.abort(upload_id)
+    except UploadError as e:
+        raise _upload_http_error(e)
+    return {"success": True}
+
+async def _complete_upload(upload_id: str, sha256: Optional[str], background_tasks: BackgroundTasks) -> Dict[str, Any]:
+    try:
+        session = upload_store.get(upload_id)
+        file_id = session.upload_id
+        project_id = session.meta['project_id']
+        file_path = VIDEOS_DIR / f"{file_id}_{session.meta['filename']}"
+        stored = await upload_store.finalize(upload_id, file_path, sha256)
+    except UploadError as e:
+        raise _upload_http_error(e)
+    
+    try:
+        return await register_uploaded_video(
+            project_id, file_id, stored['filename'], file_path, stored['size'], stored['sha256'], background_tasks
+        )
     except Exception as e:
-        conn.close()
         # Clean up file if it was created
-        if 'file_path' in locals() and os.path.exists(file_path):
+        if os.path.exists(file_path):
             os.remove(file_path)
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
@@ -589,40 +800,8 @@ async def stream_video_file(file_id: str, request: Request):
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Video file not found on disk")
     
-    # Handle range requests for video streaming
-    range_header = request.headers.get('Range')
-    file_size = os.path.getsize(file_path)
-    
-    if range_header:
-        # Parse range header
-        range_match = range_header.replace('bytes=', '').split('-')
-        start = int(range_match[0]) if range_match[0] else 0
-        end = int(range_match[1]) if range_match[1] else file_size - 1
-    else:
-        start = 0
-        end = file_size - 1
-    
-    # Read file chunk
-    def read_file_chunk():
-        with open(file_path, 'rb') as video_file:
-            video_file.seek(start)
-            data = video_file.read(end - start + 1)
-            yield data
-    
-    headers = {
-        'Content-Range': f'bytes {start}-{end}/{file_size}',
-        'Accept-Ranges': 'bytes',
-        'Content-Length': str(end - start + 1),
-        'Content-Type': 'video/mp4',
-    }
-    
-    status_code = 206 if range_header else 200
-    
-    return StreamingResponse(
-        read_file_chunk(),
-        status_code=status_code,
-        headers=headers
-    )
+    # Range / multi-range / If-Range handling with constant memory per stream
+    return RangeFileResponse(file_path, request.headers, media_type='video/mp4')
 
 @app.get("/api/videos/{file_id}/download")
 async def download_video(file_id: str):
@@ -649,6 +828,49 @@ async def download_video(file_id: str):
         media_type="video/mp4"
     )
 
+async def index_video_keyframes(file_id: str, file_path: str) -> Optional[Dict[str, Any]]:
+    """Build the keyframe index of a stored video and record it on its row"""
+    if not build_keyframe_index:
+        return None
+    
+    try:
+        ffprobe_cmd = shutil.which("ffprobe") or shutil.which("ffprobe.exe") or "ffprobe"
+        index = await media_executor.run_io(build_keyframe_index, file_path, ffprobe_cmd)
+        summary = index.summary()
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+        UPDATE video_files SET keyframe_index = ?, metadata = ? WHERE id = ?
+        ''', (KeyframeIndex.sidecar_path(file_path), json.dumps({"keyframes": summary}), file_id))
+        conn.commit()
+        conn.close()
+        
+        return summary
+    except Exception as e:
+        print(f"Warning: Could not index keyframes for {file_id}: {e}")
+        return None
+
+async def create_analysis_proxy(file_id: str, file_path: str):
+    """Create the low-resolution analysis proxy of a stored video"""
+    if not build_analysis_proxy:
+        return
+    
+    try:
+        ffmpeg_cmd = shutil.which("ffmpeg") or shutil.which("ffmpeg.exe") or "ffmpeg"
+        ffprobe_cmd = shutil.which("ffprobe") or shutil.which("ffprobe.exe") or "ffprobe"
+        path = await media_executor.run_io(build_analysis_proxy, file_path, ffmpeg_cmd, ffprobe_cmd)
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE video_files SET analysis_proxy = ? WHERE id = ?", (path, file_id))
+        conn.commit()
+        conn.close()
+        
+        print(f"Created analysis proxy for {file_id}")
+    except Exception as e:
+        print(f"Warning: Could not create analysis proxy for {file_id}: {e}")
+
 @app.post("/api/videos/{file_id}/thumbnail")
 async def create_video_thumbnail(file_id: str):
     """Create thumbnail for a video"""
@@ -675,27 +897,33 @@ async def create_video_thumbnail(file_id: str):
         
         # Try to create thumbnail using system FFmpeg first
         thumbnail_created = False
+        keyframes = get_keyframe_index(str(file_path)) if get_keyframe_index else None
         
         try:
             import subprocess
             
             # Check if FFmpeg is available in system PATH
             try:
-                subprocess.run(["ffmpeg", "-version"], capture_output=True, timeout=5)
+                await media_executor.run_io(subprocess.run, ["ffmpeg", "-version"], capture_output=True, timeout=5)
                 ffmpeg_cmd = "ffmpeg"
             except:
                 try:
-                    subprocess.run(["ffmpeg.exe", "-version"], capture_output=True, timeout=5)
+                    await media_executor.run_io(subprocess.run, ["ffmpeg.exe", "-version"], capture_output=True, timeout=5)
                     ffmpeg_cmd = "ffmpeg.exe"
                 except:
                     ffmpeg_cmd = None
             
             if ffmpeg_cmd:
-                # FFmpeg command to extract thumbnail at 10% of video duration
+                # Seek on the input side; with a keyframe index, land on the
+                # keyframe nearest 5 seconds so only one frame is decoded
+                seek_time = '00:00:05'
+                if keyframes:
+                    seek_time = f"{keyframes.nearest_keyframe(5.0):.3f}"
+                
                 cmd = [
                     ffmpeg_cmd,
+                    '-ss', seek_time,   # Extract at 5 seconds
                     '-i', str(file_path),
-                    '-ss', '00:00:05',  # Extract at 5 seconds
                     '-vframes', '1',    # Extract only 1 frame
                     '-vf', 'scale=320:180:force_original_aspect_ratio=decrease,pad=320:180:(ow-iw)/2:(oh-ih)/2',
                     '-q:v', '2',        # High quality
@@ -703,7 +931,7 @@ async def create_video_thumbnail(file_id: str):
                     str(thumb_path)
                 ]
                 
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+                result = await media_executor.run_io(subprocess.run, cmd, capture_output=True, text=True, timeout=30)
                 
                 if result.returncode == 0 and thumb_path.exists():
                     thumbnail_created = True
@@ -717,57 +945,16 @@ async def create_video_thumbnail(file_id: str):
         # If FFmpeg failed, try OpenCV
         if not thumbnail_created:
             try:
-                import cv2
-                
-                cap = cv2.VideoCapture(str(file_path))
-                
-                # Get video info
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                
-                # Seek to 5 seconds or 10% of video, whichever is smaller
-                seek_frame = min(int(fps * 5), int(frame_count * 0.1)) if fps > 0 else 0
-                cap.set(cv2.CAP_PROP_POS_FRAMES, seek_frame)
-                
-                ret, frame = cap.read()
-                cap.release()
-                
-                if ret:
-                    # Resize frame to 320x180
-                    height, width = frame.shape[:2]
-                    target_width, target_height = 320, 180
-                    
-                    # Calculate scaling to maintain aspect ratio
-                    scale = min(target_width / width, target_height / height)
-                    new_width = int(width * scale)
-                    new_height = int(height * scale)
-                    
-                    # Resize frame
-                    resized = cv2.resize(frame, (new_width, new_height))
-                    
-                    # Create black canvas and center the frame
-                    canvas = cv2.copyMakeBorder(
-                        resized,
-                        (target_height - new_height) // 2,
-                        (target_height - new_height) // 2,
-                        (target_width - new_width) // 2,
-                        (target_width - new_width) // 2,
-                        cv2.BORDER_CONSTANT,
-                        value=[0, 0, 0]
-                    )
-                    
-                    # Save thumbnail
-                    success = cv2.imwrite(str(thumb_path), canvas)
-                    if success:
-                        thumbnail_created = True
-                        print(f"Successfully created thumbnail using OpenCV for {file_id}")
+                if await media_executor.run_io(_create_opencv_thumbnail, str(file_path), thumb_path, keyframes):
+                    thumbnail_created = True
+                    print(f"Successfully created thumbnail using OpenCV for {file_id}")
                 
             except Exception as e:
                 print(f"OpenCV thumbnail creation failed for {file_id}: {str(e)}")
         
         # Final fallback: create placeholder thumbnail
         if not thumbnail_created:
-            _create_placeholder_thumbnail(thumb_path, filename)
+            await media_executor.run_io(_create_placeholder_thumbnail, thumb_path, filename)
             print(f"Created placeholder thumbnail for {file_id}")
         
         # Return success response
@@ -784,7 +971,7 @@ async def create_video_thumbnail(file_id: str):
         try:
             thumb_filename = f"thumb_{file_id}.jpg"
             thumb_path = THUMBNAILS_DIR / thumb_filename
-            _create_placeholder_thumbnail(thumb_path, filename)
+            await media_executor.run_io(_create_placeholder_thumbnail, thumb_path, filename)
             return {
                 "success": True,
                 "thumbnail_url": f"http://localhost:8001/uploads/thumbnails/{thumb_filename}",
@@ -794,6 +981,54 @@ async def create_video_thumbnail(file_id: str):
         except:
             raise HTTPException(status_code=500, detail=f"Thumbnail creation failed: {str(e)}")
 
+def _create_opencv_thumbnail(file_path: str, thumb_path: Path, keyframes=None) -> bool:
+    """Blocking OpenCV thumbnail fallback for ``create_video_thumbnail``"""
+    import cv2
+    
+    cap = cv2.VideoCapture(file_path)
+    
+    # Get video info
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    
+    # Seek to 5 seconds or 10% of video, whichever is smaller
+    seek_frame = min(int(fps * 5), int(frame_count * 0.1)) if fps > 0 else 0
+    if keyframes:
+        seek_frame = keyframes.keyframe_frame_before(seek_frame)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, seek_frame)
+    
+    ret, frame = cap.read()
+    cap.release()
+    
+    if ret:
+        # Resize frame to 320x180
+        height, width = frame.shape[:2]
+        target_width, target_height = 320, 180
+        
+        # Calculate scaling to maintain aspect ratio
+        scale = min(target_width / width, target_height / height)
+        new_width = int(width * scale)
+        new_height = int(height * scale)
+        
+        # Resize frame
+        resized = cv2.resize(frame, (new_width, new_height))
+        
+        # Create black canvas and center the frame
+        canvas = cv2.copyMakeBorder(
+            resized,
+            (target_height - new_height) // 2,
+            (target_height - new_height) // 2,
+            (target_width - new_width) // 2,
+            (target_width - new_width) // 2,
+            cv2.BORDER_CONSTANT,
+            value=[0, 0, 0]
+        )
+        
+        # Save thumbnail
+        return cv2.imwrite(str(thumb_path), canvas)
+    
+    return False
+
 def _create_placeholder_thumbnail(thumb_path: Path, filename: str = "Video"):
     """Create a placeholder thumbnail"""
     try:
@@ -969,46 +1204,37 @@ async def get_providers():
 async def get_lmstudio_status():
     """Check LM Studio status and vision capabilities"""
     try:
-        import httpx
         base_url = "http://localhost:1234"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{base_url}/v1/models", timeout=5.0)
-            if response.status_code == 200:
-                models_data = response.json().get('data', [])
-                vision_keywords = ['llava', 'vision', 'gpt-4v', 'claude-3']
-                
-                models_info = []
-                has_vision = False
-                
-                for model in models_data:
-                    model_id = model.get('id', '')
-                    model_has_vision = any(keyword in model_id.lower() for keyword in vision_keywords)
-                    has_vision = has_vision or model_has_vision
-                    
-                    models_info.append({
-                        "id": model_id,
-                        "name": model.get('object', model_id),
-                        "has_vision": model_has_vision,
-                        "vision_keywords_found": [kw for kw in vision_keywords if kw in model_id.lower()]
-                    })
-                
-                return {
-                    "connected": True,
-                    "models": models_info,
-                    "has_vision_model": has_vision,
-                    "vision_available": has_vision,
-                    "total_models": len(models_info),
-                    "base_url": base_url,
-                    "message": "LLaVA or vision model detected!" if has_vision else "No vision models detected. Load a model with 'llava' or 'vision' in the name."
-                }
-            else:
-                return {
-                    "connected": False,
-                    "error": f"LM Studio responded with status {response.status_code}",
-                    "has_vision_model": False,
-                    "vision_available": False
+        status = await lmstudio_client.status(base_url, refresh=True)
+        if status['connected']:
+            vision_keywords = lmstudio_client.VISION_KEYWORDS
+            models_info = [
+                {
+                    "id": model['id'],
+                    "name": model['object'],
+                    "has_vision": model['has_vision'],
+                    "vision_keywords_found": [kw for kw in vision_keywords if kw in model['id'].lower()]
                 }
+                for model in status['models']
+            ]
+            has_vision = any(model['has_vision'] for model in models_info)
+            
+            return {
+                "connected": True,
+                "models": models_info,
+                "has_vision_model": has_vision,
+                "vision_available": has_vision,
+                "total_models": len(models_info),
+                "base_url": base_url,
+                "message": "LLaVA or vision model detected!" if has_vision else "No vision models detected. Load a model with 'llava' or 'vision' in the name."
+            }
+        else:
+            return {
+                "connected": False,
+                "error": f"LM Studio not reachable: {status['error']}",
+                "has_vision_model": False,
+                "vision_available": False
+            }
                 
     except Exception as e:
         return {
@@ -1042,64 +1268,54 @@ async def test_api_key(request: APIKeyStorage):
     try:
         if request.provider == "openai":
             import openai
-            client = openai.OpenAI(api_key=request.api_key)
+            client = openai.AsyncOpenAI(api_key=request.api_key)
             # Make a simple test request
-            response = client.models.list()
+            response = await provider_governor.call("openai", client.models.list)
             return {"success": True, "message": "OpenAI API key is valid", "models_count": len(response.data)}
             
         elif request.provider == "gemini":
             import google.generativeai as genai
             genai.configure(api_key=request.api_key)
             # Test by trying to list models
-            models = list(genai.list_models())
+            models = await provider_governor.call("gemini", lambda: list(genai.list_models()), blocking=True)
             return {"success": True, "message": "Gemini API key is valid", "models_count": len(models)}
             
         elif request.provider == "anthropic":
             import anthropic
-            client = anthropic.Anthropic(api_key=request.api_key)
+            client = anthropic.AsyncAnthropic(api_key=request.api_key)
             # Test with a simple message
-            response = client.messages.create(
+            response = await provider_governor.call(
+                "anthropic",
+                client.messages.create,
                 model="claude-3-haiku-20240307",
                 max_tokens=10,
-                messages=[{"role": "user", "content": "Hello"}]
+                messages=[{"role": "user", "content": "Hello"}],
+                tokens=10
             )
             return {"success": True, "message": "Anthropic API key is valid"}
             
         elif request.provider == "lmstudio":
-            # Test LM Studio connection
-            import httpx
+            # Test LM Studio connection (the shared client also refreshes its model registry)
             base_url = request.api_key if request.api_key else "http://localhost:1234"
-            
-            try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(f"{base_url}/v1/models", timeout=5.0)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        models = data.get('data', [])
-                        
-                        if models:
-                            model_names = [model.get('id', 'unknown') for model in models]
-                            return {
-                                "success": True, 
-                                "message": f"LM Studio connected. Found {len(models)} models: {', '.join(model_names[:3])}{'...' if len(models) > 3 else ''}"
-                            }
-                        else:
-                            return {
-                                "success": True, 
-                                "message": "LM Studio connected but no models loaded. Please load a model in LM Studio."
-                            }
-                    else:
-                        return {
-                            "success": False, 
-                            "message": f"LM Studio server responded with status {response.status_code}"
-                        }
-            except Exception as e:
+            status = await lmstudio_client.status(base_url, refresh=True)
+            if not status['connected']:
                 return {
                     "success": False, 
-                    "message": f"LM Studio connection failed: {str(e)}. Make sure LM Studio is running on {base_url}"
+                    "message": f"LM Studio connection failed: {status['error']}. Make sure LM Studio is running on {base_url}"
                 }
             
+            models = status['models']
+            if models:
+                model_names = [model['id'] or 'unknown' for model in models]
+                return {
+                    "success": True, 
+                    "message": f"LM Studio connected. Found {len(models)} models: {', '.join(model_names[:3])}{'...' if len(models) > 3 else ''}"
+                }
+            return {
+                "success": True, 
+                "message": "LM Studio connected but no models loaded. Please load a model in LM Studio."
+            }
+            
         elif request.provider == "lmstudio":
             # For LM Studio, test connection to local endpoint
             import requests
@@ -1269,57 +1485,28 @@ async def analyze_video(project_id: str, request: AnalysisRequest):
         conn.close()
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-async def extract_video_frames(file_path: str, num_frames: int = 10) -> List[Dict[str, Any]]:
-    """Extract frames from video and return as base64 encoded images"""
-    frames = []
+async def extract_video_frames(file_path: str, num_frames: int = 10) -> "FrameBatch":
+    """Extract frames from video as a batch with memoized JPEG/base64 encodings"""
     try:
-        # Open video file
-        cap = cv2.VideoCapture(file_path)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        duration = total_frames / fps if fps > 0 else 0
-        
-        # Calculate frame intervals
-        if total_frames > 0:
-            frame_interval = max(1, total_frames // num_frames)
-            
-            for i in range(0, total_frames, frame_interval):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-                ret, frame = cap.read()
-                
-                if ret:
-                    # Convert frame to PIL Image
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    pil_image = Image.fromarray(frame_rgb)
-                    
-                    # Resize to reasonable size
-                    pil_image.thumbnail((1024, 1024), Image.Resampling.LANCZOS)
-                    
-                    # Convert to base64
-                    buffer = BytesIO()
-                    pil_image.save(buffer, format='JPEG', quality=85)
-                    img_base64 = base64.b64encode(buffer.getvalue()).decode()
-                    
-                    frames.append({
-                        "image": img_base64,
-                        "timestamp": i / fps if fps > 0 else 0,
-                        "frame_number": i
-                    })
-                    
-                    if len(frames) >= num_frames:
-                        break
-        
-        cap.release()
-        return frames
+        # Decoding and JPEG encoding run in the shared media process pool
+        return await media_executor.run_cpu(extract_video_frames_sync, file_path, num_frames)
         
     except Exception as e:
         print(f"Error extracting frames: {e}")
-        return []
+        return FrameBatch.empty() if FrameBatch else []
 
-async def analyze_with_openai(frames: List[Dict], prompt: str, api_key: str) -> Dict[str, Any]:
+async def analyze_with_openai(frames: "FrameBatch", prompt: str, api_key: str) -> Dict[str, Any]:
     """Analyze video frames using OpenAI GPT-4 Vision"""
     try:
         openai.api_key = api_key
+        frame_urls = frames[:8].data_urls(quality=85)  # Limit to 8 frames for API limits
+        
+        # Served from the response cache when these frames were analyzed before
+        cache_key, cached = (
+            response_cache.lookup("openai", "gpt-4-vision-preview", prompt, frame_urls) if response_cache else (None, None)
+        )
+        if cached is not None:
+            return cached
         
         # Prepare messages with images
         messages = [
@@ -1346,18 +1533,21 @@ Return your analysis as a JSON object with a "clips" array."""
                 "role": "user",
                 "content": [
                     {"type": "text", "text": f"Analyze these video frames and {prompt}. Return only a JSON object with the analysis."},
-                    *[{"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{frame['image']}"}} for frame in frames[:8]]  # Limit to 8 frames for API limits
+                    *[{"type": "image_url", "image_url": {"url": url}} for url in frame_urls]
                 ]
             }
         ]
         
         # Make API call
-        client = openai.OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
+        client = openai.AsyncOpenAI(api_key=api_key)
+        response = await provider_governor.call(
+            "openai",
+            client.chat.completions.create,
             model="gpt-4-vision-preview",
             messages=messages,
             max_tokens=2000,
-            temperature=0.3
+            temperature=0.3,
+            tokens=estimate_tokens(messages, 2000)
         )
         
         # Parse response
@@ -1373,25 +1563,29 @@ Return your analysis as a JSON object with a "clips" array."""
                 analysis_data = json.loads(json_str)
             
             if 'clips' in analysis_data:
-                return {
+                result = {
                     "clips": analysis_data['clips'],
                     "summary": f"OpenAI GPT-4 Vision analysis: {len(analysis_data['clips'])} clips identified based on visual content and narrative structure.",
                     "provider_used": "openai",
                     "model_used": "gpt-4-vision-preview"
                 }
+                if cache_key:
+                    response_cache.put(cache_key, result)
+                return result
         except:
             pass
         
         # Fallback: Create clips based on frame analysis
         clips = []
-        for i, frame in enumerate(frames):
-            if i < len(frames) - 1:
+        timestamps = frames.timestamps.tolist()
+        for i, timestamp in enumerate(timestamps):
+            if i < len(timestamps) - 1:
                 clips.append({
                     "title": f"Segment {i+1}",
-                    "start_time": frame['timestamp'],
-                    "end_time": frames[i+1]['timestamp'] if i+1 < len(frames) else frame['timestamp'] + 30,
+                    "start_time": timestamp,
+                    "end_time": timestamps[i+1] if i+1 < len(timestamps) else timestamp + 30,
                     "score": 0.7 + (i % 3) * 0.1,
-                    "reason": f"Visual analysis suggests engaging content at timestamp {frame['timestamp']:.1f}s"
+                    "reason": f"Visual analysis suggests engaging content at timestamp {timestamp:.1f}s"
                 })
         
         return {
@@ -1404,18 +1598,22 @@ Return your analysis as a JSON object with a "clips" array."""
     except Exception as e:
         raise Exception(f"OpenAI analysis failed: {str(e)}")
 
-async def analyze_with_gemini(frames: List[Dict], prompt: str, api_key: str) -> Dict[str, Any]:
+async def analyze_with_gemini(frames: "FrameBatch", prompt: str, api_key: str) -> Dict[str, Any]:
     """Analyze video frames using Google Gemini Pro Vision"""
     try:
         genai.configure(api_key=api_key)
         model = genai.GenerativeModel('gemini-1.5-flash')
         
-        # Prepare images for Gemini
-        images = []
-        for frame in frames[:10]:  # Limit to 10 frames
-            img_data = base64.b64decode(frame['image'])
-            pil_image = Image.open(BytesIO(img_data))
-            images.append(pil_image)
+        # Served from the response cache when these frames were analyzed before
+        selected = frames[:10]  # Limit to 10 frames
+        cache_key, cached = (
+            response_cache.lookup("gemini", "gemini-1.5-flash", prompt, selected.pixels) if response_cache else (None, None)
+        )
+        if cached is not None:
+            return cached
+        
+        # Prepare images for Gemini (PIL views of the decoded frames)
+        images = selected.images()
         
         # Create prompt
         full_prompt = f"""
@@ -1433,7 +1631,15 @@ async def analyze_with_gemini(frames: List[Dict], prompt: str, api_key: str) ->
         """
         
         # Make API call
-        response = model.generate_content([full_prompt] + images)
+        content_parts = [full_prompt] + images
+        generate = getattr(model, "generate_content_async", None)
+        response = await provider_governor.call(
+            "gemini",
+            generate or model.generate_content,
+            content_parts,
+            tokens=estimate_tokens(content_parts),
+            blocking=generate is None
+        )
         
         # Parse response
         analysis_text = response.text
@@ -1447,25 +1653,29 @@ async def analyze_with_gemini(frames: List[Dict], prompt: str, api_key: str) ->
                 analysis_data = json.loads(json_str)
                 
                 if 'clips' in analysis_data:
-                    return {
+                    result = {
                         "clips": analysis_data['clips'],
                         "summary": f"Google Gemini Pro Vision analysis: {len(analysis_data['clips'])} clips identified through multimodal analysis.",
                         "provider_used": "gemini",
                         "model_used": "gemini-1.5-flash"
                     }
+                    if cache_key:
+                        response_cache.put(cache_key, result)
+                    return result
         except:
             pass
         
         # Fallback: Create clips based on frame distribution
         clips = []
-        for i, frame in enumerate(frames):
-            if i % 2 == 0 and i < len(frames) - 1:  # Every other frame
+        timestamps = frames.timestamps.tolist()
+        for i, timestamp in enumerate(timestamps):
+            if i % 2 == 0 and i < len(timestamps) - 1:  # Every other frame
                 clips.append({
                     "title": f"Visual Highlight {i//2 + 1}",
-                    "start_time": frame['timestamp'],
-                    "end_time": min(frame['timestamp'] + 25, frames[-1]['timestamp']),
+                    "start_time": timestamp,
+                    "end_time": min(timestamp + 25, timestamps[-1]),
                     "score": 0.8 - (i * 0.05),
-                    "reason": f"Gemini identified visual interest at {frame['timestamp']:.1f}s"
+                    "reason": f"Gemini identified visual interest at {timestamp:.1f}s"
                 })
         
         return {
@@ -1478,26 +1688,33 @@ async def analyze_with_gemini(frames: List[Dict], prompt: str, api_key: str) ->
     except Exception as e:
         raise Exception(f"Gemini analysis failed: {str(e)}")
 
-async def analyze_with_anthropic(frames: List[Dict], prompt: str, api_key: str) -> Dict[str, Any]:
+async def analyze_with_anthropic(frames: "FrameBatch", prompt: str, api_key: str) -> Dict[str, Any]:
     """Analyze video frames using Anthropic Claude"""
     try:
         import anthropic
         
+        # Served from the response cache when these frames were analyzed before
+        frame_b64s = frames.base64s(quality=85)
+        cache_key, cached = (
+            response_cache.lookup("anthropic", "claude-3-opus-20240229", prompt, frame_b64s) if response_cache else (None, None)
+        )
+        if cached is not None:
+            return cached
+        
         # Initialize Anthropic client
-        client = anthropic.Anthropic(api_key=api_key)
+        client = anthropic.AsyncAnthropic(api_key=api_key)
         
         # Convert frames to base64 images for Claude
         image_contents = []
-        for frame in frames:
-            if 'image_data' in frame:
-                image_contents.append({
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "image/jpeg",
-                        "data": frame['image_data']
-                    }
-                })
+        for frame_b64 in frame_b64s:
+            image_contents.append({
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": "image/jpeg",
+                    "data": frame_b64
+                }
+            })
         
         # Prepare messages for Claude
         messages = [
@@ -1525,10 +1742,13 @@ async def analyze_with_anthropic(frames: List[Dict], prompt: str, api_key: str)
         ]
         
         # Make API call
-        response = client.messages.create(
+        response = await provider_governor.call(
+            "anthropic",
+            client.messages.create,
             model="claude-3-opus-20240229",
             max_tokens=2000,
-            messages=messages
+            messages=messages,
+            tokens=estimate_tokens(messages, 2000)
         )
         
         # Parse response
@@ -1543,18 +1763,21 @@ async def analyze_with_anthropic(frames: List[Dict], prompt: str, api_key: str)
                 analysis_data = json.loads(json_str)
                 
                 if 'clips' in analysis_data:
-                    return {
+                    result = {
                         "clips": analysis_data['clips'],
                         "summary": f"Claude 3 Opus analysis: {len(analysis_data['clips'])} clips identified through detailed visual reasoning.",
                         "provider_used": "anthropic",
                         "model_used": "claude-3-opus-20240229"
                     }
+                    if cache_key:
+                        response_cache.put(cache_key, result)
+                    return result
         except:
             pass
         
         # Fallback: Create clips
         clips = []
-        segment_duration = frames[-1]['timestamp'] / 3 if frames else 30
+        segment_duration = float(frames.timestamps[-1]) / 3 if frames else 30
         
         for i in range(min(3, len(frames))):
             start_time = i * segment_duration
@@ -1576,10 +1799,9 @@ async def analyze_with_anthropic(frames: List[Dict], prompt: str, api_key: str)
     except Exception as e:
         raise Exception(f"Anthropic analysis failed: {str(e)}")
 
-async def analyze_with_lmstudio(frames: List[Dict], prompt: str, api_key: str, file_path: str) -> Dict[str, Any]:
+async def analyze_with_lmstudio(frames: "FrameBatch", prompt: str, api_key: str, file_path: str) -> Dict[str, Any]:
     """Analyze video frames using LM Studio local models with vision capabilities"""
     try:
-        import httpx
         import json
         import re
         import cv2
@@ -1603,6 +1825,17 @@ async def analyze_with_lmstudio(frames: List[Dict], prompt: str, api_key: str, f
         # Check if we have vision-capable models
         has_vision_model = await check_lmstudio_vision_models(base_url)
         
+        # Served from the response cache when these frames were analyzed before
+        cache_key, cached = (
+            response_cache.lookup(
+                "lmstudio", f"local-model@{base_url}", prompt,
+                [f"duration={video_duration:.1f}", f"vision={has_vision_model}",
+                 *(frames.base64s(quality=85) if has_vision_model else [])]
+            ) if response_cache else (None, None)
+        )
+        if cached is not None:
+            return cached
+        
         # Prepare analysis prompt
         if has_vision_model and frames:
             # Enhanced prompt for vision models
@@ -1648,18 +1881,17 @@ async def analyze_with_lmstudio(frames: List[Dict], prompt: str, api_key: str, f
             ]
             
             # Add frame images to the message
-            for frame in frames:
-                if 'image_data' in frame:
-                    messages[1]["content"].append({
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{frame['image_data']}"
-                        }
-                    })
-                    messages[1]["content"].append({
-                        "type": "text", 
-                        "text": f"Frame at {frame.get('timestamp', 0):.1f}s"
-                    })
+            for timestamp, url in zip(frames.timestamps, frames.data_urls(quality=85)):
+                messages[1]["content"].append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": url
+                    }
+                })
+                messages[1]["content"].append({
+                    "type": "text", 
+                    "text": f"Frame at {timestamp:.1f}s"
+                })
             
         else:
             # Fallback to text-only analysis
@@ -1694,9 +1926,6 @@ async def analyze_with_lmstudio(frames: List[Dict], prompt: str, api_key: str, f
             ]
         
         # Make request to LM Studio
-        url = f"{base_url}/v1/chat/completions"
-        headers = {"Content-Type": "application/json"}
-        
         payload = {
             "model": "local-model",
             "messages": messages,
@@ -1704,74 +1933,83 @@ async def analyze_with_lmstudio(frames: List[Dict], prompt: str, api_key: str, f
             "max_tokens": 1500 if has_vision_model else 1000
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers, timeout=60.0)
+        response = await provider_governor.call(
+            "lmstudio",
+            lmstudio_client.chat,
+            base_url,
+            payload,
+            timeout=60.0,
+            tokens=estimate_tokens(messages, payload["max_tokens"])
+        )
+        
+        if response.status_code == 200:
+            result = response.json()
+            content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
             
-            if response.status_code == 200:
-                result = response.json()
-                content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
-                
-                # Try to parse JSON from response
-                try:
-                    # Extract JSON from response
-                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                    if json_match:
-                        analysis_data = json.loads(json_match.group())
-                        clips = analysis_data.get('clips', [])
-                        
-                        if clips and isinstance(clips, list):
-                            # Validate and fix clip data
-                            valid_clips = []
-                            for clip in clips:
-                                if isinstance(clip, dict):
-                                    # Ensure required fields and valid values
-                                    start_time = float(clip.get('start_time', 0))
-                                    end_time = float(clip.get('end_time', min(start_time + 20, video_duration)))
-                                    
-                                    valid_clips.append({
-                                        "title": str(clip.get('title', 'LM Studio Clip')),
-                                        "start_time": max(0, min(start_time, video_duration)),
-                                        "end_time": max(start_time, min(end_time, video_duration)),
-                                        "score": max(0, min(float(clip.get('score', 0.7)), 1.0)),
-                                        "reason": str(clip.get('explanation', clip.get('reason', 'Local AI analysis')))
-                                    })
-                            
-                            if valid_clips:
-                                return {
-                                    "clips": valid_clips,
-                                    "summary": f"LM Studio analysis: {len(valid_clips)} clips identified with {'vision' if has_vision_model else 'text'} analysis.",
-                                    "provider_used": "lmstudio",
-                                    "model_used": "local-model",
-                                    "vision_used": has_vision_model
-                                }
-                except Exception as parse_error:
-                    print(f"Failed to parse LM Studio response: {parse_error}")
-                
-                # Fallback: Generate clips based on video duration
-                num_clips = min(3, max(1, int(video_duration / 30)))
-                clips = []
-                
-                for i in range(num_clips):
-                    start_time = (video_duration / num_clips) * i
-                    end_time = min(start_time + 20, video_duration)
+            # Try to parse JSON from response
+            try:
+                # Extract JSON from response
+                json_match = re.search(r'\{.*\}', content, re.DOTALL)
+                if json_match:
+                    analysis_data = json.loads(json_match.group())
+                    clips = analysis_data.get('clips', [])
                     
-                    clips.append({
-                        "title": f"LM Studio Segment {i+1}",
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "score": 0.8 - (i * 0.1),
-                        "reason": f"Local AI identified content at {start_time:.1f}s"
-                    })
-                
-                return {
-                    "clips": clips,
-                    "summary": f"LM Studio fallback analysis: {len(clips)} clips identified.",
-                    "provider_used": "lmstudio",
-                    "raw_response": content[:200] + "..." if len(content) > 200 else content
-                }
-            else:
-                raise Exception(f"LM Studio API error: {response.status_code}")
+                    if clips and isinstance(clips, list):
+                        # Validate and fix clip data
+                        valid_clips = []
+                        for clip in clips:
+                            if isinstance(clip, dict):
+                                # Ensure required fields and valid values
+                                start_time = float(clip.get('start_time', 0))
+                                end_time = float(clip.get('end_time', min(start_time + 20, video_duration)))
+                                
+                                valid_clips.append({
+                                    "title": str(clip.get('title', 'LM Studio Clip')),
+                                    "start_time": max(0, min(start_time, video_duration)),
+                                    "end_time": max(start_time, min(end_time, video_duration)),
+                                    "score": max(0, min(float(clip.get('score', 0.7)), 1.0)),
+                                    "reason": str(clip.get('explanation', clip.get('reason', 'Local AI analysis')))
+                                })
+                        
+                        if valid_clips:
+                            result = {
+                                "clips": valid_clips,
+                                "summary": f"LM Studio analysis: {len(valid_clips)} clips identified with {'vision' if has_vision_model else 'text'} analysis.",
+                                "provider_used": "lmstudio",
+                                "model_used": "local-model",
+                                "vision_used": has_vision_model
+                            }
+                            if cache_key:
+                                response_cache.put(cache_key, result)
+                            return result
+            except Exception as parse_error:
+                print(f"Failed to parse LM Studio response: {parse_error}")
+            
+            # Fallback: Generate clips based on video duration
+            num_clips = min(3, max(1, int(video_duration / 30)))
+            clips = []
+            
+            for i in range(num_clips):
+                start_time = (video_duration / num_clips) * i
+                end_time = min(start_time + 20, video_duration)
                 
+                clips.append({
+                    "title": f"LM Studio Segment {i+1}",
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "score": 0.8 - (i * 0.1),
+                    "reason": f"Local AI identified content at {start_time:.1f}s"
+                })
+            
+            return {
+                "clips": clips,
+                "summary": f"LM Studio fallback analysis: {len(clips)} clips identified.",
+                "provider_used": "lmstudio",
+                "raw_response": content[:200] + "..." if len(content) > 200 else content
+            }
+        else:
+            raise Exception(f"LM Studio API error: {response.status_code}")
+            
     except Exception as e:
         print(f"LM Studio analysis failed: {e}")
         
@@ -1790,20 +2028,9 @@ async def analyze_with_lmstudio(frames: List[Dict], prompt: str, api_key: str, f
         }
 
 async def check_lmstudio_vision_models(base_url: str) -> bool:
-    """Check if LM Studio has vision-capable models loaded"""
+    """Check if LM Studio has vision-capable models loaded (from the shared model registry)"""
     try:
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{base_url}/v1/models", timeout=5.0)
-            if response.status_code == 200:
-                models = response.json().get('data', [])
-                vision_models = ['llava', 'vision', 'gpt-4v', 'claude-3']
-                
-                for model in models:
-                    model_id = model.get('id', '').lower()
-                    if any(vision_keyword in model_id for vision_keyword in vision_models):
-                        return True
-        return False
+        return await lmstudio_client.has_vision(base_url)
     except:
         return False
 
@@ -1915,7 +2142,7 @@ class YouTubeURLRequest(BaseModel):
     youtube_url: str
 
 @app.post("/api/projects/{project_id}/youtube")
-async def process_youtube_url(project_id: str, request: YouTubeURLRequest):
+async def process_youtube_url(project_id: str, request: YouTubeURLRequest, background_tasks: BackgroundTasks):
     """Process a YouTube URL for a project"""
     # Get project
     conn = get_db_connection()
@@ -2009,6 +2236,16 @@ async def process_youtube_url(project_id: str, request: YouTubeURLRequest):
                 
                 conn.commit()
                 
+                # Hash the download once as its frame cache key, off the event loop
+                if frame_cache:
+                    await media_executor.run_io(frame_cache.source_digest, str(final_path))
+                
+                # Index keyframes once so later seeks can land on them
+                await index_video_keyframes(file_id, str(final_path))
+                
+                # Low-resolution proxy for analysis, created after the response is sent
+                background_tasks.add_task(create_analysis_proxy, file_id, str(final_path))
+                
                 # Create thumbnail
                 try:
                     result = await create_video_thumbnail(file_id)
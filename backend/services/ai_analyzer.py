@@ -1,7 +1,6 @@
 import asyncio
 import logging
 import json
-import base64
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 import tempfile
@@ -11,10 +10,9 @@ import random
 import cv2
 import numpy as np
 from PIL import Image
-import io
 import subprocess
-import httpx
 from datetime import datetime
+from contextvars import ContextVar
 
 # AI provider imports
 try:
@@ -41,8 +39,25 @@ except ImportError:
 
 from models.project import Clip
 from services.video_processor import VideoProcessor
+from services.frame_sampler import FrameSampler
+from services.analysis_proxy import analysis_source
+from services.frame_batch import FrameBatch
+from services.media_executor import media_executor
+from services.scene_detector import FFmpegSceneDetector
+from services.highlight_scorer import score_video
+from services.clip_selector import select_clips
+from services.response_cache import response_cache
+from services.lmstudio_client import lmstudio_client
+from services.provider_governor import estimate_tokens, provider_governor
 from .logger import logger
 
+# Frame sampler of the analyze_video request currently running, if any
+_active_sampler: ContextVar[Optional[FrameSampler]] = ContextVar('_active_sampler', default=None)
+
+# Analysis tasks of the analyze_video request currently running, keyed by
+# (video_path, analysis_type), so shared intermediate results run once
+_active_analyses: ContextVar[Optional[Dict[Tuple[str, str], asyncio.Task]]] = ContextVar('_active_analyses', default=None)
+
 class AIAnalyzer:
     """Enhanced service for analyzing videos using various AI providers"""
     
@@ -119,12 +134,60 @@ class AIAnalyzer:
             'accessibility_analysis': 'Check for accessibility features',
             'brand_safety': 'Analyze content for brand safety'
         }
+        
+        # Analysis handlers and the analyses whose results each one builds on
+        self.analysis_handlers = {
+            'content_analysis': self._analyze_content,
+            'speech_to_text': self._extract_speech,
+            'sentiment_analysis': self._analyze_sentiment,
+            'object_detection': self._detect_objects,
+            'scene_detection': self._detect_scenes,
+            'highlight_detection': self._detect_highlights,
+            'summary_generation': self._generate_summary,
+            'tag_generation': self._generate_tags,
+            'thumbnail_suggestions': self._suggest_thumbnails,
+            'clip_recommendations': self._recommend_clips,
+            'trend_analysis': self._analyze_trends,
+            'audience_analysis': self._analyze_audience,
+            'quality_assessment': self._assess_quality,
+            'accessibility_analysis': self._analyze_accessibility,
+            'brand_safety': self._analyze_brand_safety
+        }
+        self.analysis_dependencies = {
+            'sentiment_analysis': ['speech_to_text'],
+            'accessibility_analysis': ['speech_to_text'],
+            'summary_generation': ['content_analysis'],
+            'tag_generation': ['content_analysis'],
+            'trend_analysis': ['content_analysis'],
+            'audience_analysis': ['content_analysis'],
+            'brand_safety': ['content_analysis'],
+            'clip_recommendations': ['highlight_detection']
+        }
+        
+        # Frame samples each analysis type reads, including the samples read by
+        # the analyses it builds on (e.g. summaries reuse content analysis)
+        self.frame_requirements = {
+            'content_analysis': [8],
+            'object_detection': [6],
+            'scene_detection': [12],
+            'highlight_detection': [10],
+            'summary_generation': [8],
+            'tag_generation': [8],
+            'thumbnail_suggestions': [8],
+            'clip_recommendations': [10],
+            'trend_analysis': [8],
+            'audience_analysis': [8],
+            'brand_safety': [8]
+        }
     
     def _init_ai_clients(self):
         """Initialize AI service clients"""
-        # OpenAI
+        # OpenAI (async client on openai>=1, module-level acreate before that)
+        self.openai_client = None
         if openai and self.api_keys.get('openai'):
             openai.api_key = self.api_keys['openai']
+            if hasattr(openai, 'AsyncOpenAI'):
+                self.openai_client = openai.AsyncOpenAI(api_key=self.api_keys['openai'])
         
         # Google Gemini
         if genai and configure and self.api_keys.get('gemini'):
@@ -132,7 +195,29 @@ class AIAnalyzer:
         
         # Anthropic
         if anthropic and self.api_keys.get('anthropic'):
-            self.anthropic_client = anthropic.Anthropic(api_key=self.api_keys['anthropic'])
+            self.anthropic_client = anthropic.AsyncAnthropic(api_key=self.api_keys['anthropic'])
+    
+    async def _openai_chat(self, **kwargs) -> Any:
+        """Non-blocking chat completion, admitted by the provider governor"""
+        create = self.openai_client.chat.completions.create if self.openai_client else openai.ChatCompletion.acreate
+        tokens = estimate_tokens(kwargs.get('messages'), kwargs.get('max_tokens', 0))
+        return await provider_governor.call('openai', create, tokens=tokens, **kwargs)
+    
+    async def _gemini_generate(self, model: Any, content_parts: List[Any]) -> Any:
+        """Non-blocking Gemini generation, admitted by the provider governor"""
+        generate = getattr(model, 'generate_content_async', None)
+        return await provider_governor.call(
+            'gemini',
+            generate or model.generate_content,
+            content_parts,
+            tokens=estimate_tokens(content_parts),
+            blocking=generate is None
+        )
+    
+    async def _lmstudio_chat(self, base_url: str, payload: Dict[str, Any], timeout: float) -> Any:
+        """LM Studio chat completion, admitted by the provider governor"""
+        tokens = estimate_tokens(payload.get('messages'), payload.get('max_tokens', 0))
+        return await provider_governor.call('lmstudio', lmstudio_client.chat, base_url, payload, timeout=timeout, tokens=tokens)
     
     async def analyze_video(self, video_path: str, analysis_types: Optional[List[str]] = None, youtube_metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -161,49 +246,21 @@ class AIAnalyzer:
             video_info = await self.video_processor.extract_metadata(video_path)
             results['video_info'] = video_info
             
-            # Perform requested analyses
+            # Decode every frame the requested analyses need in a single pass
+            sampler = FrameSampler(self.video_processor, video_path)
             for analysis_type in analysis_types:
-                if analysis_type in self.analysis_types:
-                    logger.info(f"Performing {analysis_type} on {video_path}")
-                    
-                    try:
-                        if analysis_type == 'content_analysis':
-                            results['analyses'][analysis_type] = await self._analyze_content(video_path, video_info)
-                        elif analysis_type == 'speech_to_text':
-                            results['analyses'][analysis_type] = await self._extract_speech(video_path, video_info)
-                        elif analysis_type == 'sentiment_analysis':
-                            results['analyses'][analysis_type] = await self._analyze_sentiment(video_path, video_info)
-                        elif analysis_type == 'object_detection':
-                            results['analyses'][analysis_type] = await self._detect_objects(video_path, video_info)
-                        elif analysis_type == 'scene_detection':
-                            results['analyses'][analysis_type] = await self._detect_scenes(video_path, video_info)
-                        elif analysis_type == 'highlight_detection':
-                            results['analyses'][analysis_type] = await self._detect_highlights(video_path, video_info)
-                        elif analysis_type == 'summary_generation':
-                            results['analyses'][analysis_type] = await self._generate_summary(video_path, video_info, youtube_metadata)
-                        elif analysis_type == 'tag_generation':
-                            results['analyses'][analysis_type] = await self._generate_tags(video_path, video_info, youtube_metadata)
-                        elif analysis_type == 'thumbnail_suggestions':
-                            results['analyses'][analysis_type] = await self._suggest_thumbnails(video_path, video_info)
-                        elif analysis_type == 'clip_recommendations':
-                            results['analyses'][analysis_type] = await self._recommend_clips(video_path, video_info)
-                        elif analysis_type == 'trend_analysis':
-                            results['analyses'][analysis_type] = await self._analyze_trends(video_path, video_info)
-                        elif analysis_type == 'audience_analysis':
-                            results['analyses'][analysis_type] = await self._analyze_audience(video_path, video_info)
-                        elif analysis_type == 'quality_assessment':
-                            results['analyses'][analysis_type] = await self._assess_quality(video_path, video_info)
-                        elif analysis_type == 'accessibility_analysis':
-                            results['analyses'][analysis_type] = await self._analyze_accessibility(video_path, video_info)
-                        elif analysis_type == 'brand_safety':
-                            results['analyses'][analysis_type] = await self._analyze_brand_safety(video_path, video_info)
-                            
-                    except Exception as e:
-                        logger.error(f"Analysis {analysis_type} failed: {e}")
-                        results['analyses'][analysis_type] = {
-                            'error': str(e),
-                            'status': 'failed'
-                        }
+                for num_frames in self.frame_requirements.get(analysis_type, []):
+                    sampler.request(num_frames)
+            try:
+                await sampler.prefetch()
+            except Exception as e:
+                logger.warning(f"Frame prefetch failed, analyses will sample on demand: {e}")
+            sampler_token = _active_sampler.set(sampler)
+            
+            try:
+                await self._run_analyses(results, video_path, video_info, analysis_types, youtube_metadata)
+            finally:
+                _active_sampler.reset(sampler_token)
                         
             # Calculate overall analysis score and processing time
             results['processing_time'] = time.time() - start_time
@@ -221,11 +278,77 @@ class AIAnalyzer:
                 'timestamp': datetime.now().isoformat()
             }
     
+    async def _run_analyses(self, results: Dict[str, Any], video_path: str, video_info: Dict,
+                            analysis_types: List[str], youtube_metadata: Optional[Dict[str, Any]]):
+        """Run the requested analysis types concurrently and store their output in results.
+        
+        Every analysis starts at once; one that builds on another awaits the
+        shared task of its dependency, so the request takes as long as its
+        longest dependency chain and each intermediate result is computed once.
+        """
+        requested = [analysis_type for analysis_type in analysis_types if analysis_type in self.analysis_handlers]
+        
+        analyses_token = _active_analyses.set({})
+        try:
+            outcomes = await asyncio.gather(
+                *[self._run_analysis(analysis_type, video_path, video_info, youtube_metadata) for analysis_type in requested],
+                return_exceptions=True
+            )
+        finally:
+            _active_analyses.reset(analyses_token)
+        
+        for analysis_type, outcome in zip(requested, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Analysis {analysis_type} failed: {outcome}")
+                results['analyses'][analysis_type] = {
+                    'error': str(outcome),
+                    'status': 'failed'
+                }
+            else:
+                results['analyses'][analysis_type] = outcome
+    
+    async def _run_analysis(self, analysis_type: str, video_path: str, video_info: Dict,
+                            youtube_metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Result of one analysis type, shared within the running analyze_video request"""
+        analyses = _active_analyses.get()
+        if analyses is None:
+            return await self._call_analysis(analysis_type, video_path, video_info, youtube_metadata)
+        return await self._schedule_analysis(analyses, analysis_type, video_path, video_info, youtube_metadata)
+    
+    def _schedule_analysis(self, analyses: Dict[Tuple[str, str], asyncio.Task], analysis_type: str,
+                           video_path: str, video_info: Dict,
+                           youtube_metadata: Optional[Dict[str, Any]]) -> asyncio.Task:
+        """Start an analysis (and, ahead of it, its dependencies) unless already running"""
+        key = (video_path, analysis_type)
+        task = analyses.get(key)
+        if task is None:
+            for dependency in self.analysis_dependencies.get(analysis_type, []):
+                self._schedule_analysis(analyses, dependency, video_path, video_info, youtube_metadata)
+            task = analyses[key] = asyncio.ensure_future(
+                self._call_analysis(analysis_type, video_path, video_info, youtube_metadata)
+            )
+        return task
+    
+    async def _call_analysis(self, analysis_type: str, video_path: str, video_info: Dict,
+                             youtube_metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        logger.info(f"Performing {analysis_type} on {video_path}")
+        handler = self.analysis_handlers[analysis_type]
+        if analysis_type in ('summary_generation', 'tag_generation'):
+            return await handler(video_path, video_info, youtube_metadata)
+        return await handler(video_path, video_info)
+    
+    async def _extract_frames(self, video_path: str, num_frames: int) -> FrameBatch:
+        """Extract frames, reusing the request's shared sampler when one is active"""
+        sampler = _active_sampler.get()
+        if sampler is not None and sampler.video_path == video_path:
+            return await sampler.get_frames(num_frames)
+        return await self.video_processor.extract_frames(video_path, num_frames=num_frames)
+    
     async def _analyze_content(self, video_path: str, video_info: Dict) -> Dict[str, Any]:
         """Enhanced content analysis with AI integration"""
         try:
             # Extract frames for visual analysis
-            frames = await self.video_processor.extract_frames(video_path, num_frames=8)
+            frames = await self._extract_frames(video_path, num_frames=8)
             
             # Analyze with available AI providers
             ai_analysis = {}
@@ -272,7 +395,7 @@ class AIAnalyzer:
                 'ai_ready': False
             }
     
-    async def _analyze_frames_with_openai(self, frames: List[Dict], video_info: Dict) -> Dict[str, Any]:
+    async def _analyze_frames_with_openai(self, frames: FrameBatch, video_info: Dict) -> Dict[str, Any]:
         """Analyze video frames using OpenAI Vision"""
         if not openai or not self.api_keys.get('openai'):
             raise Exception("OpenAI not configured")
@@ -280,18 +403,14 @@ class AIAnalyzer:
         try:
             # Prepare frames for OpenAI Vision
             frame_images = []
-            for frame in frames[:4]:  # Limit to 4 frames for OpenAI
-                if 'image' in frame:
-                    # Convert PIL image to base64
-                    buffer = io.BytesIO()
-                    frame['image'].save(buffer, format='JPEG', quality=85)
-                    img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                    frame_images.append({
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{img_base64}"
-                        }
-                    })
+            # Encodings are memoized on the batch and shared across providers
+            for url in frames[:4].data_urls(quality=85):  # Limit to 4 frames for OpenAI
+                frame_images.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": url
+                    }
+                })
             
             # Create analysis prompt
             prompt = f"""
@@ -327,22 +446,12 @@ class AIAnalyzer:
                 }
             ]
             
-            # Use the correct OpenAI API format
-            try:
-                response = openai.ChatCompletion.create(
-                    model="gpt-4-vision-preview",
-                    messages=messages,
-                    max_tokens=1000,
-                    temperature=0.3
-                )
-            except AttributeError:
-                # Fallback to newer API format
-                response = openai.chat.completions.create(
-                    model="gpt-4-vision-preview",
-                    messages=messages,
-                    max_tokens=1000,
-                    temperature=0.3
-                )
+            response = await self._openai_chat(
+                model="gpt-4-vision-preview",
+                messages=messages,
+                max_tokens=1000,
+                temperature=0.3
+            )
             
             content = response.choices[0].message.content
             
@@ -370,19 +479,14 @@ class AIAnalyzer:
             logger.error(f"OpenAI frame analysis failed: {e}")
             raise
     
-    async def _analyze_frames_with_gemini(self, frames: List[Dict], video_info: Dict) -> Dict[str, Any]:
+    async def _analyze_frames_with_gemini(self, frames: FrameBatch, video_info: Dict) -> Dict[str, Any]:
         """Analyze video frames using Google Gemini Vision"""
         if not genai or not self.api_keys.get('gemini'):
             raise Exception("Gemini not configured")
         
         try:
             # Prepare frames for Gemini
-            frame_images = []
-            for frame in frames[:4]:  # Limit to 4 frames
-                if 'image' in frame:
-                    buffer = io.BytesIO()
-                    frame['image'].save(buffer, format='JPEG', quality=85)
-                    frame_images.append(buffer.getvalue())
+            frame_images = frames[:4].jpegs(quality=85)  # Limit to 4 frames
             
             prompt = f"""
             Analyze these video frames and identify all objects, people, and visual elements present.
@@ -416,7 +520,7 @@ class AIAnalyzer:
                     "data": img_bytes
                 })
             
-            response = model.generate_content(content_parts)
+            response = await self._gemini_generate(model, content_parts)
             
             # Try to parse JSON from response
             try:
@@ -456,7 +560,7 @@ class AIAnalyzer:
             logger.error(f"Gemini object detection failed: {e}")
             raise
     
-    async def _analyze_frames_with_lmstudio(self, frames: List[Dict], video_info: Dict) -> Dict[str, Any]:
+    async def _analyze_frames_with_lmstudio(self, frames: FrameBatch, video_info: Dict) -> Dict[str, Any]:
         """Analyze video frames using LM Studio"""
         try:
             base_url = os.getenv('LMSTUDIO_BASE_URL', 'http://localhost:1234')
@@ -466,17 +570,14 @@ class AIAnalyzer:
             
             if has_vision_model and frames:
                 # Prepare frames for vision analysis
-                frame_data = []
-                for frame in frames[:4]:  # Limit to 4 frames
-                    if 'image' in frame:
-                        buffer = io.BytesIO()
-                        frame['image'].save(buffer, format='JPEG', quality=85)
-                        frame_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                        
-                        frame_data.append({
-                            'timestamp': frame.get('timestamp', 0),
-                            'frame_data': frame_b64
-                        })
+                selected = frames[:4]  # Limit to 4 frames
+                frame_data = [
+                    {
+                        'timestamp': float(timestamp),
+                        'frame_data': frame_b64
+                    }
+                    for timestamp, frame_b64 in zip(selected.timestamps, selected.base64s(quality=85))
+                ]
                 
                 # Create analysis prompt
                 prompt = f"""
@@ -522,9 +623,6 @@ class AIAnalyzer:
                     })
                 
                 # Make request to LM Studio
-                url = f"{base_url}/v1/chat/completions"
-                headers = {"Content-Type": "application/json"}
-                
                 payload = {
                     "model": os.getenv('LMSTUDIO_MODEL', 'local-model'),
                     "messages": messages,
@@ -532,31 +630,30 @@ class AIAnalyzer:
                     "max_tokens": 1000
                 }
                 
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(url, json=payload, headers=headers, timeout=60.0)
+                response = await self._lmstudio_chat(base_url, payload, timeout=60.0)
+                
+                if response.status_code == 200:
+                    result = response.json()
+                    content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
                     
-                    if response.status_code == 200:
-                        result = response.json()
-                        content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
-                        
-                        # Try to parse JSON from response
-                        try:
-                            import re
-                            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                            if json_match:
-                                return json.loads(json_match.group())
-                            else:
-                                return {
-                                    'analysis': content,
-                                    'provider': 'lmstudio',
-                                    'model': 'local-vision-model'
-                                }
-                        except:
+                    # Try to parse JSON from response
+                    try:
+                        import re
+                        json_match = re.search(r'\{.*\}', content, re.DOTALL)
+                        if json_match:
+                            return json.loads(json_match.group())
+                        else:
                             return {
                                 'analysis': content,
                                 'provider': 'lmstudio',
                                 'model': 'local-vision-model'
                             }
+                    except:
+                        return {
+                            'analysis': content,
+                            'provider': 'lmstudio',
+                            'model': 'local-vision-model'
+                        }
             
             # Fallback to text-only analysis
             return {
@@ -597,7 +694,6 @@ class AIAnalyzer:
         logger.info(f"LM Studio analysis requested for {video_path}")
         
         try:
-            import httpx
             import json
             import re
             
@@ -609,8 +705,10 @@ class AIAnalyzer:
             frame_data = []
             
             try:
-                # Extract video duration and sample frames using OpenCV
-                cap = cv2.VideoCapture(video_path)
+                # Extract video duration and sample frames using OpenCV,
+                # from the low-resolution proxy once it exists
+                source = analysis_source(video_path)
+                cap = cv2.VideoCapture(source)
                 if cap.isOpened():
                     fps = cap.get(cv2.CAP_PROP_FPS)
                     frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
@@ -619,22 +717,25 @@ class AIAnalyzer:
                     
                     # Extract 3-5 sample frames for vision analysis
                     sample_points = [0.1, 0.3, 0.5, 0.7, 0.9]  # At 10%, 30%, 50%, 70%, 90%
+                    frame_numbers = [int(frame_count * point) for point in sample_points]
                     
-                    for point in sample_points:
-                        frame_number = int(frame_count * point)
-                        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-                        ret, frame = cap.read()
-                        
-                        if ret:
-                            # Convert frame to base64 for vision model
-                            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                            frame_b64 = base64.b64encode(buffer).decode('utf-8')
-                            
-                            frame_data.append({
-                                'timestamp': video_duration * point,
-                                'frame_data': frame_b64,
-                                'position': f"{int(point*100)}%"
-                            })
+                    # Served from the frame cache when this video was analyzed before
+                    decoded = await media_executor.run_cpu(
+                        self.video_processor._decode_frames,
+                        source, frame_numbers, fps, max_size=1024, cache=True
+                    )
+                    
+                    batch = self.video_processor._build_frame_batch(frame_numbers, decoded, fps)
+                    positions = dict(zip(frame_numbers, sample_points))
+                    
+                    # Convert frames to base64 for vision model
+                    for frame_number, frame_b64 in zip(batch.frame_numbers, batch.base64s(quality=85)):
+                        point = positions[int(frame_number)]
+                        frame_data.append({
+                            'timestamp': video_duration * point,
+                            'frame_data': frame_b64,
+                            'position': f"{int(point*100)}%"
+                        })
                     
                     cap.release()
             except Exception as e:
@@ -642,6 +743,16 @@ class AIAnalyzer:
             
             # Check if we have vision-capable models available
             has_vision_model = await self._check_vision_models(base_url)
+            model = os.getenv('LMSTUDIO_MODEL', 'local-model')
+            
+            # Served from the response cache when these frames were analyzed before
+            cache_key, cached = response_cache.lookup(
+                'lmstudio', f"{model}@{base_url}", prompt,
+                [f"duration={video_duration:.1f}", f"vision={has_vision_model}",
+                 *([frame_info['frame_data'] for frame_info in frame_data] if has_vision_model else [])]
+            )
+            if cached is not None:
+                return cached
             
             # Prepare the analysis prompt
             if has_vision_model and frame_data:
@@ -733,74 +844,71 @@ class AIAnalyzer:
                 ]
             
             # Make request to LM Studio
-            url = f"{base_url}/v1/chat/completions"
-            headers = {"Content-Type": "application/json"}
-            
             payload = {
-                "model": os.getenv('LMSTUDIO_MODEL', 'local-model'),
+                "model": model,
                 "messages": messages,
                 "temperature": 0.7,
                 "max_tokens": 1500 if has_vision_model else 1000
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=headers, timeout=60.0)
+            response = await self._lmstudio_chat(base_url, payload, timeout=60.0)
+            
+            if response.status_code == 200:
+                result = response.json()
+                content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
-                    
-                    # Try to parse JSON from response
-                    try:
-                        # Extract JSON from response
-                        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                        if json_match:
-                            analysis_data = json.loads(json_match.group())
-                            clips = analysis_data.get('clips', [])
-                            
-                            if clips and isinstance(clips, list):
-                                # Validate and fix clip data
-                                valid_clips = []
-                                for clip in clips:
-                                    if isinstance(clip, dict):
-                                        # Ensure required fields and valid values
-                                        start_time = float(clip.get('start_time', 0))
-                                        end_time = float(clip.get('end_time', min(start_time + 20, video_duration)))
-                                        
-                                        valid_clips.append({
-                                            "title": str(clip.get('title', 'LM Studio Clip')),
-                                            "start_time": max(0, min(start_time, video_duration)),
-                                            "end_time": max(start_time, min(end_time, video_duration)),
-                                            "score": max(0, min(float(clip.get('score', 0.7)), 1.0)),
-                                            "explanation": str(clip.get('explanation', 'Local AI analysis'))
-                                        })
-                                
-                                if valid_clips:
-                                    logger.info(f"LM Studio generated {len(valid_clips)} clips with {'vision' if has_vision_model else 'text'} analysis")
-                                    return valid_clips
-                    except Exception as parse_error:
-                        logger.warning(f"Failed to parse LM Studio response: {parse_error}")
-                    
-                    # Fallback: Generate clips based on video duration
-                    num_clips = min(3, max(1, int(video_duration / 30)))
-                    clips = []
-                    
-                    for i in range(num_clips):
-                        start_time = (video_duration / num_clips) * i
-                        end_time = min(start_time + 20, video_duration)
+                # Try to parse JSON from response
+                try:
+                    # Extract JSON from response
+                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+                    if json_match:
+                        analysis_data = json.loads(json_match.group())
+                        clips = analysis_data.get('clips', [])
                         
-                        clips.append({
-                            "title": f"LM Studio Segment {i+1}",
-                            "start_time": start_time,
-                            "end_time": end_time,
-                            "score": 0.8 - (i * 0.1),
-                            "explanation": f"Local AI identified content at {start_time:.1f}s"
-                        })
-                    
-                    return clips
-                else:
-                    raise Exception(f"LM Studio API error: {response.status_code}")
+                        if clips and isinstance(clips, list):
+                            # Validate and fix clip data
+                            valid_clips = []
+                            for clip in clips:
+                                if isinstance(clip, dict):
+                                    # Ensure required fields and valid values
+                                    start_time = float(clip.get('start_time', 0))
+                                    end_time = float(clip.get('end_time', min(start_time + 20, video_duration)))
+                                    
+                                    valid_clips.append({
+                                        "title": str(clip.get('title', 'LM Studio Clip')),
+                                        "start_time": max(0, min(start_time, video_duration)),
+                                        "end_time": max(start_time, min(end_time, video_duration)),
+                                        "score": max(0, min(float(clip.get('score', 0.7)), 1.0)),
+                                        "explanation": str(clip.get('explanation', 'Local AI analysis'))
+                                    })
+                            
+                            if valid_clips:
+                                logger.info(f"LM Studio generated {len(valid_clips)} clips with {'vision' if has_vision_model else 'text'} analysis")
+                                response_cache.put(cache_key, valid_clips)
+                                return valid_clips
+                except Exception as parse_error:
+                    logger.warning(f"Failed to parse LM Studio response: {parse_error}")
+                
+                # Fallback: Generate clips based on video duration
+                num_clips = min(3, max(1, int(video_duration / 30)))
+                clips = []
+                
+                for i in range(num_clips):
+                    start_time = (video_duration / num_clips) * i
+                    end_time = min(start_time + 20, video_duration)
                     
+                    clips.append({
+                        "title": f"LM Studio Segment {i+1}",
+                        "start_time": start_time,
+                        "end_time": end_time,
+                        "score": 0.8 - (i * 0.1),
+                        "explanation": f"Local AI identified content at {start_time:.1f}s"
+                    })
+                
+                return clips
+            else:
+                raise Exception(f"LM Studio API error: {response.status_code}")
+                
         except Exception as e:
             logger.error(f"LM Studio analysis failed: {e}")
             
@@ -814,20 +922,10 @@ class AIAnalyzer:
             }]
     
     async def _check_vision_models(self, base_url: str) -> bool:
-        """Check if LM Studio has vision-capable models loaded"""
+        """Check if LM Studio has vision-capable models loaded (from the shared model registry)"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{base_url}/v1/models", timeout=5.0)
-                if response.status_code == 200:
-                    models = response.json().get('data', [])
-                    vision_models = ['llava', 'vision', 'gpt-4v', 'claude-3']
-                    
-                    for model in models:
-                        model_id = model.get('id', '').lower()
-                        if any(vision_keyword in model_id for vision_keyword in vision_models):
-                            return True
-            return False
-        except:
+            return await lmstudio_client.has_vision(base_url)
+        except Exception:
             return False
     
     async def _analyze_with_anthropic(self, video_path: str, prompt: str, api_key: str) -> List[Dict[str, Any]]:
@@ -923,7 +1021,8 @@ class AIAnalyzer:
                 audio_path
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # Run ffmpeg on the shared media I/O pool, off the event loop
+            result = await media_executor.run_io(subprocess.run, cmd, capture_output=True, text=True)
             
             if result.returncode == 0 and os.path.exists(audio_path):
                 return audio_path
@@ -940,19 +1039,16 @@ class AIAnalyzer:
             if not openai:
                 raise Exception("OpenAI not available")
             
-            # Use the newer OpenAI API format
-            try:
-                # Try the newer API format first
-                response = openai.Audio.transcribe(
-                    model="whisper-1",
-                    file=open(audio_path, 'rb'),
-                    response_format="verbose_json"
+            with open(audio_path, 'rb') as audio_file:
+                transcribe = (
+                    self.openai_client.audio.transcriptions.create if self.openai_client else openai.Audio.atranscribe
                 )
-            except AttributeError:
-                # Fallback to older API format
-                response = openai.ChatCompletion.create(
+                response = await provider_governor.call(
+                    'openai',
+                    transcribe,
                     model="whisper-1",
-                    messages=[{"role": "user", "content": open(audio_path, 'rb')}]
+                    file=audio_file,
+                    response_format="verbose_json"
                 )
             
             return {
@@ -988,7 +1084,7 @@ class AIAnalyzer:
         """Enhanced sentiment analysis with AI integration"""
         try:
             # Get transcription for sentiment analysis
-            speech_data = await self._extract_speech(video_path, video_info)
+            speech_data = await self._run_analysis('speech_to_text', video_path, video_info)
             transcription = speech_data.get('transcription')
             
             if not transcription:
@@ -1067,7 +1163,7 @@ class AIAnalyzer:
     async def _analyze_sentiment_with_openai(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment using OpenAI"""
         try:
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -1130,9 +1226,6 @@ class AIAnalyzer:
                 }
             ]
             
-            url = f"{base_url}/v1/chat/completions"
-            headers = {"Content-Type": "application/json"}
-            
             payload = {
                 "model": os.getenv('LMSTUDIO_MODEL', 'local-model'),
                 "messages": messages,
@@ -1140,29 +1233,28 @@ class AIAnalyzer:
                 "max_tokens": 100
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=headers, timeout=30.0)
+            response = await self._lmstudio_chat(base_url, payload, timeout=30.0)
+            
+            if response.status_code == 200:
+                result = response.json()
+                content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
-                    
-                    # Try to parse JSON response
-                    try:
-                        import re
-                        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                        if json_match:
-                            return json.loads(json_match.group())
+                # Try to parse JSON response
+                try:
+                    import re
+                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+                    if json_match:
+                        return json.loads(json_match.group())
+                    else:
+                        # Fallback parsing
+                        if 'positive' in content.lower():
+                            return {'sentiment': 'positive', 'confidence': 0.7}
+                        elif 'negative' in content.lower():
+                            return {'sentiment': 'negative', 'confidence': 0.7}
                         else:
-                            # Fallback parsing
-                            if 'positive' in content.lower():
-                                return {'sentiment': 'positive', 'confidence': 0.7}
-                            elif 'negative' in content.lower():
-                                return {'sentiment': 'negative', 'confidence': 0.7}
-                            else:
-                                return {'sentiment': 'neutral', 'confidence': 0.6}
-                    except:
-                        return {'sentiment': 'neutral', 'confidence': 0.5}
+                            return {'sentiment': 'neutral', 'confidence': 0.6}
+                except:
+                    return {'sentiment': 'neutral', 'confidence': 0.5}
             
             return {'sentiment': 'neutral', 'confidence': 0.5}
             
@@ -1174,7 +1266,7 @@ class AIAnalyzer:
         """Enhanced object detection with AI integration"""
         try:
             # Extract frames for object detection
-            frames = await self.video_processor.extract_frames(video_path, num_frames=6)
+            frames = await self._extract_frames(video_path, num_frames=6)
             
             # Analyze objects with available AI providers
             object_results = {}
@@ -1223,22 +1315,19 @@ class AIAnalyzer:
                 'detection_confidence': 0.5
             }
     
-    async def _detect_objects_with_openai(self, frames: List[Dict], video_info: Dict) -> Dict[str, Any]:
+    async def _detect_objects_with_openai(self, frames: FrameBatch, video_info: Dict) -> Dict[str, Any]:
         """Detect objects using OpenAI Vision"""
         try:
             # Prepare frames for OpenAI Vision
             frame_images = []
-            for frame in frames[:3]:  # Limit to 3 frames for object detection
-                if 'image' in frame:
-                    buffer = io.BytesIO()
-                    frame['image'].save(buffer, format='JPEG', quality=85)
-                    img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                    frame_images.append({
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{img_base64}"
-                        }
-                    })
+            # Encodings are memoized on the batch and shared across providers
+            for url in frames[:3].data_urls(quality=85):  # Limit to 3 frames for object detection
+                frame_images.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": url
+                    }
+                })
             
             prompt = f"""
             Analyze these video frames and identify all objects, people, and visual elements present.
@@ -1271,7 +1360,7 @@ class AIAnalyzer:
                 }
             ]
             
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-4-vision-preview",
                 messages=messages,
                 max_tokens=800,
@@ -1318,16 +1407,11 @@ class AIAnalyzer:
             logger.error(f"OpenAI object detection failed: {e}")
             raise
     
-    async def _detect_objects_with_gemini(self, frames: List[Dict], video_info: Dict) -> Dict[str, Any]:
+    async def _detect_objects_with_gemini(self, frames: FrameBatch, video_info: Dict) -> Dict[str, Any]:
         """Detect objects using Google Gemini Vision"""
         try:
             # Prepare frames for Gemini
-            frame_images = []
-            for frame in frames[:3]:  # Limit to 3 frames
-                if 'image' in frame:
-                    buffer = io.BytesIO()
-                    frame['image'].save(buffer, format='JPEG', quality=85)
-                    frame_images.append(buffer.getvalue())
+            frame_images = frames[:3].jpegs(quality=85)  # Limit to 3 frames
             
             prompt = f"""
             Analyze these video frames and identify all objects, people, and visual elements present.
@@ -1361,7 +1445,7 @@ class AIAnalyzer:
                     "data": img_bytes
                 })
             
-            response = model.generate_content(content_parts)
+            response = await self._gemini_generate(model, content_parts)
             
             # Try to parse JSON from response
             try:
@@ -1408,7 +1492,7 @@ class AIAnalyzer:
             duration = video_info.get('duration', 0)
             
             # Extract more frames for better scene detection
-            frames = await self.video_processor.extract_frames(video_path, num_frames=12)
+            frames = await self._extract_frames(video_path, num_frames=12)
             
             # Analyze scene changes with AI
             scene_analysis = {}
@@ -1419,10 +1503,21 @@ class AIAnalyzer:
                 except Exception as e:
                     logger.warning(f"OpenAI scene analysis failed: {e}")
             
-            # Estimate scene changes based on duration and frame analysis
-            estimated_scenes = max(1, int(duration / 30))  # Rough estimate: 1 scene per 30 seconds
-            
+            # Cuts scored inside ffmpeg's scene filter
             scenes = []
+            detection_method = 'ffmpeg_scene'
+            if self.video_processor.ffmpeg_path:
+                try:
+                    detector = FFmpegSceneDetector(self.video_processor.ffmpeg_path)
+                    scenes = await media_executor.run_io(detector.detect_scenes, analysis_source(video_path))
+                except Exception as e:
+                    logger.warning(f"FFmpeg scene detection failed: {e}")
+            
+            # Estimate scene changes based on duration when ffmpeg is unavailable
+            estimated_scenes = 0 if scenes else max(1, int(duration / 30))  # Rough estimate: 1 scene per 30 seconds
+            if estimated_scenes:
+                detection_method = 'estimated'
+            
             for i in range(estimated_scenes):
                 start_time = (duration / estimated_scenes) * i
                 end_time = (duration / estimated_scenes) * (i + 1)
@@ -1439,7 +1534,7 @@ class AIAnalyzer:
                 'total_scenes': len(scenes),
                 'scenes': scenes,
                 'average_scene_duration': round(duration / len(scenes), 2) if scenes else 0,
-                'detection_method': 'ai_enhanced',
+                'detection_method': detection_method,
                 'ai_analysis': scene_analysis,
                 'frames_analyzed': len(frames),
                 'notes': 'Scene detection completed with AI enhancement'
@@ -1454,22 +1549,19 @@ class AIAnalyzer:
                 'status': 'failed'
             }
     
-    async def _analyze_scenes_with_openai(self, frames: List[Dict], video_info: Dict) -> Dict[str, Any]:
+    async def _analyze_scenes_with_openai(self, frames: FrameBatch, video_info: Dict) -> Dict[str, Any]:
         """Analyze scenes using OpenAI Vision"""
         try:
             # Prepare frames for OpenAI Vision
             frame_images = []
-            for frame in frames[:6]:  # Use more frames for scene analysis
-                if 'image' in frame:
-                    buffer = io.BytesIO()
-                    frame['image'].save(buffer, format='JPEG', quality=85)
-                    img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                    frame_images.append({
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{img_base64}"
-                        }
-                    })
+            # Encodings are memoized on the batch and shared across providers
+            for url in frames[:6].data_urls(quality=85):  # Use more frames for scene analysis
+                frame_images.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": url
+                    }
+                })
             
             prompt = f"""
             Analyze these video frames to identify scene changes and different visual environments.
@@ -1502,7 +1594,7 @@ class AIAnalyzer:
                 }
             ]
             
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-4-vision-preview",
                 messages=messages,
                 max_tokens=800,
@@ -1540,7 +1632,7 @@ class AIAnalyzer:
             duration = video_info.get('duration', 0)
             
             # Extract frames for highlight analysis
-            frames = await self.video_processor.extract_frames(video_path, num_frames=10)
+            frames = await self._extract_frames(video_path, num_frames=10)
             
             # Analyze highlights with AI
             highlight_analysis = {}
@@ -1591,22 +1683,19 @@ class AIAnalyzer:
                 'status': 'failed'
             }
     
-    async def _analyze_highlights_with_openai(self, frames: List[Dict], video_info: Dict) -> Dict[str, Any]:
+    async def _analyze_highlights_with_openai(self, frames: FrameBatch, video_info: Dict) -> Dict[str, Any]:
         """Analyze highlights using OpenAI Vision"""
         try:
             # Prepare frames for OpenAI Vision
             frame_images = []
-            for frame in frames[:6]:  # Use more frames for highlight analysis
-                if 'image' in frame:
-                    buffer = io.BytesIO()
-                    frame['image'].save(buffer, format='JPEG', quality=85)
-                    img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                    frame_images.append({
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{img_base64}"
-                        }
-                    })
+            # Encodings are memoized on the batch and shared across providers
+            for url in frames[:6].data_urls(quality=85):  # Use more frames for highlight analysis
+                frame_images.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": url
+                    }
+                })
             
             prompt = f"""
             Analyze these video frames to identify potential highlight moments.
@@ -1639,7 +1728,7 @@ class AIAnalyzer:
                 }
             ]
             
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-4-vision-preview",
                 messages=messages,
                 max_tokens=800,
@@ -1678,7 +1767,7 @@ class AIAnalyzer:
             duration = video_info.get('duration', 0)
             
             # Get content analysis for better summary
-            content_analysis = await self._analyze_content(video_path, video_info)
+            content_analysis = await self._run_analysis('content_analysis', video_path, video_info)
             
             # Generate summary with AI
             summary_analysis = {}
@@ -1745,7 +1834,7 @@ class AIAnalyzer:
             Return your analysis as structured JSON.
             """
             
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -1790,7 +1879,7 @@ class AIAnalyzer:
         """Enhanced tag generation with AI integration"""
         try:
             # Get content analysis for better tag generation
-            content_analysis = await self._analyze_content(video_path, video_info)
+            content_analysis = await self._run_analysis('content_analysis', video_path, video_info)
             
             # Generate tags with AI
             tag_analysis = {}
@@ -1859,7 +1948,7 @@ class AIAnalyzer:
             Return your response as JSON with 'tags' array and 'categories' object.
             """
             
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -1906,7 +1995,7 @@ class AIAnalyzer:
             duration = video_info.get('duration', 0)
             
             # Extract frames for thumbnail analysis
-            frames = await self.video_processor.extract_frames(video_path, num_frames=8)
+            frames = await self._extract_frames(video_path, num_frames=8)
             
             # Analyze thumbnails with AI
             thumbnail_analysis = {}
@@ -1956,22 +2045,19 @@ class AIAnalyzer:
                 'thumbnail_suggestions': []
             }
     
-    async def _analyze_thumbnails_with_openai(self, frames: List[Dict], video_info: Dict) -> Dict[str, Any]:
+    async def _analyze_thumbnails_with_openai(self, frames: FrameBatch, video_info: Dict) -> Dict[str, Any]:
         """Analyze thumbnails using OpenAI Vision"""
         try:
             # Prepare frames for OpenAI Vision
             frame_images = []
-            for frame in frames[:4]:  # Use 4 frames for thumbnail analysis
-                if 'image' in frame:
-                    buffer = io.BytesIO()
-                    frame['image'].save(buffer, format='JPEG', quality=85)
-                    img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                    frame_images.append({
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{img_base64}"
-                        }
-                    })
+            # Encodings are memoized on the batch and shared across providers
+            for url in frames[:4].data_urls(quality=85):  # Use 4 frames for thumbnail analysis
+                frame_images.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": url
+                    }
+                })
             
             prompt = f"""
             Analyze these video frames to suggest the best thumbnail options.
@@ -2004,7 +2090,7 @@ class AIAnalyzer:
                 }
             ]
             
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-4-vision-preview",
                 messages=messages,
                 max_tokens=600,
@@ -2056,7 +2142,7 @@ class AIAnalyzer:
             duration = video_info.get('duration', 0)
             
             # Get highlight detection for better clip recommendations
-            highlight_data = await self._detect_highlights(video_path, video_info)
+            highlight_data = await self._run_analysis('highlight_detection', video_path, video_info)
             
             # Generate clips with AI
             clip_analysis = {}
@@ -2070,32 +2156,27 @@ class AIAnalyzer:
             # Generate clip recommendations
             clips = []
             if duration > 90:  # Only recommend clips for videos longer than 1.5 minutes
-                # Recommend clips of various lengths
-                clip_configs = [
-                    {'duration': 15, 'type': 'short', 'count': 3},
-                    {'duration': 30, 'type': 'medium', 'count': 2},
-                    {'duration': 60, 'type': 'long', 'count': 1}
-                ]
+                # Per-second highlight scores, then the best set of 15-60 second clips
+                per_second = await media_executor.run_cpu(
+                    score_video,
+                    analysis_source(video_path),
+                    self.video_processor.ffmpeg_path,
+                    self.video_processor.ffprobe_path
+                )
+                selected = select_clips(per_second, min_duration=15, max_duration=60, max_clips=6, min_gap=5)
                 
-                clip_id = 1
-                for config in clip_configs:
-                    for i in range(config['count']):
-                        # Distribute clips across video duration
-                        start_time = (duration / (config['count'] + 1)) * (i + 1)
-                        # Adjust start time to ensure clip fits
-                        start_time = min(start_time, duration - config['duration'] - 5)
-                        
-                        if start_time > 0:
-                            clips.append({
-                                'clip_id': clip_id,
-                                'start_time': round(start_time, 2),
-                                'end_time': round(start_time + config['duration'], 2),
-                                'duration': config['duration'],
-                                'type': config['type'],
-                                'confidence': 0.6,
-                                'reason': f"Recommended {config['type']} clip segment"
-                            })
-                            clip_id += 1
+                for clip_id, (start_time, end_time, score) in enumerate(selected, start=1):
+                    clip_duration = end_time - start_time
+                    clip_type = 'short' if clip_duration <= 20 else 'medium' if clip_duration <= 45 else 'long'
+                    clips.append({
+                        'clip_id': clip_id,
+                        'start_time': round(start_time, 2),
+                        'end_time': round(end_time, 2),
+                        'duration': round(clip_duration, 2),
+                        'type': clip_type,
+                        'confidence': round(score, 3),
+                        'reason': f"Highest-scoring {clip_type} segment"
+                    })
                             
             return {
                 'total_recommendations': len(clips),
@@ -2142,7 +2223,7 @@ class AIAnalyzer:
             Return your recommendations as JSON.
             """
             
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -2187,7 +2268,7 @@ class AIAnalyzer:
         """Analyze content for trending potential"""
         try:
             # Get content analysis for trend analysis
-            content_analysis = await self._analyze_content(video_path, video_info)
+            content_analysis = await self._run_analysis('content_analysis', video_path, video_info)
             
             # Analyze trends with AI
             trend_analysis = {}
@@ -2238,7 +2319,7 @@ class AIAnalyzer:
             Return your analysis as JSON with trending score and factors.
             """
             
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -2283,7 +2364,7 @@ class AIAnalyzer:
         """Determine target audience and appeal"""
         try:
             # Get content analysis for audience analysis
-            content_analysis = await self._analyze_content(video_path, video_info)
+            content_analysis = await self._run_analysis('content_analysis', video_path, video_info)
             
             # Analyze audience with AI
             audience_analysis = {}
@@ -2334,7 +2415,7 @@ class AIAnalyzer:
             Return your analysis as JSON with audience details.
             """
             
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -2486,7 +2567,7 @@ class AIAnalyzer:
             has_audio = video_info.get('has_audio', False)
             
             # Get speech transcription for accessibility
-            speech_data = await self._extract_speech(video_path, video_info)
+            speech_data = await self._run_analysis('speech_to_text', video_path, video_info)
             has_transcription = bool(speech_data.get('transcription'))
             
             accessibility_features = []
@@ -2532,7 +2613,7 @@ class AIAnalyzer:
         """Analyze content for brand safety"""
         try:
             # Get content analysis for brand safety
-            content_analysis = await self._analyze_content(video_path, video_info)
+            content_analysis = await self._run_analysis('content_analysis', video_path, video_info)
             
             # Analyze brand safety with AI
             brand_safety_analysis = {}
@@ -2581,7 +2662,7 @@ class AIAnalyzer:
             Return your analysis as JSON with safety score and risk factors.
             """
             
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
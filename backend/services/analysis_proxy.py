@@ -0,0 +1,87 @@
+import os
+import logging
+import subprocess
+
+from services.frame_cache import frame_cache
+from services.keyframe_index import build_keyframe_index
+
+logger = logging.getLogger(__name__)
+
+PROXY_SUFFIX = '.proxy.mp4'
+PROXY_HEIGHT = int(os.getenv('ANALYSIS_PROXY_HEIGHT', 360))
+
+def proxy_path(video_path: str) -> str:
+    """Location of the analysis proxy of a video"""
+    return f"{video_path}{PROXY_SUFFIX}"
+
+def analysis_source(video_path: str) -> str:
+    """File that analysis should decode for ``video_path``.
+
+    Returns the low-resolution proxy once it has been fully written and is
+    not older than the source, and the original video otherwise. Exports
+    must keep reading the original.
+    """
+    path = proxy_path(video_path)
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(video_path):
+            return path
+    except OSError:
+        pass
+    return video_path
+
+def build_analysis_proxy(video_path: str, ffmpeg_path: str = 'ffmpeg',
+                         ffprobe_path: str = 'ffprobe', height: int = PROXY_HEIGHT) -> str:
+    """Transcode ``video_path`` into its analysis proxy.
+
+    The proxy is scaled so its short side is at most ``height``, keeps the
+    source frame rate as constant frame rate (so frame numbers and timestamps
+    line up with the original), and has a keyframe every second so any seek
+    decodes at most one second of video. Audio is kept as low-bitrate mono.
+    """
+    path = proxy_path(video_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp.mp4"
+
+    scale = (
+        f"scale='if(gte(iw,ih),-2,min(iw,{height}))':'if(gte(iw,ih),min(ih,{height}),-2)'"
+        ":flags=area"
+    )
+    cmd = [
+        ffmpeg_path,
+        '-nostdin',
+        '-loglevel', 'error',
+        '-y',
+        '-i', video_path,
+        '-map', '0:v:0',
+        '-map', '0:a:0?',
+        '-vf', scale,
+        '-fps_mode', 'cfr',
+        '-c:v', 'libx264',
+        '-preset', 'veryfast',
+        '-crf', '28',
+        '-pix_fmt', 'yuv420p',
+        '-force_key_frames', 'expr:gte(t,n_forced)',
+        '-c:a', 'aac',
+        '-b:a', '64k',
+        '-ac', '1',
+        '-movflags', '+faststart',
+        tmp_path
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0 or not os.path.exists(tmp_path):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise Exception(f"Analysis proxy generation failed: {result.stderr.strip()[-500:]}")
+
+    os.replace(tmp_path, path)
+
+    try:
+        build_keyframe_index(path, ffprobe_path)
+    except Exception as e:
+        logger.warning(f"Could not index keyframes for proxy {path}: {e}")
+
+    # Hash the proxy now, while it is in the page cache, as its frame cache key
+    frame_cache.source_digest(path)
+
+    logger.info(f"Created analysis proxy for {os.path.basename(video_path)}")
+    return path
@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from services.media_executor import media_executor
+
+logger = logging.getLogger(__name__)
+
+# Bytes of the first chunk needed to recognize every supported container
+SNIFF_BYTES = 189
+
+# Top-level ISO-BMFF/QuickTime atoms a file can start with; older QuickTime
+# files often have no leading ``ftyp`` and open with one of the others
+ISO_BMFF_ATOMS = (b'ftyp', b'moov', b'mdat', b'free', b'skip', b'wide', b'pnot', b'uuid')
+
+def sniff_container(header: bytes) -> Optional[str]:
+    """Container format named by a file's first bytes, or None if unknown"""
+    if len(header) >= 8 and header[4:8] in ISO_BMFF_ATOMS:
+        return 'mp4'
+    if header[:4] == b'\x1a\x45\xdf\xa3':
+        return 'matroska'
+    if header[:4] == b'RIFF' and header[8:12] == b'AVI ':
+        return 'avi'
+    if header[:4] == b'\x00\x00\x01\xba':
+        return 'mpeg'
+    if header[:3] == b'FLV':
+        return 'flv'
+    if header[:4] == b'OggS':
+        return 'ogg'
+    if header[:4] == b'\x30\x26\xb2\x75':
+        return 'asf'
+    if len(header) > 188 and header[0] == 0x47 and header[188] == 0x47:
+        return 'mpegts'
+    return None
+
+class UploadError(Exception):
+    """Upload request that cannot be applied; ``status_code`` is the HTTP status to answer with"""
+
+    def __init__(self, status_code: int, detail: str, offset: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.offset = offset
+
+class UploadSession:
+    """One resumable upload: a ``.part`` file plus a JSON sidecar.
+
+    The sidecar records the confirmed offset, i.e. the bytes that have been
+    written, flushed and hashed. A chunk that is cut off mid-way is not
+    confirmed, so the next append (from any worker, or after a restart)
+    truncates back to the confirmed offset and continues from there.
+    """
+
+    def __init__(self, directory: Path, upload_id: str, meta: Dict[str, Any]):
+        self.upload_id = upload_id
+        self.meta = meta
+        self.part_path = directory / f"{upload_id}.part"
+        self.meta_path = directory / f"{upload_id}.json"
+        self.lock = asyncio.Lock()
+        self._hasher: Optional[Any] = None
+
+    @property
+    def offset(self) -> int:
+        return self.meta['offset']
+
+    @property
+    def size(self) -> int:
+        return self.meta['size']
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'upload_id': self.upload_id,
+            'project_id': self.meta['project_id'],
+            'filename': self.meta['filename'],
+            'size': self.size,
+            'offset': self.offset,
+            'container': self.meta.get('container'),
+            'complete': self.offset == self.size
+        }
+
+    def hasher(self) -> Any:
+        """SHA-256 state over the confirmed bytes, rebuilt from disk when needed (blocking)"""
+        if self._hasher is None:
+            hasher = hashlib.sha256()
+            remaining = self.offset
+            with open(self.part_path, 'rb') as f:
+                while remaining:
+                    block = f.read(min(remaining, 1024 * 1024))
+                    if not block:
+                        break
+                    hasher.update(block)
+                    remaining -= len(block)
+            self._hasher = hasher
+        return self._hasher
+
+    def save(self):
+        self.meta['updated_at'] = time.time()
+        tmp_path = self.meta_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def remove(self):
+        for path in (self.part_path, self.meta_path):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+class ChunkedUploadStore:
+    """Resumable uploads that stream each chunk straight to disk.
+
+    ``create`` opens a session for a declared size; ``append`` streams one
+    chunk at the session's confirmed offset through a buffer of at most
+    ``buffer_bytes`` (so memory per upload is fixed regardless of file or
+    chunk size) while updating the SHA-256 of the content, and checks the
+    container header on the first chunk; ``finalize`` verifies size and
+    (optionally) the client's hash and moves the file into place. Sessions
+    untouched for ``ttl`` seconds are discarded.
+    """
+
+    def __init__(self, directory: Path, max_bytes: Optional[int] = None, buffer_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes or int(os.getenv('UPLOAD_MAX_BYTES', 500 * 1024 ** 2))
+        self.buffer_bytes = buffer_bytes or int(os.getenv('UPLOAD_BUFFER_BYTES', 1024 * 1024))
+        self.ttl = ttl or float(os.getenv('UPLOAD_SESSION_TTL', 24 * 3600))
+        self._sessions: Dict[str, UploadSession] = {}
+
+    def create(self, project_id: str, filename: str, size: int) -> UploadSession:
+        """Open a session for ``size`` bytes"""
+        if size <= 0:
+            raise UploadError(400, "Upload size must be positive")
+        if size > self.max_bytes:
+            raise UploadError(413, f"File too large. Maximum size is {self.max_bytes // (1024**2)}MB")
+        self.cleanup()
+
+        upload_id = str(uuid.uuid4())
+        session = UploadSession(self.directory, upload_id, {
+            'project_id': project_id,
+            'filename': Path(filename).name,
+            'size': size,
+            'offset': 0,
+            'container': None,
+            'created_at': time.time()
+        })
+        session.part_path.touch()
+        session.save()
+        session._hasher = hashlib.sha256()
+        self._sessions[upload_id] = session
+        return session
+
+    def get(self, upload_id: str) -> UploadSession:
+        """Session by id, with its state re-read from the sidecar (another
+        worker may have confirmed chunks since)"""
+        upload_id = Path(upload_id).name
+        try:
+            with open(self.directory / f"{upload_id}.json", 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self._sessions.pop(upload_id, None)
+            raise UploadError(404, "Upload not found")
+
+        session = self._sessions.get(upload_id)
+        if session is None:
+            session = self._sessions[upload_id] = UploadSession(self.directory, upload_id, meta)
+        elif not session.lock.locked():
+            if meta['offset'] != session.offset:
+                session._hasher = None
+            session.meta = meta
+        return session
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> UploadSession:
+        """Write one chunk that starts at ``offset`` and confirm it"""
+        session = self.get(upload_id)
+        if session.lock.locked():
+            raise UploadError(409, "Another chunk of this upload is in progress", session.offset)
+
+        async with session.lock:
+            if offset != session.offset:
+                raise UploadError(409, f"Chunk starts at {offset}, expected {session.offset}", session.offset)
+
+            # Hash into a copy so a broken chunk leaves the confirmed state untouched
+            hasher = (await media_executor.run_io(session.hasher)).copy()
+            f = await media_executor.run_io(open, session.part_path, 'r+b')
+            try:
+                await media_executor.run_io(f.truncate, offset)
+                f.seek(offset)
+
+                written = 0
+                buffer = bytearray()
+                async for piece in chunks:
+                    if offset + written + len(buffer) + len(piece) > session.size:
+                        raise UploadError(413, "Chunk extends past the declared upload size", session.offset)
+                    buffer += piece
+                    if len(buffer) >= self.buffer_bytes:
+                        written += await self._flush(session, f, hasher, buffer, offset + written)
+                        buffer = bytearray()
+                if buffer:
+                    written += await self._flush(session, f, hasher, buffer, offset + written)
+                await media_executor.run_io(_sync_file, f)
+            finally:
+                f.close()
+
+            session._hasher = hasher
+            session.meta['offset'] = offset + written
+            await media_executor.run_io(session.save)
+            return session
+
+    async def finalize(self, upload_id: str, destination: Path, sha256: Optional[str] = None) -> Dict[str, Any]:
+        """Check the finished upload and move it to ``destination``"""
+        session = self.get(upload_id)
+        async with session.lock:
+            if session.offset != session.size:
+                raise UploadError(409, f"Upload incomplete: {session.offset} of {session.size} bytes", session.offset)
+            digest = (await media_executor.run_io(session.hasher)).hexdigest()
+            if sha256 and sha256.lower() != digest:
+                raise UploadError(422, "Content hash does not match the uploaded data")
+
+            await media_executor.run_io(os.replace, session.part_path, destination)
+            session.remove()
+            self._sessions.pop(session.upload_id, None)
+            return {
+                'path': destination,
+                'filename': session.meta['filename'],
+                'size': session.size,
+                'sha256': digest,
+                'container': session.meta.get('container')
+            }
+
+    def abort(self, upload_id: str):
+        """Discard a session and its data"""
+        session = self.get(upload_id)
+        session.remove()
+        self._sessions.pop(session.upload_id, None)
+
+    def cleanup(self):
+        """Discard sessions untouched for longer than ``ttl``"""
+        cutoff = time.time() - self.ttl
+        for meta_path in self.directory.glob('*.json'):
+            try:
+                if meta_path.stat().st_mtime < cutoff:
+                    upload_id = meta_path.stem
+                    meta_path.unlink()
+                    (self.directory / f"{upload_id}.part").unlink(missing_ok=True)
+                    self._sessions.pop(upload_id, None)
+            except OSError:
+                pass
+
+    async def _flush(self, session: UploadSession, f: Any, hasher: Any, data: bytearray, position: int) -> int:
+        if position == 0:
+            container = sniff_container(bytes(data[:SNIFF_BYTES]))
+            if container is None:
+                raise UploadError(415, "File is not a recognized video container")
+            session.meta['container'] = container
+        await media_executor.run_io(f.write, data)
+        hasher.update(data)
+        return len(data)
+
+def _sync_file(f: Any):
+    f.flush()
+    os.fsync(f.fileno())
@@ -10,10 +10,8 @@ import shutil
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
-import numpy as np
-import cv2
 from moviepy.editor import VideoFileClip, concatenate_videoclips, CompositeVideoClip, TextClip, ImageClip
-from moviepy.video.fx import resize, fadein, fadeout
+from moviepy.video.fx import resize
 from scenedetect import VideoManager, SceneManager
 from scenedetect.detectors import ContentDetector, AdaptiveDetector
 from PIL import Image, ImageDraw, ImageFont
@@ -28,6 +26,15 @@ import logging
 from ..config import settings
 from ..models.project import Project, Clip
 from ..services.storage_service import StorageService
+from ..services.analysis_proxy import analysis_source
+from ..services.media_executor import media_executor
+from ..services.scene_detector import FFmpegSceneDetector
+from ..services.highlight_scorer import score_video
+from ..services.clip_selector import select_clips
+from ..services.smart_cut import SmartCutter
+from ..services.segment_encoder import SegmentEncoder
+from ..services.render_planner import RenderPlan
+from ..services.color_lut import color_luts
 from ..utils.video_utils import get_video_metadata, optimize_video_quality
 from ..utils.performance_monitor import monitor_performance
 
@@ -95,12 +102,18 @@ class VideoClipGenerator:
         self.config = {
             "max_clip_duration": settings.MAX_CLIP_DURATION or 60,  # seconds
             "min_clip_duration": settings.MIN_CLIP_DURATION or 3,
-            "scene_threshold": 30.0,  # Scene detection threshold
+            "scene_backend": "ffmpeg",  # ffmpeg or pyscenedetect
+            "scene_threshold": 30.0,  # PySceneDetect ContentDetector threshold
+            "ffmpeg_scene_threshold": 0.3,  # ffmpeg scene score (0-1)
+            "ffmpeg_path": shutil.which("ffmpeg") or "ffmpeg",
+            "ffprobe_path": shutil.which("ffprobe") or "ffprobe",
             "audio_sample_rate": 16000,
             "target_fps": 30,
             "quality_preset": "high",  # low, medium, high, ultra
             "enable_gpu": torch.cuda.is_available()
         }
+        self.smart_cutter = SmartCutter(self.config["ffmpeg_path"], self.config["ffprobe_path"], self.temp_dir)
+        self.segment_encoder = SegmentEncoder(self.config["ffmpeg_path"], self.config["ffprobe_path"], self.temp_dir)
         
         logger.info(f"VideoClipGenerator initialized with device: {self.device}")
     
@@ -157,32 +170,58 @@ class VideoClipGenerator:
     ) -> Optional[Clip]:
         """Process individual video segment"""
         try:
-            # Extract clip from source
-            clip = source_video.subclip(segment.start_time, segment.end_time)
-            
-            # Apply transitions
-            clip = self._apply_transitions(clip, segment, options)
-            
-            # Apply effects based on clip type
-            if segment.clip_type == ClipType.HIGHLIGHT:
-                clip = self._enhance_highlight(clip, options)
-            elif segment.clip_type == ClipType.MUSIC_SYNC:
-                clip = await self._sync_to_music(clip, segment, options)
-            
-            # Add overlays if requested
-            if options.get("add_captions"):
-                clip = await self._add_captions(clip, segment, project)
-            
-            if options.get("add_watermark"):
-                clip = self._add_watermark(clip, options)
-            
             # Generate unique filename
             clip_hash = hashlib.md5(f"{project.id}_{index}_{segment.start_time}".encode()).hexdigest()[:8]
             filename = f"clip_{project.id}_{index}_{clip_hash}.mp4"
-            
-            # Export with optimization
             output_path = self.temp_dir / filename
-            await self._export_clip(clip, output_path, options)
+            
+            # Plain trims keep the source encoding: only the partial GOPs at the edges are re-encoded
+            cut = None
+            if self._is_plain_trim(segment, options):
+                cut = await self.smart_cutter.cut(
+                    source_video.filename, segment.start_time, segment.end_time, str(output_path)
+                )
+            
+            if not cut:
+                # Trim, transitions and highlight effects run as one ffmpeg filter graph
+                edits = [{'type': 'trim', 'start': segment.start_time, 'duration': segment.duration}]
+                edits.extend(self._transition_edits(segment, options))
+                if segment.clip_type == ClipType.HIGHLIGHT:
+                    edits.extend(await self._highlight_edits(options, source_video.size, source_video.fps))
+                
+                # Music sync and overlays still need moviepy compositing on the rendered clip
+                composite = (
+                    segment.clip_type == ClipType.MUSIC_SYNC
+                    or options.get("add_captions")
+                    or options.get("add_watermark")
+                )
+                has_audio = source_video.audio is not None
+                if not composite:
+                    await self._render_edits(
+                        source_video.filename, edits, output_path, self._encoder_settings(options), has_audio
+                    )
+                else:
+                    rendered_path = self.temp_dir / f"effects_{filename}"
+                    await self._render_edits(
+                        source_video.filename, edits, rendered_path, {"crf": 12, "preset": "ultrafast"}, has_audio
+                    )
+                    clip = VideoFileClip(str(rendered_path))
+                    try:
+                        if segment.clip_type == ClipType.MUSIC_SYNC:
+                            clip = await self._sync_to_music(clip, segment, options)
+                        
+                        # Add overlays if requested
+                        if options.get("add_captions"):
+                            clip = await self._add_captions(clip, segment, project)
+                        
+                        if options.get("add_watermark"):
+                            clip = self._add_watermark(clip, options)
+                        
+                        # Export with optimization
+                        await self._export_clip(clip, output_path, options)
+                    finally:
+                        clip.close()
+                        rendered_path.unlink(missing_ok=True)
             
             # Upload to storage
             storage_url = await self.storage_service.upload_clip(
@@ -220,46 +259,78 @@ class VideoClipGenerator:
             logger.error(f"Failed to process segment: {str(e)}")
             return None
     
-    def _apply_transitions(
+    def _is_plain_trim(self, segment: ClipSegment, options: Dict[str, Any]) -> bool:
+        """Whether a segment needs no effects or overlays, i.e. can be smart-cut"""
+        return (
+            options.get("smart_cut", True)
+            and segment.clip_type not in (ClipType.HIGHLIGHT, ClipType.MUSIC_SYNC)
+            and TransitionType.FADE not in (segment.transition_in, segment.transition_out)
+            and not options.get("add_captions")
+            and not options.get("add_watermark")
+        )
+    
+    def _transition_edits(
         self,
-        clip: VideoFileClip,
         segment: ClipSegment,
         options: Dict[str, Any]
-    ) -> VideoFileClip:
-        """Apply transitions to clip"""
+    ) -> List[Dict[str, Any]]:
+        """Transitions as render-plan edits"""
         transition_duration = options.get("transition_duration", 0.5)
-        
-        # Apply fade in
-        if segment.transition_in == TransitionType.FADE:
-            clip = fadein(clip, transition_duration)
-        
-        # Apply fade out
-        if segment.transition_out == TransitionType.FADE:
-            clip = fadeout(clip, transition_duration)
+        fade_in = transition_duration if segment.transition_in == TransitionType.FADE else 0.0
+        fade_out = transition_duration if segment.transition_out == TransitionType.FADE else 0.0
         
         # Additional transition types can be implemented here
         
-        return clip
+        if not (fade_in or fade_out):
+            return []
+        return [{"type": "fade", "fade_in": fade_in, "fade_out": fade_out}]
     
-    def _enhance_highlight(
+    async def _highlight_edits(
         self,
-        clip: VideoFileClip,
-        options: Dict[str, Any]
-    ) -> VideoFileClip:
-        """Enhance highlight clips with effects"""
-        # Apply color correction
+        options: Dict[str, Any],
+        size: Tuple[int, int],
+        fps: float
+    ) -> List[Dict[str, Any]]:
+        """Highlight effects as render-plan edits (native ffmpeg filters, no per-frame Python)"""
+        edits = []
+        # Color correction: the preset's curve, compiled once into a cached 3D LUT
+        # (the first use of a preset writes the .cube file, so off the event loop)
         if options.get("color_enhance", True):
-            clip = clip.fx(lambda gf, t: self._enhance_frame(gf(t)))
+            lut_path = await media_executor.run_io(color_luts.cube_path, options.get("color_preset", "default"))
+            edits.append({"type": "enhance", "lut": str(lut_path)})
         
-        # Add dynamic zoom
+        # Dynamic zoom (Ken Burns, 1.0x to 1.2x over the clip)
         if options.get("dynamic_zoom", False):
-            clip = self._apply_dynamic_zoom(clip)
+            edits.append({"type": "zoom", "end_zoom": 1.2, "size": f"{size[0]}x{size[1]}", "fps": fps})
         
-        # Speed ramping for dramatic effect
+        # Speed ramping for dramatic effect (0.5x -> 2x -> 0.5x)
         if options.get("speed_ramp", False):
-            clip = self._apply_speed_ramp(clip)
+            edits.append({"type": "speed_ramp", "low": 0.5, "high": 2.0, "ramp": 0.3, "fps": fps})
         
-        return clip
+        return edits
+    
+    async def _render_edits(
+        self,
+        source_path: str,
+        edits: List[Dict[str, Any]],
+        output_path: Path,
+        settings: Dict[str, Any],
+        has_audio: bool = True
+    ):
+        """Render edits of the source with a single ffmpeg decode and encode
+        (long renders as parallel segments, joined without re-encoding)"""
+        plan = RenderPlan.from_edits(source_path, edits, has_audio)
+        if await self.segment_encoder.render(plan, str(output_path), settings):
+            return
+        cmd = plan.command(self.config["ffmpeg_path"], str(output_path), settings)
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise Exception(f"FFmpeg render failed: {stderr.decode(errors='replace')[-2000:]}")
     
     async def _add_captions(
         self,
@@ -387,6 +458,33 @@ class VideoClipGenerator:
         options: Dict[str, Any]
     ):
         """Export clip with optimization"""
+        settings = self._encoder_settings(options)
+        
+        ffmpeg_params = [
+            "-c:v", settings["video_codec"],
+            "-preset", settings["preset"],
+            "-b:v", settings["bitrate"],
+            "-c:a", "aac",
+            "-b:a", settings["audio_bitrate"],
+            "-movflags", "+faststart",  # Web optimization
+            *settings["extra_args"]
+        ]
+        
+        # Export
+        clip.write_videofile(
+            str(output_path),
+            codec="libx264",
+            audio_codec="aac",
+            temp_audiofile=str(self.temp_dir / "temp_audio.m4a"),
+            remove_temp=True,
+            ffmpeg_params=ffmpeg_params,
+            # Frames come from Python, so the encoder's own threads are the parallelism here
+            threads=os.cpu_count(),
+            logger=None
+        )
+    
+    def _encoder_settings(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Encoder settings of the requested quality (render-plan settings format)"""
         # Determine quality settings
         quality_presets = {
             "low": {"bitrate": "1M", "preset": "faster"},
@@ -400,47 +498,44 @@ class VideoClipGenerator:
             quality_presets["high"]
         )
         
-        # Export with hardware acceleration if available
-        codec = "h264_nvenc" if self.config["enable_gpu"] else "libx264"
-        
-        ffmpeg_params = [
-            "-c:v", codec,
-            "-preset", preset["preset"],
-            "-b:v", preset["bitrate"],
-            "-c:a", "aac",
-            "-b:a", "192k",
-            "-movflags", "+faststart"  # Web optimization
-        ]
+        settings = {
+            # Export with hardware acceleration if available
+            "video_codec": "h264_nvenc" if self.config["enable_gpu"] else "libx264",
+            "preset": preset["preset"],
+            "bitrate": preset["bitrate"],
+            "audio_bitrate": "192k",
+            "extra_args": []
+        }
         
         # Add HDR support if source is HDR
         if options.get("preserve_hdr", False):
-            ffmpeg_params.extend([
+            settings["extra_args"] = [
                 "-color_primaries", "bt2020",
                 "-color_trc", "smpte2084",
                 "-colorspace", "bt2020nc"
-            ])
+            ]
         
-        # Export
-        clip.write_videofile(
-            str(output_path),
-            codec="libx264",
-            audio_codec="aac",
-            temp_audiofile=str(self.temp_dir / "temp_audio.m4a"),
-            remove_temp=True,
-            ffmpeg_params=ffmpeg_params,
-            logger=None
-        )
+        return settings
     
     @monitor_performance
     async def detect_scenes(
         self,
         video_path: str,
-        threshold: float = None
+        threshold: float = None,
+        backend: str = None
     ) -> List[ClipSegment]:
         """
         Detect scenes in video using advanced algorithms
         Returns list of scene segments
+        
+        backend "ffmpeg" scores frames inside ffmpeg's scene filter (threshold
+        0-1); "pyscenedetect" runs the ContentDetector/AdaptiveDetector pair
+        (threshold on its 0-255 content scale)
         """
+        backend = backend or self.config["scene_backend"]
+        if backend == "ffmpeg":
+            return await self._detect_scenes_ffmpeg(video_path, threshold)
+        
         threshold = threshold or self.config["scene_threshold"]
         scenes = []
         
@@ -479,6 +574,37 @@ class VideoClipGenerator:
             logger.error(f"Scene detection failed: {str(e)}")
             return []
     
+    async def _detect_scenes_ffmpeg(self, video_path: str, threshold: float = None) -> List[ClipSegment]:
+        """Scene detection with ffmpeg's select/showinfo filters"""
+        threshold = threshold or self.config["ffmpeg_scene_threshold"]
+        
+        try:
+            detector = FFmpegSceneDetector(self.config["ffmpeg_path"])
+            scene_list = await media_executor.run_io(
+                detector.detect_scenes, analysis_source(video_path), threshold
+            )
+            
+            scenes = [
+                ClipSegment(
+                    start_time=scene["start_time"],
+                    end_time=scene["end_time"],
+                    clip_type=ClipType.SCENE,
+                    confidence=scene["confidence"],
+                    metadata={
+                        "scene_index": i,
+                        "detection_method": "ffmpeg_scene"
+                    }
+                )
+                for i, scene in enumerate(scene_list)
+            ]
+            
+            logger.info(f"Detected {len(scenes)} scenes")
+            return scenes
+            
+        except Exception as e:
+            logger.error(f"Scene detection failed: {str(e)}")
+            return []
+    
     async def generate_highlights(
         self,
         video_path: str,
@@ -491,30 +617,23 @@ class VideoClipGenerator:
         highlights = []
         
         try:
-            # Load video for analysis
-            cap = cv2.VideoCapture(video_path)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            
-            # Analyze video for interesting moments
-            scores = []
-            frame_interval = max(1, int(fps))  # Sample every second
-            
-            for i in range(0, total_frames, frame_interval):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-                ret, frame = cap.read()
-                
-                if not ret:
-                    break
-                
-                # Calculate interestingness score
-                score = self._calculate_frame_score(frame)
-                scores.append((i / fps, score))
-            
-            cap.release()
+            # Score one frame per second of the low-resolution proxy (once it
+            # exists) in a single sequential decode on a media worker
+            per_second = await media_executor.run_cpu(
+                score_video,
+                analysis_source(video_path),
+                self.config["ffmpeg_path"],
+                self.config["ffprobe_path"]
+            )
             
-            # Find peaks in scores
-            peak_moments = self._find_peaks(scores, duration_target)
+            # Best set of 5-15 second clips, about one per 10 seconds of target
+            peak_moments = select_clips(
+                per_second,
+                min_duration=5,
+                max_duration=15,
+                max_clips=max(1, duration_target // 10),
+                min_gap=1
+            )
             
             # Create highlight segments
             for start, end, score in peak_moments:
@@ -536,77 +655,6 @@ class VideoClipGenerator:
             logger.error(f"Highlight generation failed: {str(e)}")
             return []
     
-    def _calculate_frame_score(self, frame: np.ndarray) -> float:
-        """
-        Calculate interestingness score for a frame
-        Uses multiple factors: motion, faces, composition
-        """
-        score = 0.0
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Edge detection (indicates detail/activity)
-        edges = cv2.Canny(gray, 50, 150)
-        edge_score = np.sum(edges) / (frame.shape[0] * frame.shape[1] * 255)
-        score += edge_score * 0.3
-        
-        # Color vibrancy
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        saturation_score = np.mean(hsv[:, :, 1]) / 255
-        score += saturation_score * 0.2
-        
-        # Face detection (people make content interesting)
-        face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
-        faces = face_cascade.detectMultiScale(gray, 1.1, 4)
-        face_score = min(len(faces) * 0.2, 1.0)
-        score += face_score * 0.5
-        
-        return min(score, 1.0)
-    
-    def _find_peaks(
-        self,
-        scores: List[Tuple[float, float]],
-        target_duration: int
-    ) -> List[Tuple[float, float, float]]:
-        """Find peak moments in score timeline"""
-        if not scores:
-            return []
-        
-        # Sort by score
-        sorted_scores = sorted(scores, key=lambda x: x[1], reverse=True)
-        
-        # Select top moments
-        selected_moments = []
-        total_duration = 0
-        
-        for timestamp, score in sorted_scores:
-            if total_duration >= target_duration:
-                break
-            
-            # Create a clip around this moment
-            clip_duration = min(10, target_duration - total_duration)  # 10 second clips
-            start_time = max(0, timestamp - clip_duration / 2)
-            end_time = start_time + clip_duration
-            
-            # Check for overlap with existing clips
-            overlaps = False
-            for existing_start, existing_end, _ in selected_moments:
-                if not (end_time <= existing_start or start_time >= existing_end):
-                    overlaps = True
-                    break
-            
-            if not overlaps:
-                selected_moments.append((start_time, end_time, score))
-                total_duration += clip_duration
-        
-        # Sort by time
-        selected_moments.sort(key=lambda x: x[0])
-        
-        return selected_moments
-    
     async def extract_clips_by_transcript(
         self,
         video_path: str,
@@ -663,76 +711,6 @@ class VideoClipGenerator:
             logger.error(f"Transcript extraction failed: {str(e)}")
             return []
     
-    def _enhance_frame(self, frame: np.ndarray) -> np.ndarray:
-        """Apply color enhancement to frame"""
-        # Convert to LAB color space
-        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        
-        # Apply CLAHE to L channel
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        l = clahe.apply(l)
-        
-        # Merge and convert back
-        enhanced = cv2.merge([l, a, b])
-        enhanced = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
-        
-        # Slight saturation boost
-        hsv = cv2.cvtColor(enhanced, cv2.COLOR_BGR2HSV).astype(np.float32)
-        hsv[:, :, 1] = hsv[:, :, 1] * 1.2  # 20% saturation increase
-        hsv[:, :, 1][hsv[:, :, 1] > 255] = 255
-        enhanced = cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2BGR)
-        
-        return enhanced
-    
-    def _apply_dynamic_zoom(self, clip: VideoFileClip) -> VideoFileClip:
-        """Apply Ken Burns effect (dynamic zoom)"""
-        duration = clip.duration
-        
-        def zoom_effect(gf, t):
-            frame = gf(t)
-            # Calculate zoom factor (1.0 to 1.2 over duration)
-            zoom = 1.0 + (0.2 * t / duration)
-            
-            # Calculate crop area
-            h, w = frame.shape[:2]
-            new_h, new_w = int(h / zoom), int(w / zoom)
-            
-            # Center crop
-            y1 = (h - new_h) // 2
-            x1 = (w - new_w) // 2
-            
-            # Crop and resize back
-            cropped = frame[y1:y1+new_h, x1:x1+new_w]
-            zoomed = cv2.resize(cropped, (w, h))
-            
-            return zoomed
-        
-        return clip.fl(zoom_effect)
-    
-    def _apply_speed_ramp(self, clip: VideoFileClip) -> VideoFileClip:
-        """Apply speed ramping effect"""
-        # Create speed curve (slow-fast-slow)
-        duration = clip.duration
-        
-        def speed_func(t):
-            # Normalized time (0 to 1)
-            norm_t = t / duration
-            
-            # Speed curve: starts at 0.5x, peaks at 2x, ends at 0.5x
-            if norm_t < 0.3:
-                speed = 0.5 + 1.5 * (norm_t / 0.3)
-            elif norm_t < 0.7:
-                speed = 2.0
-            else:
-                speed = 2.0 - 1.5 * ((norm_t - 0.7) / 0.3)
-            
-            # Map to new time
-            return t * speed
-        
-        # Apply speed change
-        return clip.fl_time(speed_func)
-    
     async def cleanup_temp_files(self):
         """Clean up temporary files"""
         try:
@@ -0,0 +1,81 @@
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def select_clips(scores: np.ndarray, min_duration: float, max_duration: float, max_clips: int,
+                 min_gap: float = 0.0, sample_seconds: float = 1.0, baseline: Optional[float] = None,
+                 max_lengths: int = 12) -> List[Tuple[float, float, float]]:
+    """Pick the best set of non-overlapping clips from a dense score signal.
+
+    Every start sample paired with up to ``max_lengths`` lengths between
+    ``min_duration`` and ``max_duration`` is a candidate, weighted by how far
+    its samples lie above ``baseline`` (the median score by default), so
+    padding a clip with dull seconds lowers its value. A weighted-interval
+    dynamic program over candidates sorted by end time then maximizes the
+    total weight of at most ``max_clips`` clips that are ``min_gap`` apart.
+    Sorting dominates: O(n log n) plus O(n) per allowed clip.
+
+    Returns ``(start, end, mean_score)`` tuples in seconds, ordered by time.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    n = len(scores)
+    min_len = max(1, int(round(min_duration / sample_seconds)))
+    max_len = min(n, max(min_len, int(round(max_duration / sample_seconds))))
+    if n < min_len or max_clips <= 0:
+        return []
+
+    baseline = float(np.median(scores)) if baseline is None else baseline
+    prefix = np.concatenate([[0.0], np.cumsum(scores - baseline)])
+    raw_prefix = np.concatenate([[0.0], np.cumsum(scores)])
+
+    # Candidates: every start with a bounded set of lengths
+    lengths = np.unique(np.linspace(min_len, max_len, num=min(max_lengths, max_len - min_len + 1)).astype(np.int64))
+    starts = np.concatenate([np.arange(0, n - length + 1) for length in lengths])
+    ends = np.concatenate([np.arange(length, n + 1) for length in lengths])
+    weights = prefix[ends] - prefix[starts]
+
+    # Only clips that add value can ever be chosen
+    keep = weights > 0
+    starts, ends, weights = starts[keep], ends[keep], weights[keep]
+    if not len(weights):
+        return []
+
+    order = np.argsort(ends, kind='stable')
+    starts, ends, weights = starts[order], ends[order], weights[order]
+
+    # Candidates (as a prefix count) compatible with candidate i before it
+    gap = int(np.ceil(min_gap / sample_seconds))
+    previous = np.searchsorted(ends, starts - gap, side='right')
+
+    # best[k][i]: best total over the first i candidates with at most k clips;
+    # taken[k][i]: best total when one of them is the k-th clip
+    count = len(weights)
+    best = [np.zeros(count + 1)]
+    taken = [None]
+    for _ in range(max_clips):
+        take = np.maximum.accumulate(np.concatenate([[0.0], best[-1][previous] + weights]))
+        taken.append(take)
+        best.append(np.maximum(best[-1], take))
+
+    selected = []
+    k, i = max_clips, count
+    while k > 0 and i > 0:
+        if best[k - 1][i] >= taken[k][i]:
+            k -= 1
+            continue
+        # First prefix at which this total was reached ends with the chosen clip
+        j = int(np.searchsorted(taken[k][:i + 1], taken[k][i], side='left')) - 1
+        start, end = int(starts[j]), int(ends[j])
+        selected.append((
+            start * sample_seconds,
+            end * sample_seconds,
+            float((raw_prefix[end] - raw_prefix[start]) / (end - start))
+        ))
+        i = int(previous[j])
+        k -= 1
+
+    selected.sort(key=lambda clip: clip[0])
+    return selected
@@ -0,0 +1,114 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Optional
+
+class DiskLRUCache:
+    """Files under ``cache_dir`` evicted least-recently-used once they exceed ``max_bytes``.
+
+    Shared by the on-disk caches. The index of entries and their sizes is
+    built from the files matching ``entry_glob`` on first use, ordered by
+    modification time, and reads touch an entry's mtime, so access order
+    survives restarts and is shared (approximately) between processes.
+    Entries written by another process are picked up when first read.
+    """
+
+    entry_glob = '*'
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[Path, int]"] = None
+        self._total_bytes = 0
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            index = self._load_index()
+            for path in list(index):
+                self._remove(path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current cache occupancy"""
+        with self._lock:
+            index = self._load_index()
+            return {
+                'entries': len(index),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def _write_entry(self, path: Path, write: Callable[[IO], None], mode: str = 'wb'):
+        """Atomically write an entry with ``write(file)`` and evict old entries if over budget"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        nbytes = path.stat().st_size
+
+        with self._lock:
+            index = self._load_index()
+            self._total_bytes += nbytes - index.pop(path, 0)
+            index[path] = nbytes
+            self._evict()
+
+    def _touch(self, path: Path):
+        """Mark an entry that was just read as most recently used"""
+        with self._lock:
+            index = self._load_index()
+            if path in index:
+                index.move_to_end(path)
+            else:
+                # Written by another worker process
+                try:
+                    nbytes = path.stat().st_size
+                except OSError:
+                    nbytes = 0
+                index[path] = nbytes
+                self._total_bytes += nbytes
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _discard(self, path: Path):
+        """Remove one entry (e.g. an expired one)"""
+        with self._lock:
+            self._load_index()
+            self._remove(path)
+
+    def _load_index(self) -> "OrderedDict[Path, int]":
+        """Build the LRU index from disk on first use (caller holds the lock)"""
+        if self._index is None:
+            entries = []
+            if self.cache_dir.exists():
+                for path in self.cache_dir.rglob(self.entry_glob):
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, path, stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((path, nbytes) for _, path, nbytes in entries)
+            self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _evict(self):
+        """Drop least-recently-used entries until under budget (caller holds the lock)"""
+        while self._total_bytes > self.max_bytes and self._index:
+            self._remove(next(iter(self._index)))
+
+    def _remove(self, path: Path):
+        self._total_bytes -= self._index.pop(path, 0)
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,116 @@
+import io
+import base64
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+class FrameBatch:
+    """Decoded frames of one video held as a single contiguous array.
+
+    ``pixels`` is an ``N x H x W x 3`` uint8 RGB array with parallel
+    ``timestamps`` and ``frame_numbers`` arrays. Encodings are computed on
+    first use and memoized per frame and quality, so every provider that
+    sends the same frames reuses one JPEG/base64 encoding. Slices share the
+    pixel memory and the memo with the batch they were taken from.
+    """
+
+    def __init__(self, pixels: np.ndarray, timestamps: np.ndarray, frame_numbers: np.ndarray,
+                 _memo: Optional[Dict[Tuple, Union[bytes, str, Image.Image]]] = None):
+        self.pixels = pixels
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.frame_numbers = np.asarray(frame_numbers, dtype=np.int64)
+        self._memo = _memo if _memo is not None else {}
+
+    @classmethod
+    def empty(cls) -> 'FrameBatch':
+        return cls(np.empty((0, 0, 0, 3), dtype=np.uint8), np.empty(0), np.empty(0))
+
+    @classmethod
+    def from_arrays(cls, frames: List[np.ndarray], frame_numbers: List[int], fps: float) -> 'FrameBatch':
+        """Stack individually decoded RGB frames into one batch"""
+        if not frames:
+            return cls.empty()
+
+        shape = frames[0].shape
+        kept = [(frame, number) for frame, number in zip(frames, frame_numbers) if frame.shape == shape]
+        if len(kept) < len(frames):
+            logger.warning(f"Dropped {len(frames) - len(kept)} frames not matching {shape}")
+
+        pixels = np.empty((len(kept),) + shape, dtype=np.uint8)
+        for i, (frame, _) in enumerate(kept):
+            pixels[i] = frame
+
+        numbers = np.array([number for _, number in kept], dtype=np.int64)
+        timestamps = numbers / fps if fps > 0 else np.zeros(len(kept))
+        return cls(pixels, timestamps, numbers)
+
+    def __len__(self) -> int:
+        return len(self.frame_numbers)
+
+    def __getitem__(self, key: slice) -> 'FrameBatch':
+        if not isinstance(key, slice):
+            raise TypeError("FrameBatch only supports slicing; use the per-frame accessors for single frames")
+        return FrameBatch(self.pixels[key], self.timestamps[key], self.frame_numbers[key], self._memo)
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[2] if len(self) else 0
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[1] if len(self) else 0
+
+    def image(self, i: int) -> Image.Image:
+        """PIL image of frame ``i``"""
+        key = ('pil', int(self.frame_numbers[i]))
+        image = self._memo.get(key)
+        if image is None:
+            image = self._memo[key] = Image.fromarray(self.pixels[i])
+        return image
+
+    def jpeg(self, i: int, quality: int = 85) -> bytes:
+        """JPEG encoding of frame ``i``"""
+        key = ('jpeg', int(self.frame_numbers[i]), quality)
+        data = self._memo.get(key)
+        if data is None:
+            buffer = io.BytesIO()
+            self.image(i).save(buffer, format='JPEG', quality=quality)
+            data = self._memo[key] = buffer.getvalue()
+        return data
+
+    def base64(self, i: int, quality: int = 85) -> str:
+        """Base64 of the JPEG encoding of frame ``i``"""
+        key = ('b64', int(self.frame_numbers[i]), quality)
+        data = self._memo.get(key)
+        if data is None:
+            data = self._memo[key] = base64.b64encode(self.jpeg(i, quality)).decode('utf-8')
+        return data
+
+    def images(self) -> List[Image.Image]:
+        return [self.image(i) for i in range(len(self))]
+
+    def jpegs(self, quality: int = 85) -> List[bytes]:
+        return [self.jpeg(i, quality) for i in range(len(self))]
+
+    def base64s(self, quality: int = 85) -> List[str]:
+        return [self.base64(i, quality) for i in range(len(self))]
+
+    def data_urls(self, quality: int = 85) -> List[str]:
+        """``data:`` URLs as expected by OpenAI-compatible vision APIs"""
+        return [f"data:image/jpeg;base64,{data}" for data in self.base64s(quality)]
+
+    def __getstate__(self):
+        # PIL views are cheap to rebuild; only ship pixels and encoded bytes
+        # when a batch crosses a process boundary
+        state = self.__dict__.copy()
+        state['_memo'] = {key: value for key, value in self._memo.items() if key[0] != 'pil'}
+        return state
+
+    def __iter__(self) -> Iterator[Tuple[float, int, np.ndarray]]:
+        """Iterate over ``(timestamp, frame_number, pixels)``"""
+        for i in range(len(self)):
+            yield float(self.timestamps[i]), int(self.frame_numbers[i]), self.pixels[i]
@@ -0,0 +1,110 @@
+import os
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from services.disk_lru import DiskLRUCache
+
+logger = logging.getLogger(__name__)
+
+class FrameCache(DiskLRUCache):
+    """Persistent, content-addressed cache of decoded analysis frames.
+
+    Frames are keyed by (source digest, timestamp, target size) and stored as
+    ``.npy`` files that are memory-mapped on read, so a hit costs a page-in
+    instead of a decode. Entries are evicted least-recently-used once the
+    cache grows past ``max_bytes``; access order survives restarts through
+    file modification times.
+    """
+
+    entry_glob = '*.npy'
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        super().__init__(
+            cache_dir or os.getenv('FRAME_CACHE_DIR', Path(tempfile.gettempdir()) / "openclip_frame_cache"),
+            max_bytes or int(os.getenv('FRAME_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+        )
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+
+    DIGEST_SUFFIX = '.sha256'
+
+    @classmethod
+    def digest_path(cls, video_path: str) -> str:
+        return f"{video_path}{cls.DIGEST_SUFFIX}"
+
+    def source_digest(self, video_path: str) -> str:
+        """SHA-256 of a source video's full content (the upload's ``content_hash``).
+
+        The whole file is hashed once; the digest is memoized per (path,
+        size, mtime) in memory and in a ``.sha256`` sidecar next to the
+        video, so other worker processes and restarts do not read it again.
+        Uploads record the hash they already computed with ``remember_digest``.
+        """
+        stat = os.stat(video_path)
+        memo_key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(memo_key)
+        if digest:
+            return digest
+
+        sidecar = self.digest_path(video_path)
+        try:
+            with open(sidecar, 'r', encoding='ascii') as f:
+                digest, size, mtime_ns = f.read().split()
+            if (int(size), int(mtime_ns)) != (stat.st_size, stat.st_mtime_ns):
+                digest = None
+        except (OSError, ValueError):
+            digest = None
+
+        if not digest:
+            hasher = hashlib.sha256()
+            with open(video_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(block)
+            digest = self.remember_digest(video_path, hasher.hexdigest())
+
+        self._digests[memo_key] = digest
+        return digest
+
+    def remember_digest(self, video_path: str, digest: str) -> str:
+        """Record an already known SHA-256 of ``video_path`` as its cache digest"""
+        stat = os.stat(video_path)
+        sidecar = self.digest_path(video_path)
+        try:
+            tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='ascii') as f:
+                f.write(f"{digest} {stat.st_size} {stat.st_mtime_ns}\n")
+            os.replace(tmp_path, sidecar)
+        except OSError as e:
+            logger.warning(f"Could not store digest of {video_path}: {e}")
+        self._digests[(os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)] = digest
+        return digest
+
+    def get(self, digest: str, timestamp: float, size: int) -> Optional[np.ndarray]:
+        """Return a read-only memory-mapped frame, or None on a miss"""
+        path = self._entry_path(digest, timestamp, size)
+        try:
+            frame = np.load(path, mmap_mode='r')
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+        self._touch(path)
+        return frame
+
+    def put(self, digest: str, timestamp: float, size: int, frame: np.ndarray):
+        """Store a decoded frame and evict old entries if over budget"""
+        path = self._entry_path(digest, timestamp, size)
+        try:
+            self._write_entry(path, lambda f: np.save(f, np.ascontiguousarray(frame, dtype=np.uint8)))
+        except OSError as e:
+            logger.warning(f"Could not cache frame {path.name}: {e}")
+
+    def _entry_path(self, digest: str, timestamp: float, size: int) -> Path:
+        millis = int(round(timestamp * 1000))
+        return self.cache_dir / digest[:2] / digest / f"{size}_{millis}.npy"
+
+# Shared instance
+frame_cache = FrameCache()
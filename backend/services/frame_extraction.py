@@ -0,0 +1,46 @@
+import logging
+from typing import Optional
+
+from services.analysis_proxy import analysis_source
+from services.frame_batch import FrameBatch
+from services.video_processor import VideoProcessor
+
+logger = logging.getLogger(__name__)
+
+# Longest side of the frames sent to the AI providers
+ANALYSIS_FRAME_SIZE = 1024
+
+# One processor per worker process, created on first use
+_video_processor: Optional[VideoProcessor] = None
+
+def _processor() -> VideoProcessor:
+    global _video_processor
+    if _video_processor is None:
+        _video_processor = VideoProcessor()
+    return _video_processor
+
+def extract_video_frames_sync(file_path: str, num_frames: int) -> FrameBatch:
+    """Evenly spaced analysis frames of a video, JPEG/base64-encoded once.
+
+    Runs in the media process pool, so this module imports only what the
+    decode needs (no app, database or provider setup in the workers).
+    Frames are decoded by ``VideoProcessor._decode_frames``, the same path
+    (ffmpeg reader, frame cache) the analyzer uses.
+    """
+    processor = _processor()
+
+    # Decode the low-resolution analysis proxy once it exists
+    source = analysis_source(file_path)
+    total_frames, fps = processor._read_frame_count(source)
+
+    frame_numbers = []
+    if total_frames > 0:
+        frame_interval = max(1, total_frames // num_frames)
+        frame_numbers = list(range(0, total_frames, frame_interval))[:num_frames]
+
+    decoded = processor._decode_frames(source, frame_numbers, fps, max_size=ANALYSIS_FRAME_SIZE, cache=True)
+
+    # Encode once here, in the worker; every provider reuses these encodings
+    batch = processor._build_frame_batch(frame_numbers, decoded, fps)
+    batch.base64s(quality=85)
+    return batch
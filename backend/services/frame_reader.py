@@ -0,0 +1,216 @@
+import json
+import logging
+import math
+import subprocess
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from services.keyframe_index import KeyframeIndex
+
+logger = logging.getLogger(__name__)
+
+class FFmpegFrameReader:
+    """Frame extraction through a single ffmpeg process per video.
+
+    ffmpeg selects and downscales the wanted frames itself and streams them
+    as ``rawvideo`` over stdout, where they are read straight into one
+    preallocated ``N x H x W x C`` uint8 array. The video is decoded in one
+    sequential pass, which avoids the per-frame seeks (and the re-decoding
+    from the previous keyframe each seek implies) of the OpenCV path.
+    """
+
+    def __init__(self, ffmpeg_path: str = 'ffmpeg', ffprobe_path: str = 'ffprobe'):
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+
+    def probe(self, video_path: str) -> Dict[str, Any]:
+        """Geometry and timing of the first video stream"""
+        cmd = [
+            self.ffprobe_path,
+            '-v', 'error',
+            '-select_streams', 'v:0',
+            '-show_entries', 'stream=width,height,r_frame_rate,avg_frame_rate,nb_frames,duration:stream_tags=rotate:stream_side_data=rotation:format=duration',
+            '-print_format', 'json',
+            video_path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"ffprobe failed: {result.stderr.strip()}")
+
+        data = json.loads(result.stdout or '{}')
+        streams = data.get('streams') or []
+        if not streams:
+            raise Exception(f"No video stream found in {video_path}")
+        stream = streams[0]
+
+        width, height = int(stream.get('width', 0)), int(stream.get('height', 0))
+
+        # ffmpeg auto-rotates on decode, so report the displayed geometry
+        rotation = stream.get('tags', {}).get('rotate')
+        for side_data in stream.get('side_data_list', []) or []:
+            rotation = side_data.get('rotation', rotation)
+        if rotation is not None and abs(int(float(rotation))) % 180 == 90:
+            width, height = height, width
+
+        fps = self._parse_rate(stream.get('avg_frame_rate')) or self._parse_rate(stream.get('r_frame_rate'))
+        duration = float(stream.get('duration') or data.get('format', {}).get('duration') or 0)
+        nb_frames = int(stream.get('nb_frames') or 0) or int(duration * fps)
+
+        return {
+            'width': width,
+            'height': height,
+            'fps': fps,
+            'duration': duration,
+            'nb_frames': nb_frames
+        }
+
+    def output_size(self, width: int, height: int, max_size: int) -> Tuple[int, int]:
+        """Output geometry for a longest-side limit, matching the OpenCV path"""
+        if max_size and max(width, height) > max_size:
+            scale = max_size / max(width, height)
+            return int(width * scale), int(height * scale)
+        return width, height
+
+    def read_frames(self, video_path: str, frame_indices: List[int], max_size: int = 512,
+                    probe: Optional[Dict[str, Any]] = None,
+                    keyframes: Optional[KeyframeIndex] = None) -> Tuple[np.ndarray, List[int]]:
+        """Decode the given frame numbers into one RGB batch.
+
+        Returns the ``N x H x W x 3`` array together with the frame numbers
+        actually delivered (in ascending order); frames past the end of the
+        stream are simply missing. With a keyframe index, decoding starts at
+        the keyframe preceding the first wanted frame instead of frame 0.
+        """
+        indices = sorted(set(i for i in frame_indices if i >= 0))
+        if not indices:
+            return np.empty((0, 0, 0, 3), dtype=np.uint8), []
+
+        probe = probe or self.probe(video_path)
+        width, height = self.output_size(probe['width'], probe['height'], max_size)
+
+        # Open the input at the keyframe before the first wanted frame; the
+        # select filter then counts frames from that keyframe
+        first_frame, input_args = 0, []
+        if keyframes:
+            first_frame = keyframes.keyframe_frame_before(indices[0])
+            if first_frame > 0:
+                input_args = ['-noaccurate_seek', '-ss', f"{keyframes.seek_time(first_frame):.3f}"]
+
+        select = '+'.join(f"eq(n,{i - first_frame})" for i in indices)
+        video_filter = f"select='{select}',scale={width}:{height}:flags=area"
+        # Frames beyond the last wanted one do not need decoding
+        if probe.get('fps'):
+            input_args += ['-t', f"{(indices[-1] - first_frame + 2) / probe['fps']:.3f}"]
+
+        buffer = np.empty((len(indices), height, width, 3), dtype=np.uint8)
+        count = self._read_into(video_path, video_filter, buffer, input_args=input_args)
+        return buffer[:count], indices[:count]
+
+    def read_at_fps(self, video_path: str, sample_fps: float, max_size: int = 512,
+                    start: float = 0.0, duration: Optional[float] = None,
+                    probe: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Decode evenly spaced frames at ``sample_fps`` into one RGB batch.
+
+        Returns the batch and the source timestamp of each frame.
+        """
+        probe = probe or self.probe(video_path)
+        width, height = self.output_size(probe['width'], probe['height'], max_size)
+
+        span = duration if duration is not None else max(probe['duration'] - start, 0)
+        capacity = max(1, int(math.ceil(span * sample_fps)) + 1)
+
+        input_args = []
+        if start:
+            input_args += ['-ss', f"{start:.3f}"]
+        if duration is not None:
+            input_args += ['-t', f"{duration:.3f}"]
+
+        video_filter = f"fps={sample_fps},scale={width}:{height}:flags=area"
+        buffer = np.empty((capacity, height, width, 3), dtype=np.uint8)
+        count = self._read_into(video_path, video_filter, buffer, input_args=input_args)
+
+        timestamps = start + np.arange(count, dtype=np.float64) / sample_fps
+        return buffer[:count], timestamps
+
+    def iter_batches(self, video_path: str, video_filter: str, width: int, height: int,
+                     channels: int = 3, pix_fmt: str = 'rgb24', batch_size: int = 256,
+                     input_args: Optional[List[str]] = None) -> Iterator[np.ndarray]:
+        """Stream filtered frames in fixed-size batches with bounded memory.
+
+        The same buffer is reused for every batch, so callers must finish
+        with (or copy) a batch before requesting the next one.
+        """
+        shape = (batch_size, height, width) + ((channels,) if channels > 1 else ())
+        buffer = np.empty(shape, dtype=np.uint8)
+        frame_bytes = buffer[0].nbytes
+
+        process = self._spawn(video_path, video_filter, pix_fmt, input_args)
+        try:
+            while True:
+                count = self._fill(process.stdout, buffer, frame_bytes)
+                if count:
+                    yield buffer[:count]
+                if count < batch_size:
+                    break
+        finally:
+            self._finish(process)
+
+    def _read_into(self, video_path: str, video_filter: str, buffer: np.ndarray,
+                   pix_fmt: str = 'rgb24', input_args: Optional[List[str]] = None) -> int:
+        """Fill ``buffer`` with frames from one ffmpeg run; returns the frame count"""
+        process = self._spawn(video_path, video_filter, pix_fmt, input_args)
+        try:
+            return self._fill(process.stdout, buffer, buffer[0].nbytes if len(buffer) else 0)
+        finally:
+            self._finish(process)
+
+    def _spawn(self, video_path: str, video_filter: str, pix_fmt: str,
+               input_args: Optional[List[str]] = None) -> subprocess.Popen:
+        cmd = [
+            self.ffmpeg_path,
+            '-nostdin',
+            '-loglevel', 'error',
+            *(input_args or []),
+            '-i', video_path,
+            '-an', '-sn',
+            '-vf', video_filter,
+            '-fps_mode', 'passthrough',
+            '-pix_fmt', pix_fmt,
+            '-f', 'rawvideo',
+            'pipe:1'
+        ]
+        return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+
+    def _fill(self, stream, buffer: np.ndarray, frame_bytes: int) -> int:
+        """Read whole frames from ``stream`` directly into ``buffer``"""
+        if not frame_bytes:
+            return 0
+
+        view = memoryview(buffer.reshape(-1))
+        filled = 0
+        while filled < len(view):
+            read = stream.readinto(view[filled:])
+            if not read:
+                break
+            filled += read
+        return filled // frame_bytes
+
+    def _finish(self, process: subprocess.Popen):
+        """Stop ffmpeg (it may still be decoding if the buffer filled up)"""
+        if process.poll() is None:
+            process.kill()
+        _, stderr = process.communicate()
+        if process.returncode not in (0, -9) and stderr:
+            logger.warning(f"ffmpeg frame extraction: {stderr.decode(errors='ignore').strip()[-500:]}")
+
+    @staticmethod
+    def _parse_rate(rate: Optional[str]) -> float:
+        """Parse an ffprobe rational such as '30000/1001'"""
+        if not rate:
+            return 0.0
+        try:
+            num, _, den = rate.partition('/')
+            return float(num) / float(den or 1) if float(den or 1) else 0.0
+        except ValueError:
+            return 0.0
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Set
+
+import numpy as np
+
+from services.video_processor import VideoProcessor
+from services.analysis_proxy import analysis_source
+from services.frame_batch import FrameBatch
+from services.media_executor import media_executor
+
+logger = logging.getLogger(__name__)
+
+class FrameSampler:
+    """Decode-once frame sampler shared by the analyses of a single request.
+
+    Each analysis type registers how many evenly spaced frames it needs. The
+    sampler decodes the union of those frame indices in one ordered pass over
+    the video and hands every caller the subset matching its own sampling, so
+    ``get_frames(n)`` returns exactly what ``VideoProcessor.extract_frames(path, n)``
+    would have returned.
+    """
+
+    def __init__(self, video_processor: VideoProcessor, video_path: str, max_size: int = 512):
+        self.video_processor = video_processor
+        self.video_path = video_path
+        self.max_size = max_size
+
+        self._requested: Set[int] = set()
+        self._decoded: Dict[int, np.ndarray] = {}
+        self._attempted: Set[int] = set()
+        self._total_frames = None
+        self._fps = 0.0
+        self._source = video_path
+        self._lock = asyncio.Lock()
+
+    def request(self, num_frames: int):
+        """Register a sample size to be decoded on the next prefetch"""
+        if num_frames > 0:
+            self._requested.add(num_frames)
+
+    async def prefetch(self):
+        """Decode every registered sample in a single pass over the video"""
+        async with self._lock:
+            if not os.path.exists(self.video_path):
+                raise FileNotFoundError(f"Video file not found: {self.video_path}")
+
+            if self._total_frames is None:
+                # Decode the low-resolution proxy once it exists; stick with
+                # the same file for the lifetime of the sampler
+                self._source = analysis_source(self.video_path)
+                self._total_frames, self._fps = await media_executor.run_io(
+                    self.video_processor._read_frame_count, self._source
+                )
+
+            needed = set()
+            for num_frames in self._requested:
+                needed.update(self.video_processor._sample_frame_indices(self._total_frames, num_frames))
+            needed -= self._attempted
+
+            if needed:
+                # Decoding runs in the shared media process pool
+                decoded = await media_executor.run_cpu(
+                    self.video_processor._decode_frames,
+                    self._source, sorted(needed), self._fps, max_size=self.max_size, cache=True
+                )
+                self._decoded.update(decoded)
+                self._attempted.update(needed)
+                logger.info(
+                    f"Sampled {len(decoded)} frames for {len(self._requested)} analyses "
+                    f"from {os.path.basename(self.video_path)}"
+                )
+
+    async def get_frames(self, num_frames: int) -> FrameBatch:
+        """Return the frames ``extract_frames`` would produce for ``num_frames``"""
+        try:
+            if num_frames not in self._requested or self._total_frames is None:
+                self.request(num_frames)
+                await self.prefetch()
+
+            frame_indices = self.video_processor._sample_frame_indices(self._total_frames, num_frames)
+            return self.video_processor._build_frame_batch(frame_indices, self._decoded, self._fps)
+
+        except Exception as e:
+            logger.error(f"Error sampling frames from {self.video_path}: {e}")
+            return FrameBatch.empty()
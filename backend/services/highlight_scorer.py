@@ -0,0 +1,136 @@
+import logging
+from typing import Iterator, Optional
+
+import cv2
+import numpy as np
+
+from services.frame_reader import FFmpegFrameReader
+
+logger = logging.getLogger(__name__)
+
+# Loaded once per process (each media worker keeps its own)
+_face_cascade: Optional['cv2.CascadeClassifier'] = None
+
+def _face_detector() -> 'cv2.CascadeClassifier':
+    global _face_cascade
+    if _face_cascade is None:
+        _face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    return _face_cascade
+
+class HighlightScorer:
+    """Interestingness scores for whole blocks of frames.
+
+    Sharpness (variance of the Laplacian) and colorfulness (Hasler and
+    Suesstrunk) are computed for all frames of an ``N x H x W x 3`` RGB block
+    with array operations; face presence uses a Haar cascade that is built
+    once per process. Scores lie in [0, 1] and use the same weights as the
+    original per-frame scorer.
+    """
+
+    SHARPNESS_WEIGHT = 0.3
+    COLOR_WEIGHT = 0.2
+    FACE_WEIGHT = 0.5
+
+    # Laplacian variance at which sharpness scores 0.5
+    SHARPNESS_KNEE = 100.0
+    # Colorfulness rated "extremely colorful" by Hasler and Suesstrunk
+    COLORFUL = 109.0
+
+    def __init__(self, sample_fps: float = 1.0, max_size: int = 320, batch_size: int = 32):
+        self.sample_fps = sample_fps
+        self.max_size = max_size
+        self.batch_size = batch_size
+
+    def score_frames(self, frames: np.ndarray) -> np.ndarray:
+        """Score an ``N x H x W x 3`` RGB block"""
+        if not len(frames):
+            return np.empty(0, dtype=np.float32)
+
+        rgb = frames.astype(np.float32)
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        gray = 0.299 * r + 0.587 * g + 0.114 * b
+
+        laplacian = (
+            gray[:, :-2, 1:-1] + gray[:, 2:, 1:-1] + gray[:, 1:-1, :-2] + gray[:, 1:-1, 2:]
+            - 4.0 * gray[:, 1:-1, 1:-1]
+        )
+        variance = laplacian.var(axis=(1, 2))
+        sharpness = variance / (variance + self.SHARPNESS_KNEE)
+
+        rg = r - g
+        yb = 0.5 * (r + g) - b
+        colorfulness = (
+            np.sqrt(rg.std(axis=(1, 2)) ** 2 + yb.std(axis=(1, 2)) ** 2)
+            + 0.3 * np.sqrt(rg.mean(axis=(1, 2)) ** 2 + yb.mean(axis=(1, 2)) ** 2)
+        )
+        color = np.minimum(colorfulness / self.COLORFUL, 1.0)
+
+        faces = self._face_scores(gray.astype(np.uint8))
+
+        score = self.SHARPNESS_WEIGHT * sharpness + self.COLOR_WEIGHT * color + self.FACE_WEIGHT * faces
+        return np.minimum(score, 1.0).astype(np.float32)
+
+    def score_video(self, video_path: str, frame_reader: Optional[FFmpegFrameReader] = None) -> np.ndarray:
+        """Score array with one entry per ``1 / sample_fps`` seconds of video"""
+        scores = []
+        for block in self._iter_blocks(video_path, frame_reader):
+            scores.append(self.score_frames(block))
+        return np.concatenate(scores) if scores else np.empty(0, dtype=np.float32)
+
+    def _face_scores(self, gray: np.ndarray) -> np.ndarray:
+        detector = _face_detector()
+        scores = np.empty(len(gray), dtype=np.float32)
+        for i, frame in enumerate(gray):
+            faces = detector.detectMultiScale(frame, 1.1, 4, minSize=(24, 24))
+            scores[i] = min(len(faces) * 0.2, 1.0)
+        return scores
+
+    def _iter_blocks(self, video_path: str, frame_reader: Optional[FFmpegFrameReader]) -> Iterator[np.ndarray]:
+        if frame_reader:
+            try:
+                probe = frame_reader.probe(video_path)
+                width, height = frame_reader.output_size(probe['width'], probe['height'], self.max_size)
+                yield from frame_reader.iter_batches(
+                    video_path,
+                    f"fps={self.sample_fps},scale={width}:{height}:flags=area",
+                    width, height,
+                    batch_size=self.batch_size
+                )
+                return
+            except Exception as e:
+                logger.warning(f"FFmpeg highlight sampling failed, falling back to OpenCV: {e}")
+
+        # Sequential decode; grab() skips the conversion of unsampled frames
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise Exception(f"Could not open video file: {video_path}")
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            step = max(1, int(round(fps / self.sample_fps)))
+            block = []
+            frame_number = 0
+            while cap.grab():
+                if frame_number % step == 0:
+                    ret, frame = cap.retrieve()
+                    if not ret:
+                        break
+                    height, width = frame.shape[:2]
+                    if max(width, height) > self.max_size:
+                        scale = self.max_size / max(width, height)
+                        frame = cv2.resize(frame, (int(width * scale), int(height * scale)),
+                                           interpolation=cv2.INTER_AREA)
+                    block.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                    if len(block) == self.batch_size:
+                        yield np.stack(block)
+                        block = []
+                frame_number += 1
+            if block:
+                yield np.stack(block)
+        finally:
+            cap.release()
+
+def score_video(video_path: str, ffmpeg_path: Optional[str] = None, ffprobe_path: Optional[str] = None,
+                sample_fps: float = 1.0) -> np.ndarray:
+    """Per-second highlight scores of a video (picklable entry point for the media process pool)"""
+    frame_reader = FFmpegFrameReader(ffmpeg_path, ffprobe_path) if ffmpeg_path and ffprobe_path else None
+    return HighlightScorer(sample_fps=sample_fps).score_video(video_path, frame_reader)
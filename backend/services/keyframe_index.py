@@ -0,0 +1,185 @@
+import os
+import logging
+import subprocess
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class KeyframeIndex:
+    """Packet timing and keyframe flags of a video stream.
+
+    Built once at ingest with ffprobe and stored as a compressed ``.npz``
+    sidecar next to the video: one float64 array of presentation times
+    (seconds from the start of the stream, in presentation order) and one
+    bool array flagging keyframes. Frame ``n`` of the decoded stream is the
+    ``n``-th presentation time, so the index answers both "which keyframe
+    precedes this time" and "which keyframe precedes this frame number".
+    """
+
+    SIDECAR_SUFFIX = '.keyframes.npz'
+
+    def __init__(self, pts: np.ndarray, keyframe: np.ndarray):
+        self.pts = pts
+        self.keyframe = keyframe
+        self._keyframe_frames = np.flatnonzero(keyframe)
+        self._keyframe_times = pts[self._keyframe_frames]
+
+    @classmethod
+    def build(cls, video_path: str, ffprobe_path: str = 'ffprobe') -> 'KeyframeIndex':
+        """Index the first video stream with one ffprobe packet scan"""
+        cmd = [
+            ffprobe_path,
+            '-v', 'error',
+            '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags',
+            '-of', 'csv=p=0',
+            video_path
+        ]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+        pts = []
+        flags = []
+        for line in process.stdout:
+            pts_time, _, packet_flags = line.strip().partition(',')
+            if not pts_time or pts_time == 'N/A':
+                continue
+            pts.append(float(pts_time))
+            flags.append(packet_flags.startswith('K'))
+
+        _, stderr = process.communicate()
+        if process.returncode != 0:
+            raise Exception(f"ffprobe packet scan failed: {stderr.strip()}")
+        if not pts:
+            raise Exception(f"No video packets found in {video_path}")
+
+        # Packets arrive in decode order; reorder into presentation order
+        pts_array = np.asarray(pts, dtype=np.float64)
+        order = np.argsort(pts_array, kind='stable')
+        pts_array = pts_array[order] - pts_array[order[0]]
+        keyframe = np.asarray(flags, dtype=bool)[order]
+
+        return cls(pts_array, keyframe)
+
+    @classmethod
+    def sidecar_path(cls, video_path: str) -> str:
+        return f"{video_path}{cls.SIDECAR_SUFFIX}"
+
+    def save(self, path: str):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, pts=self.pts, keyframe=self.keyframe)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'KeyframeIndex':
+        with np.load(path) as data:
+            return cls(data['pts'], data['keyframe'])
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.pts)
+
+    @property
+    def keyframe_count(self) -> int:
+        return len(self._keyframe_frames)
+
+    @property
+    def keyframe_frames(self) -> np.ndarray:
+        return self._keyframe_frames
+
+    @property
+    def keyframe_times(self) -> np.ndarray:
+        return self._keyframe_times
+
+    @property
+    def duration(self) -> float:
+        return float(self.pts[-1]) if len(self.pts) else 0.0
+
+    def keyframe_before(self, timestamp: float) -> float:
+        """Time of the last keyframe at or before ``timestamp``"""
+        pos = np.searchsorted(self._keyframe_times, timestamp + 1e-6, side='right') - 1
+        return float(self._keyframe_times[max(pos, 0)]) if len(self._keyframe_times) else 0.0
+
+    def keyframe_after(self, timestamp: float) -> Optional[float]:
+        """Time of the first keyframe at or after ``timestamp``, if any"""
+        pos = np.searchsorted(self._keyframe_times, timestamp - 1e-6, side='left')
+        return float(self._keyframe_times[pos]) if pos < len(self._keyframe_times) else None
+
+    def nearest_keyframe(self, timestamp: float) -> float:
+        """Time of the keyframe closest to ``timestamp``"""
+        before = self.keyframe_before(timestamp)
+        after = self.keyframe_after(timestamp)
+        if after is not None and after - timestamp < timestamp - before:
+            return after
+        return before
+
+    def keyframe_frame_before(self, frame_number: int) -> int:
+        """Frame number of the last keyframe at or before ``frame_number``"""
+        pos = np.searchsorted(self._keyframe_frames, frame_number, side='right') - 1
+        return int(self._keyframe_frames[max(pos, 0)]) if len(self._keyframe_frames) else 0
+
+    def seek_time(self, keyframe_frame: int) -> float:
+        """Input ``-noaccurate_seek -ss`` time that starts decoding at the given keyframe.
+
+        Aims inside the keyframe's GOP rather than at its exact time, so the
+        demuxer lands on the keyframe regardless of timestamp rounding.
+        """
+        keyframe_time = float(self.pts[keyframe_frame])
+        next_keyframe = self.keyframe_after(keyframe_time + 1e-3)
+        return (keyframe_time + next_keyframe) / 2 if next_keyframe else keyframe_time + 0.5
+
+    def frame_at(self, timestamp: float) -> int:
+        """Number of the frame displayed at ``timestamp``"""
+        pos = np.searchsorted(self.pts, timestamp + 1e-6, side='right') - 1
+        return int(max(pos, 0))
+
+    def summary(self) -> Dict[str, float]:
+        """Compact description stored alongside the video record"""
+        gaps = np.diff(self._keyframe_times) if self.keyframe_count > 1 else np.array([0.0])
+        return {
+            'frames': self.frame_count,
+            'keyframes': self.keyframe_count,
+            'max_keyframe_interval': round(float(gaps.max()), 3),
+            'avg_keyframe_interval': round(float(gaps.mean()), 3)
+        }
+
+_loaded: Dict[str, Tuple[float, KeyframeIndex]] = {}
+_loaded_lock = threading.Lock()
+
+def get_keyframe_index(video_path: str) -> Optional[KeyframeIndex]:
+    """Lazily load the keyframe index stored next to a video, if one exists"""
+    path = KeyframeIndex.sidecar_path(video_path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _loaded_lock:
+        entry = _loaded.get(path)
+        if entry and entry[0] == mtime:
+            return entry[1]
+
+    try:
+        index = KeyframeIndex.load(path)
+    except Exception as e:
+        logger.warning(f"Could not load keyframe index {path}: {e}")
+        return None
+
+    with _loaded_lock:
+        if len(_loaded) >= 64:
+            _loaded.pop(next(iter(_loaded)))
+        _loaded[path] = (mtime, index)
+    return index
+
+def build_keyframe_index(video_path: str, ffprobe_path: str = 'ffprobe') -> KeyframeIndex:
+    """Build the keyframe index of a video and store it as its sidecar"""
+    index = KeyframeIndex.build(video_path, ffprobe_path)
+    index.save(KeyframeIndex.sidecar_path(video_path))
+    logger.info(
+        f"Indexed {index.keyframe_count} keyframes / {index.frame_count} frames "
+        f"for {os.path.basename(video_path)}"
+    )
+    return index
@@ -0,0 +1,120 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+class LMStudioClient:
+    """Process-wide LM Studio client with a model-capability registry.
+
+    One ``httpx.AsyncClient`` per server (and event loop) keeps a pool of
+    keep-alive connections that concurrent analyses share. The models a
+    server has loaded, and whether any of them accepts images, are kept in a
+    registry: a request only waits for ``/v1/models`` the first time a server
+    is used, after which entries older than ``ttl`` are refreshed in the
+    background while the cached answer is served.
+    """
+
+    VISION_KEYWORDS = ['llava', 'vision', 'gpt-4v', 'claude-3']
+
+    def __init__(self, ttl: Optional[float] = None, max_connections: Optional[int] = None,
+                 timeout: float = 60.0):
+        self.ttl = ttl or float(os.getenv('LMSTUDIO_MODELS_TTL', 60))
+        self.max_connections = max_connections or int(os.getenv('LMSTUDIO_MAX_CONNECTIONS', 8))
+        self.timeout = timeout
+
+        self._clients: Dict[Tuple[int, str], httpx.AsyncClient] = {}
+        self._registry: Dict[str, Dict[str, Any]] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def client(self, base_url: str) -> httpx.AsyncClient:
+        """Pooled client for ``base_url`` on the running event loop"""
+        key = (id(asyncio.get_running_loop()), base_url.rstrip('/'))
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = self._clients[key] = httpx.AsyncClient(
+                base_url=key[1],
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=30.0
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=5.0)
+            )
+        return client
+
+    async def chat(self, base_url: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> httpx.Response:
+        """POST ``/v1/chat/completions`` over the shared connection pool"""
+        return await self.client(base_url).post(
+            '/v1/chat/completions',
+            json=payload,
+            timeout=timeout or self.timeout
+        )
+
+    async def models(self, base_url: str) -> List[Dict[str, Any]]:
+        """Loaded models as ``{'id', 'object', 'has_vision'}``, from the registry"""
+        return (await self._entry(base_url))['models']
+
+    async def has_vision(self, base_url: str) -> bool:
+        """Whether any loaded model accepts images"""
+        return any(model['has_vision'] for model in await self.models(base_url))
+
+    async def status(self, base_url: str, refresh: bool = False) -> Dict[str, Any]:
+        """Registry entry for ``base_url``: connection state, models and age"""
+        entry = await self.refresh(base_url) if refresh else await self._entry(base_url)
+        return {**entry, 'age': time.monotonic() - entry['fetched_at']}
+
+    async def refresh(self, base_url: str) -> Dict[str, Any]:
+        """Query ``/v1/models`` now and update the registry"""
+        base_url = base_url.rstrip('/')
+        try:
+            response = await self.client(base_url).get('/v1/models', timeout=5.0)
+            response.raise_for_status()
+            models = [
+                {
+                    'id': model.get('id', ''),
+                    'object': model.get('object', model.get('id', '')),
+                    'has_vision': any(keyword in model.get('id', '').lower() for keyword in self.VISION_KEYWORDS)
+                }
+                for model in response.json().get('data', [])
+            ]
+            entry = {'connected': True, 'models': models, 'error': None}
+        except Exception as e:
+            logger.warning(f"LM Studio model discovery failed for {base_url}: {e}")
+            entry = {'connected': False, 'models': [], 'error': str(e)}
+
+        entry['fetched_at'] = time.monotonic()
+        self._registry[base_url] = entry
+        return entry
+
+    async def aclose(self):
+        """Close every pooled client and stop background refreshes"""
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    async def _entry(self, base_url: str) -> Dict[str, Any]:
+        base_url = base_url.rstrip('/')
+        entry = self._registry.get(base_url)
+        if entry is None:
+            # First use of this server: one task fetches, concurrent callers wait for it
+            return await self._schedule_refresh(base_url)
+        if time.monotonic() - entry['fetched_at'] > self.ttl:
+            self._schedule_refresh(base_url)
+        return entry
+
+    def _schedule_refresh(self, base_url: str) -> asyncio.Task:
+        task = self._refreshing.get(base_url)
+        if task is None or task.done():
+            task = self._refreshing[base_url] = asyncio.ensure_future(self.refresh(base_url))
+        return task
+
+# Shared instance
+lmstudio_client = LMStudioClient()
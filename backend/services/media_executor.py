@@ -0,0 +1,160 @@
+import os
+import time
+import asyncio
+import logging
+import functools
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    Counter = Gauge = Histogram = None
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics (only when prometheus_client is installed)
+if Gauge:
+    media_queue_depth = Gauge('media_executor_queue_depth', 'Media tasks waiting for a worker', ['pool'])
+    media_running = Gauge('media_executor_running', 'Media tasks currently running', ['pool'])
+    media_waiting = Gauge('media_executor_waiting', 'Media tasks blocked on admission', ['pool'])
+    media_task_duration = Histogram('media_executor_task_seconds', 'Media task latency including queueing', ['pool'])
+    media_tasks_total = Counter('media_executor_tasks_total', 'Media tasks processed', ['pool', 'status'])
+
+class _MediaPool:
+    """One bounded worker pool with queue accounting"""
+
+    def __init__(self, name: str, factory: Callable[[int], Executor], workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+
+        # Admission is bounded per event loop
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._admitted = 0
+        self._waiting = 0
+        self._completed = 0
+        self._failed = 0
+
+    @property
+    def executor(self) -> Executor:
+        # Created on first use so importing the module never spawns workers
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = self._factory(self.workers)
+            return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(id(loop))
+        if semaphore is None:
+            semaphore = self._semaphores[id(loop)] = asyncio.Semaphore(self.workers + self.max_pending)
+
+        self._waiting += 1
+        self._publish()
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._admitted += 1
+        self._publish()
+        started = time.perf_counter()
+        status = 'success'
+        try:
+            call = functools.partial(fn, *args, **kwargs) if kwargs else functools.partial(fn, *args)
+            return await loop.run_in_executor(self.executor, call)
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            self._admitted -= 1
+            if status == 'success':
+                self._completed += 1
+            else:
+                self._failed += 1
+            semaphore.release()
+            self._publish()
+            if Gauge:
+                media_task_duration.labels(pool=self.name).observe(time.perf_counter() - started)
+                media_tasks_total.labels(pool=self.name, status=status).inc()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'workers': self.workers,
+            'running': min(self._admitted, self.workers),
+            'queued': max(0, self._admitted - self.workers),
+            'waiting': self._waiting,
+            'completed': self._completed,
+            'failed': self._failed
+        }
+
+    def shutdown(self, wait: bool = True):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+                self._executor = None
+
+    def _publish(self):
+        if Gauge:
+            stats = self.stats()
+            media_queue_depth.labels(pool=self.name).set(stats['queued'])
+            media_running.labels(pool=self.name).set(stats['running'])
+            media_waiting.labels(pool=self.name).set(stats['waiting'])
+
+class MediaExecutor:
+    """Shared, bounded executor for blocking media work.
+
+    CPU-bound work (frame decoding, OpenCV analysis) runs in a process pool so
+    it neither blocks the event loop nor contends for the GIL; subprocess and
+    file I/O waits run in a thread pool. Each pool admits at most
+    ``workers + max_pending`` tasks, so a burst of analyses queues up instead
+    of piling unbounded work onto the pools. Callables for ``run_cpu`` and
+    their arguments and results must be picklable.
+    """
+
+    def __init__(self, cpu_workers: Optional[int] = None, io_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        cpu_workers = cpu_workers or int(os.getenv('MEDIA_CPU_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+        io_workers = io_workers or int(os.getenv('MEDIA_IO_WORKERS', 8))
+        max_pending = max_pending if max_pending is not None else int(os.getenv('MEDIA_MAX_PENDING', 32))
+
+        # Spawned workers: forking a process that runs threads (asyncio
+        # executors, OpenCV's pool) can deadlock the child
+        self.cpu = _MediaPool(
+            'cpu',
+            lambda workers: ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')),
+            cpu_workers,
+            max_pending
+        )
+        self.io = _MediaPool(
+            'io',
+            lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix='media-io'),
+            io_workers,
+            max_pending
+        )
+
+    async def run_cpu(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run CPU-bound work in the process pool"""
+        return await self.cpu.run(fn, *args, **kwargs)
+
+    async def run_io(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run blocking I/O (subprocesses, file access) in the thread pool"""
+        return await self.io.run(fn, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Queue depth and throughput of both pools"""
+        return {'cpu': self.cpu.stats(), 'io': self.io.stats()}
+
+    def shutdown(self, wait: bool = True):
+        self.cpu.shutdown(wait=wait)
+        self.io.shutdown(wait=wait)
+        logger.info("Media executor shut down")
+
+# Shared instance
+media_executor = MediaExecutor()
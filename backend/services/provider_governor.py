@@ -0,0 +1,273 @@
+import os
+import time
+import asyncio
+import inspect
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from services.media_executor import media_executor
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    Counter = Gauge = Histogram = None
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics (only when prometheus_client is installed)
+if Gauge:
+    ai_provider_running = Gauge('ai_provider_running', 'AI provider calls in flight', ['provider'])
+    ai_provider_waiting = Gauge('ai_provider_waiting', 'AI provider calls queued by the governor', ['provider'])
+    ai_provider_wait_seconds = Histogram('ai_provider_wait_seconds', 'Time AI provider calls spent queued', ['provider'])
+    ai_provider_calls_total = Counter('ai_provider_calls_total', 'AI provider calls made', ['provider', 'status'])
+
+# (concurrency, requests per minute, tokens per minute); 0 disables a limit
+DEFAULT_LIMITS: Dict[str, Tuple[int, int, int]] = {
+    'openai': (4, 500, 30000),
+    'gemini': (4, 15, 1000000),
+    'anthropic': (4, 50, 40000),
+    'lmstudio': (1, 0, 0),
+}
+
+# Rough prompt cost of one attached image
+IMAGE_TOKENS = 765
+
+def estimate_tokens(content: Any, max_tokens: int = 0) -> int:
+    """Rough token cost of a request: ~4 characters per text token, a flat
+    ``IMAGE_TOKENS`` per image, plus the completion budget"""
+    if content is None:
+        return max_tokens
+    if isinstance(content, str):
+        return len(content) // 4 + max_tokens
+    if isinstance(content, dict):
+        if content.get('type') in ('image', 'image_url') or 'mime_type' in content:
+            return IMAGE_TOKENS + max_tokens
+        return sum(estimate_tokens(value) for value in content.values()) + max_tokens
+    if isinstance(content, (list, tuple)):
+        return sum(estimate_tokens(part) for part in content) + max_tokens
+    # Raw image bytes or PIL images
+    return IMAGE_TOKENS + max_tokens
+
+class _Bucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` per second"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (0 when it can be now)"""
+        if not self.capacity:
+            return 0.0
+        with self._lock:
+            self._refill()
+            # A request larger than the whole bucket waits for a full bucket
+            missing = min(amount, self.capacity) - self.level
+            return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        if self.capacity:
+            with self._lock:
+                self._refill()
+                self.level -= amount
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+class _ProviderLimiter:
+    """Concurrency cap plus request and token rate buckets for one provider"""
+
+    def __init__(self, name: str, concurrency: int, rpm: int, tpm: int, backoff: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.requests = _Bucket(rpm)
+        self.tokens = _Bucket(tpm)
+        self.backoff = backoff
+        self.paused_until = 0.0
+
+        # Admission is per event loop; the lock keeps waiters first in, first out
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._running = 0
+        self._waiting = 0
+        self._completed = 0
+        self._failed = 0
+        self._rate_limited = 0
+
+    async def acquire(self, tokens: int):
+        loop_id = id(asyncio.get_running_loop())
+        semaphore = self._semaphores.get(loop_id)
+        if semaphore is None:
+            semaphore = self._semaphores[loop_id] = asyncio.Semaphore(self.concurrency)
+            self._locks[loop_id] = asyncio.Lock()
+
+        self._waiting += 1
+        self._publish()
+        started = time.perf_counter()
+        try:
+            await semaphore.acquire()
+            try:
+                async with self._locks[loop_id]:
+                    while True:
+                        delay = max(
+                            self.paused_until - time.monotonic(),
+                            self.requests.wait_time(1),
+                            self.tokens.wait_time(tokens)
+                        )
+                        if delay <= 0:
+                            break
+                        await asyncio.sleep(delay)
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+            except BaseException:
+                semaphore.release()
+                raise
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        self._publish()
+        if Gauge:
+            ai_provider_wait_seconds.labels(provider=self.name).observe(time.perf_counter() - started)
+
+    def release(self, success: bool):
+        self._semaphores[id(asyncio.get_running_loop())].release()
+        self._running -= 1
+        if success:
+            self._completed += 1
+        else:
+            self._failed += 1
+        self._publish()
+        if Gauge:
+            ai_provider_calls_total.labels(provider=self.name, status='success' if success else 'error').inc()
+
+    def rate_limited(self, retry_after: Optional[float]):
+        """Pause admission after the provider answered 429"""
+        self._rate_limited += 1
+        pause = retry_after if retry_after is not None else self.backoff
+        self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        logger.warning(f"{self.name} rate limit hit, pausing new calls for {pause:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'concurrency': self.concurrency,
+            'requests_per_minute': int(self.requests.capacity),
+            'tokens_per_minute': int(self.tokens.capacity),
+            'running': self._running,
+            'waiting': self._waiting,
+            'completed': self._completed,
+            'failed': self._failed,
+            'rate_limited': self._rate_limited
+        }
+
+    def _publish(self):
+        if Gauge:
+            ai_provider_running.labels(provider=self.name).set(self._running)
+            ai_provider_waiting.labels(provider=self.name).set(self._waiting)
+
+class ProviderGovernor:
+    """Shared admission control in front of every AI provider call.
+
+    Each provider gets a semaphore bounding calls in flight and two token
+    buckets, one for requests and one for (estimated) tokens per minute, so a
+    burst of analyses queues locally at the provider's quota instead of being
+    answered with 429s and retried. Limits come from ``DEFAULT_LIMITS`` and
+    can be overridden with ``AI_<PROVIDER>_CONCURRENCY``, ``AI_<PROVIDER>_RPM``
+    and ``AI_<PROVIDER>_TPM``. Token estimates are corrected with the usage
+    the provider reports, and a 429 pauses the provider for its
+    ``Retry-After`` (or ``AI_RATE_LIMIT_BACKOFF`` seconds).
+    """
+
+    def __init__(self, backoff: Optional[float] = None):
+        self.backoff = backoff or float(os.getenv('AI_RATE_LIMIT_BACKOFF', 5.0))
+        self._limiters: Dict[str, _ProviderLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, provider: str) -> _ProviderLimiter:
+        with self._lock:
+            limiter = self._limiters.get(provider)
+            if limiter is None:
+                concurrency, rpm, tpm = DEFAULT_LIMITS.get(provider, (4, 0, 0))
+                prefix = f"AI_{provider.upper()}_"
+                limiter = self._limiters[provider] = _ProviderLimiter(
+                    provider,
+                    max(1, int(os.getenv(prefix + 'CONCURRENCY', concurrency))),
+                    int(os.getenv(prefix + 'RPM', rpm)),
+                    int(os.getenv(prefix + 'TPM', tpm)),
+                    self.backoff
+                )
+            return limiter
+
+    async def call(self, provider: str, fn: Callable, *args, tokens: int = 0, blocking: bool = False,
+                   **kwargs) -> Any:
+        """Run one provider call once the governor admits it.
+
+        ``fn`` is called on the event loop and its result awaited (async SDK
+        methods are often plain functions returning awaitables); pass
+        ``blocking=True`` for synchronous SDK calls, which then run on the
+        media I/O thread pool.
+        """
+        limiter = self.limiter(provider)
+        await limiter.acquire(tokens)
+        success = False
+        try:
+            if blocking:
+                result = await media_executor.run_io(fn, *args, **kwargs)
+            else:
+                result = fn(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+            success = True
+        except Exception as e:
+            if _status_code(e) == 429:
+                limiter.rate_limited(_retry_after(e))
+            raise
+        finally:
+            limiter.release(success)
+
+        used = _usage_tokens(result)
+        if used is not None:
+            # Settle the estimate against what the provider actually counted
+            limiter.tokens.take(used - tokens)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Limits and queue state of every provider used so far"""
+        with self._lock:
+            return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, 'status_code', None) or getattr(error, 'http_status', None) or getattr(error, 'code', None)
+    if status is None and type(error).__name__ in ('RateLimitError', 'ResourceExhausted', 'TooManyRequests'):
+        return 429
+    return status if isinstance(status, int) else None
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or getattr(error, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    """Total tokens reported by OpenAI, Anthropic or Gemini responses"""
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        total = getattr(usage, 'total_tokens', None)
+        if total is None and getattr(usage, 'input_tokens', None) is not None:
+            total = usage.input_tokens + (getattr(usage, 'output_tokens', 0) or 0)
+        if isinstance(total, int):
+            return total
+    metadata = getattr(response, 'usage_metadata', None)
+    total = getattr(metadata, 'total_token_count', None)
+    return total if isinstance(total, int) else None
+
+# Shared instance
+provider_governor = ProviderGovernor()
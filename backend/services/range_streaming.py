@@ -0,0 +1,212 @@
+import os
+import uuid
+import asyncio
+import logging
+from email.utils import formatdate
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+def parse_ranges(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """Satisfiable ``(start, end)`` byte ranges (inclusive) of a Range header.
+
+    Returns None when the header must be ignored (other unit, malformed)
+    and an empty list when no requested range overlaps the file.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes':
+        return None
+
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition('-')
+        if not sep:
+            return None
+        try:
+            if not first.strip():
+                # Suffix range: the last N bytes
+                length = int(last)
+                if length <= 0:
+                    continue
+                start, end = max(0, size - length), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last.strip() else None
+                if end is not None and end < start:
+                    return None
+                if start >= size:
+                    continue
+                end = size - 1 if end is None else min(end, size - 1)
+        except ValueError:
+            return None
+        if size:
+            ranges.append((start, end))
+    return ranges
+
+def coalesce_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping and adjacent ranges"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+class RangeFileResponse(Response):
+    """File response for media playback with full HTTP range support.
+
+    Honors single and multiple byte ranges (``multipart/byteranges``),
+    ``If-Range`` and ``If-None-Match`` against a strong ETag built from the
+    file's mtime and size. When the server offers the ASGI
+    ``http.response.zerocopysend`` extension the kernel sends the file
+    (``os.sendfile``); otherwise blocks of ``chunk_size`` bytes are read with
+    ``os.pread`` off the event loop, so memory per stream stays constant
+    however large the requested range is.
+    """
+
+    chunk_size = 256 * 1024
+    # More ranges than this (after merging) are answered with the whole file
+    max_ranges = 16
+
+    def __init__(self, path: Any, request_headers: Mapping[str, str], media_type: str = 'video/mp4',
+                 headers: Optional[Dict[str, str]] = None):
+        self.path = str(path)
+        stat = os.stat(self.path)
+        size = stat.st_size
+        self.etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        response_headers = {
+            'accept-ranges': 'bytes',
+            'etag': self.etag,
+            'last-modified': last_modified,
+            **(headers or {})
+        }
+        # (multipart part header, start, end) per body section
+        self.parts: List[Tuple[bytes, int, int]] = []
+        self.trailer = b''
+
+        if self._none_match(request_headers.get('if-none-match')):
+            super().__init__(status_code=304, headers=response_headers)
+            return
+
+        ranges = None
+        range_header = request_headers.get('range')
+        if range_header and self._if_range_holds(request_headers.get('if-range'), last_modified):
+            ranges = parse_ranges(range_header, size)
+            if ranges:
+                ranges = coalesce_ranges(ranges)
+                if len(ranges) > self.max_ranges:
+                    ranges = None
+
+        if ranges is None:
+            self.parts = [(b'', 0, size - 1)] if size else []
+            response_headers.update({'content-type': media_type, 'content-length': str(size)})
+            status_code = 200
+        elif not ranges:
+            response_headers.update({'content-range': f'bytes */{size}', 'content-length': '0'})
+            status_code = 416
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            self.parts = [(b'', start, end)]
+            response_headers.update({
+                'content-type': media_type,
+                'content-range': f'bytes {start}-{end}/{size}',
+                'content-length': str(end - start + 1)
+            })
+            status_code = 206
+        else:
+            boundary = uuid.uuid4().hex
+            for i, (start, end) in enumerate(ranges):
+                part_header = (
+                    (b'\r\n' if i else b'')
+                    + f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+                      f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n".encode('latin-1')
+                )
+                self.parts.append((part_header, start, end))
+            self.trailer = f"\r\n--{boundary}--\r\n".encode('latin-1')
+            length = sum(len(header) + end - start + 1 for header, start, end in self.parts) + len(self.trailer)
+            response_headers.update({
+                'content-type': f'multipart/byteranges; boundary={boundary}',
+                'content-length': str(length)
+            })
+            status_code = 206
+
+        super().__init__(status_code=status_code, headers=response_headers)
+
+    async def __call__(self, scope, receive, send):
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        if scope.get('method') == 'HEAD' or not self.parts:
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            return
+
+        # Stop reading as soon as the player disconnects (scrubbing aborts requests constantly)
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    disconnected.set()
+                    return
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        zerocopy = 'http.response.zerocopysend' in scope.get('extensions', {})
+        f = open(self.path, 'rb')
+        try:
+            for part_header, start, end in self.parts:
+                if part_header:
+                    await send({'type': 'http.response.body', 'body': part_header, 'more_body': True})
+                if zerocopy:
+                    await send({
+                        'type': 'http.response.zerocopysend',
+                        'file': f,
+                        'offset': start,
+                        'count': end - start + 1,
+                        'more_body': True
+                    })
+                else:
+                    await self._send_blocks(send, f.fileno(), start, end, disconnected)
+                if disconnected.is_set():
+                    return
+            await send({'type': 'http.response.body', 'body': self.trailer, 'more_body': False})
+        finally:
+            watcher.cancel()
+            f.close()
+
+        if self.background is not None:
+            await self.background()
+
+    async def _send_blocks(self, send, fd: int, start: int, end: int, disconnected: asyncio.Event):
+        # Page-cache reads on the default executor, not the media I/O pool,
+        # so playback never queues behind long-running ffmpeg waits
+        loop = asyncio.get_running_loop()
+        position = start
+        while position <= end and not disconnected.is_set():
+            block = await loop.run_in_executor(None, os.pread, fd, min(self.chunk_size, end - position + 1), position)
+            if not block:
+                break
+            await send({'type': 'http.response.body', 'body': block, 'more_body': True})
+            position += len(block)
+
+    def _none_match(self, value: Optional[str]) -> bool:
+        if not value:
+            return False
+        tags = [tag.strip() for tag in value.split(',')]
+        return '*' in tags or self.etag in tags or f'W/{self.etag}' in tags
+
+    def _if_range_holds(self, value: Optional[str], last_modified: str) -> bool:
+        """A range is served only if the representation is unchanged"""
+        if not value:
+            return True
+        value = value.strip()
+        if value.startswith('"') or value.startswith('W/'):
+            # Weak validators never match If-Range
+            return value == self.etag
+        return value == last_modified
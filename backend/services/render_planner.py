@@ -0,0 +1,457 @@
+import math
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Video encoder per output container
+VIDEO_CODECS = {
+    'mp4': 'libx264',
+    'webm': 'libvpx-vp9',
+    'avi': 'libx264',
+    'mov': 'libx264'
+}
+
+AUDIO_CODECS = {
+    'webm': 'libopus'
+}
+
+def escape_filter_value(value: str) -> str:
+    """Escape a filter option value (e.g. a path) for use inside a filter graph"""
+    # First level: the option value; second level: the graph description
+    for char in "\\':":
+        value = value.replace(char, '\\' + char)
+    for char in "\\'[],;":
+        value = value.replace(char, '\\' + char)
+    return value
+
+# Audio tempo steps per speed ramp (atempo changes tempo in steps, video is retimed exactly)
+RAMP_AUDIO_STEPS = 8
+
+def parse_resolution(resolution: str) -> Tuple[int, int]:
+    """``'1080x1920'`` (or ``'1080:1920'``) to ``(1080, 1920)``"""
+    width, height = resolution.replace(':', 'x').lower().split('x')
+    return int(width), int(height)
+
+class RenderPlan:
+    """A list of edits compiled into a single ffmpeg encode.
+
+    Edits are collected in any order and emitted in a fixed order that keeps
+    the graph cheap and the result sharp: trim (input-side seek), frame
+    rate, fit to the output resolution (scale + pad or crop), color
+    enhancement, zoom and speed ramp, then subtitles, fades and watermark
+    overlay at output resolution; the audio branch follows the speed ramp
+    and fades and runs loudness normalization. Whatever the number of
+    edits, the source is decoded once and encoded once. Sources without an
+    audio track (``has_audio`` False) get no audio branch at all.
+    """
+
+    def __init__(self, source: str, has_audio: bool = True):
+        self.source = source
+        self.has_audio = has_audio
+        self.start: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.frame_rate: Optional[float] = None
+        self.resolution: Optional[Tuple[int, int]] = None
+        self.fit_mode = 'pad'
+        self.subtitle_path: Optional[str] = None
+        self.watermark_path: Optional[str] = None
+        self.watermark_position = (10, 10)
+        self.loudness_target: Optional[Dict[str, float]] = None
+        self.enhancement: Optional[Dict[str, float]] = None
+        self.zoom_target: Optional[Dict[str, Any]] = None
+        self.ramp: Optional[Dict[str, float]] = None
+        self.fade_in = 0.0
+        self.fade_out = 0.0
+
+    @classmethod
+    def from_edits(cls, source: str, edits: List[Dict[str, Any]], has_audio: bool = True) -> 'RenderPlan':
+        """Plan from edit dicts such as ``{'type': 'subtitles', 'path': ...}``"""
+        plan = cls(source, has_audio)
+        for edit in edits:
+            kind = edit.get('type')
+            if kind == 'trim':
+                plan.trim(edit.get('start', 0), edit.get('duration'))
+            elif kind == 'fps':
+                plan.fps(edit['fps'])
+            elif kind in ('fit', 'scale'):
+                plan.fit(edit['resolution'], edit.get('mode', 'pad'))
+            elif kind == 'subtitles':
+                plan.subtitles(edit['path'])
+            elif kind == 'watermark':
+                plan.watermark(edit['path'], edit.get('x', 10), edit.get('y', 10))
+            elif kind == 'loudness':
+                plan.loudness(edit.get('integrated', -14.0), edit.get('true_peak', -1.5), edit.get('range', 11.0))
+            elif kind == 'enhance':
+                plan.enhance(edit.get('contrast', 1.1), edit.get('saturation', 1.2), edit.get('lut'))
+            elif kind == 'zoom':
+                plan.zoom(edit.get('end_zoom', 1.2), edit.get('size'), edit.get('fps'))
+            elif kind == 'speed_ramp':
+                plan.speed_ramp(edit.get('low', 0.5), edit.get('high', 2.0), edit.get('ramp', 0.3), edit.get('fps'))
+            elif kind == 'fade':
+                plan.fade(edit.get('fade_in', 0.0), edit.get('fade_out', 0.0))
+            else:
+                raise ValueError(f"Unknown edit type: {kind}")
+        return plan
+
+    def trim(self, start: float, duration: Optional[float] = None) -> 'RenderPlan':
+        self.start = float(start)
+        self.duration = float(duration) if duration is not None else None
+        return self
+
+    def fps(self, frame_rate: float) -> 'RenderPlan':
+        self.frame_rate = float(frame_rate)
+        return self
+
+    def fit(self, resolution: str, mode: str = 'pad') -> 'RenderPlan':
+        """Fit into ``resolution``: letterbox (``pad``), fill (``crop``) or ``stretch``"""
+        self.resolution = parse_resolution(resolution)
+        self.fit_mode = mode
+        return self
+
+    def subtitles(self, path: str) -> 'RenderPlan':
+        self.subtitle_path = path
+        return self
+
+    def watermark(self, path: str, x: int = 10, y: int = 10) -> 'RenderPlan':
+        self.watermark_path = path
+        self.watermark_position = (x, y)
+        return self
+
+    def loudness(self, integrated: float = -14.0, true_peak: float = -1.5, lra: float = 11.0) -> 'RenderPlan':
+        """Single-pass EBU R128 normalization (platform targets are around -14 LUFS)"""
+        self.loudness_target = {'I': integrated, 'TP': true_peak, 'LRA': lra}
+        return self
+
+    def enhance(self, contrast: float = 1.1, saturation: float = 1.2, lut: Optional[str] = None) -> 'RenderPlan':
+        """Color enhancement: a precompiled ``.cube`` LUT (``lut3d``) when
+        given, else a contrast lift and saturation boost (``eq``)"""
+        self.enhancement = {'contrast': contrast, 'saturation': saturation, 'lut': lut}
+        return self
+
+    def zoom(self, end_zoom: float = 1.2, size: Optional[str] = None, fps: Optional[float] = None) -> 'RenderPlan':
+        """Ken Burns: centered zoom from 1x to ``end_zoom`` over the clip.
+
+        ``size`` (``'WxH'``) is the frame size and ``fps`` the frame rate
+        going into the zoom; the fit resolution and fps edit take precedence.
+        """
+        self.zoom_target = {'end': end_zoom, 'size': size, 'fps': fps}
+        return self
+
+    def speed_ramp(self, low: float = 0.5, high: float = 2.0, ramp: float = 0.3,
+                   fps: Optional[float] = None) -> 'RenderPlan':
+        """Slow-fast-slow: speed rises linearly from ``low`` to ``high`` over
+        the first ``ramp`` of the clip, holds, and falls back over the last
+        ``ramp``. Needs the trim duration; ``fps`` is the output frame rate
+        (the fps edit takes precedence).
+        """
+        self.ramp = {'low': low, 'high': high, 'ramp': ramp, 'fps': fps}
+        return self
+
+    def fade(self, fade_in: float = 0.0, fade_out: float = 0.0) -> 'RenderPlan':
+        """Fade video and audio in from / out to black and silence (seconds)"""
+        self.fade_in = fade_in
+        self.fade_out = fade_out
+        return self
+
+    @property
+    def splittable(self) -> bool:
+        """Whether the video can be rendered as independent time segments.
+
+        True when every output frame depends only on its own source frame
+        and timestamp. zoompan renumbers its output frames and the speed
+        ramp retimes them, so plans with either are rendered in one piece.
+        Untrimmed plans qualify as well; they run to the end of the source.
+        """
+        return not self.zoom_target and not self.ramp
+
+    @property
+    def output_duration(self) -> Optional[float]:
+        """Length of the result, given the trim duration and speed ramp"""
+        if self.duration is None:
+            return None
+        return self.duration * self._ramp_time(1.0) if self.ramp else self.duration
+
+    def _ramp_time(self, progress: float) -> float:
+        """Output time (as a fraction of the source duration) reached at source ``progress``"""
+        low, high, ramp = self.ramp['low'], self.ramp['high'], self.ramp['ramp']
+        slope = (high - low) / ramp
+        if not slope:
+            return progress / low
+        rise = math.log(high / low) / slope
+        if progress < ramp:
+            return math.log((low + slope * progress) / low) / slope
+        if progress < 1 - ramp:
+            return rise + (progress - ramp) / high
+        return rise + (1 - 2 * ramp) / high - math.log((high - slope * (progress - 1 + ramp)) / high) / slope
+
+    def _ramp_filters(self) -> List[str]:
+        """``setpts`` with the closed-form integral of 1/speed, then back to a constant rate"""
+        if self.duration is None:
+            raise ValueError("A speed ramp needs the trim duration")
+        low, high, ramp = self.ramp['low'], self.ramp['high'], self.ramp['ramp']
+        slope = (high - low) / ramp
+        duration = self.duration
+        progress = f"(T/{duration:g})"
+        if slope:
+            rise = math.log(high / low) / slope
+            hold = rise + (1 - 2 * ramp) / high
+            curve = (
+                f"if(lt({progress},{ramp:g}),log(({low:g}+{slope:g}*{progress})/{low:g})/{slope:g},"
+                f"if(lt({progress},{1 - ramp:g}),{rise:.6f}+({progress}-{ramp:g})/{high:g},"
+                f"{hold:.6f}-log(({high:g}-{slope:g}*({progress}-{1 - ramp:g}))/{high:g})/{slope:g}))"
+            )
+        else:
+            curve = f"{progress}/{low:g}"
+        frame_rate = self.frame_rate or self.ramp['fps'] or 30
+        return [f"setpts='{duration:g}*{curve}/TB'", f"fps={frame_rate:g}"]
+
+    def _ramp_audio_filters(self) -> List[str]:
+        """``atempo`` stepped through the ramps by ``asendcmd`` (at source times).
+
+        Each step's tempo makes its audio exactly as long as the retimed
+        video of the same span, so picture and sound meet at every step.
+        """
+        ramp = self.ramp['ramp']
+        step = ramp / RAMP_AUDIO_STEPS
+        edges = [i * step for i in range(RAMP_AUDIO_STEPS + 1)]
+        edges += [1 - ramp + i * step for i in range(RAMP_AUDIO_STEPS + 1)]
+        commands = []
+        for start, end in zip(edges, edges[1:]):
+            if end > start:
+                tempo = (end - start) / (self._ramp_time(end) - self._ramp_time(start))
+                commands.append(f"{start * self.duration:.3f} atempo tempo {tempo:.4f}")
+        first_tempo = commands[0].rsplit(' ', 1)[1]
+        return [f"asendcmd=c='{';'.join(commands)}'", f"atempo={first_tempo}"]
+
+    def video_filters(self) -> List[str]:
+        """Filters of the main video chain, in application order"""
+        filters = []
+        if self.frame_rate:
+            filters.append(f"fps={self.frame_rate:g}")
+        if self.resolution:
+            width, height = self.resolution
+            if self.fit_mode == 'crop':
+                filters.append(f"scale={width}:{height}:force_original_aspect_ratio=increase")
+                filters.append(f"crop={width}:{height}")
+            elif self.fit_mode == 'stretch':
+                filters.append(f"scale={width}:{height}")
+            else:
+                filters.append(f"scale={width}:{height}:force_original_aspect_ratio=decrease")
+                filters.append(f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2")
+            filters.append("setsar=1")
+        if self.enhancement and self.enhancement['lut']:
+            filters.append(f"lut3d=file={escape_filter_value(self.enhancement['lut'])}:interp=tetrahedral")
+        elif self.enhancement:
+            filters.append(f"eq=contrast={self.enhancement['contrast']:g}:saturation={self.enhancement['saturation']:g}")
+        if self.zoom_target:
+            if self.resolution:
+                width, height = self.resolution
+            elif self.zoom_target['size']:
+                width, height = parse_resolution(self.zoom_target['size'])
+            else:
+                raise ValueError("A zoom needs the frame size")
+            zoom_time = f"{self.duration:g}" if self.duration else '1'
+            frame_rate = self.frame_rate or self.zoom_target['fps'] or 30
+            # One output frame per input frame; the zoom is a function of input time
+            filters.append(
+                f"zoompan=z='1+{self.zoom_target['end'] - 1:g}*min(it/{zoom_time},1)'"
+                f":x='iw/2-iw/zoom/2':y='ih/2-ih/zoom/2':d=1:s={width}x{height}:fps={frame_rate:g}"
+            )
+        if self.ramp:
+            filters.extend(self._ramp_filters())
+        if self.subtitle_path:
+            filters.append(f"subtitles=filename={escape_filter_value(self.subtitle_path)}")
+        filters.extend(self._fade_filters('fade'))
+        return filters
+
+    def _fade_filters(self, name: str) -> List[str]:
+        filters = []
+        if self.fade_in:
+            filters.append(f"{name}=t=in:st=0:d={self.fade_in:g}")
+        if self.fade_out:
+            if self.output_duration is None:
+                raise ValueError("A fade out needs the trim duration")
+            start = max(0.0, self.output_duration - self.fade_out)
+            filters.append(f"{name}=t=out:st={start:.3f}:d={self.fade_out:g}")
+        return filters
+
+    def audio_filters(self) -> List[str]:
+        filters = []
+        if self.ramp:
+            filters.extend(self._ramp_audio_filters())
+        filters.extend(self._fade_filters('afade'))
+        if self.loudness_target:
+            target = self.loudness_target
+            filters.append(f"loudnorm=I={target['I']:g}:TP={target['TP']:g}:LRA={target['LRA']:g}")
+            # loudnorm works (and outputs) at 192 kHz
+            filters.append("aresample=48000")
+        return filters
+
+    def video_graph(self, source: str = '0:v', overlay: str = '1:v', output: str = 'vout',
+                    pre: Sequence[str] = ()) -> str:
+        """Video branch from ``[source]`` to ``[output]``, after the ``pre`` filters"""
+        chain = [*pre, *self.video_filters()]
+        if self.watermark_path:
+            x, y = self.watermark_position
+            return (
+                f"[{source}]{','.join(chain) or 'null'}[{output}base];"
+                f"[{output}base][{overlay}]overlay={x}:{y}:format=auto,format=yuv420p[{output}]"
+            )
+        return f"[{source}]{','.join(chain + ['format=yuv420p'])}[{output}]"
+
+    def filter_graph(self) -> str:
+        """The ``-filter_complex`` graph producing ``[vout]`` (and ``[aout]`` with audio edits)"""
+        graph = self.video_graph()
+        audio = self.audio_filters() if self.has_audio else []
+        if audio:
+            graph += f";[0:a]{','.join(audio)}[aout]"
+        return graph
+
+    def input_args(self) -> List[str]:
+        """Inputs, with trimming done as an input-side seek"""
+        args = []
+        if self.start:
+            args.extend(['-ss', f"{self.start:.3f}"])
+        if self.duration is not None:
+            args.extend(['-t', f"{self.duration:.3f}"])
+        args.extend(['-i', self.source])
+        if self.watermark_path:
+            args.extend(['-i', self.watermark_path])
+        return args
+
+    def output_args(self, settings: Dict[str, Any]) -> List[str]:
+        """Stream mapping and encoder settings of the single encode"""
+        args = ['-filter_complex', self.filter_graph(), '-map', '[vout]']
+        if not self.has_audio:
+            args.append('-an')
+        else:
+            args.extend(['-map', '[aout]'] if self.audio_filters() else ['-map', '0:a?'])
+        return args + encoder_args(settings)
+
+    def command(self, ffmpeg_path: str, output_path: str, settings: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Complete ffmpeg argv for this plan"""
+        return [
+            ffmpeg_path, '-hide_banner', '-nostdin',
+            *self.input_args(),
+            *self.output_args(settings or {}),
+            '-y', output_path
+        ]
+
+class BatchRenderPlan:
+    """Several clips of one source rendered by a single ffmpeg process.
+
+    The source is opened once, seeked to the earliest clip and decoded once
+    in timeline order; ``split``/``asplit`` fan the frames out to one
+    ``trim``-med branch per clip, each with its own edits (a
+    :class:`RenderPlan`), encoder and output file.
+    """
+
+    def __init__(self, source: str, has_audio: bool = True):
+        self.source = source
+        self.has_audio = has_audio
+        self.outputs: List[Tuple[RenderPlan, str, Dict[str, Any]]] = []
+
+    def add(self, plan: RenderPlan, output_path: str, settings: Optional[Dict[str, Any]] = None) -> 'BatchRenderPlan':
+        if plan.duration is None:
+            raise ValueError("Batched clips need a trim with a duration")
+        self.outputs.append((plan, output_path, settings or {}))
+        return self
+
+    @property
+    def window(self) -> Tuple[float, float]:
+        """Part of the source (start, end) that has to be decoded"""
+        start = min(plan.start or 0.0 for plan, _, _ in self.outputs)
+        end = max((plan.start or 0.0) + plan.duration for plan, _, _ in self.outputs)
+        return start, end
+
+    def filter_graph(self) -> str:
+        """Graph producing ``[v<i>]`` (and ``[a<i>]``) for the ``i``-th output"""
+        window_start, _ = self.window
+        count = len(self.outputs)
+        parts = [f"[0:v]split={count}" + ''.join(f"[v{i}in]" for i in range(count))]
+        if self.has_audio:
+            parts.append(f"[0:a]asplit={count}" + ''.join(f"[a{i}in]" for i in range(count)))
+
+        overlay_input = 1
+        for i, (plan, _, _) in enumerate(self.outputs):
+            start = (plan.start or 0.0) - window_start
+            span = f"start={start:.3f}:end={start + plan.duration:.3f}"
+            parts.append(plan.video_graph(f"v{i}in", f"{overlay_input}:v", f"v{i}",
+                                          pre=[f"trim={span}", 'setpts=PTS-STARTPTS']))
+            if plan.watermark_path:
+                overlay_input += 1
+            if self.has_audio:
+                # aresample keeps a branch's format needs (loudnorm's 192 kHz) from reaching the shared split
+                audio = [f"atrim={span}", 'asetpts=PTS-STARTPTS', 'aresample', *plan.audio_filters()]
+                parts.append(f"[a{i}in]{','.join(audio)}[a{i}]")
+        return ';'.join(parts)
+
+    def input_args(self) -> List[str]:
+        start, end = self.window
+        args = ['-ss', f"{start:.3f}"] if start else []
+        args.extend(['-t', f"{end - start:.3f}", '-i', self.source])
+        for plan, _, _ in self.outputs:
+            if plan.watermark_path:
+                args.extend(['-i', plan.watermark_path])
+        return args
+
+    def command(self, ffmpeg_path: str, threads: Optional[int] = None) -> List[str]:
+        """Complete ffmpeg argv; ``threads`` caps each output's encoder threads"""
+        cmd = [ffmpeg_path, '-hide_banner', '-nostdin', '-y', *self.input_args(),
+               '-filter_complex', self.filter_graph()]
+        for i, (_, output_path, settings) in enumerate(self.outputs):
+            # setpts leaves the frame rate unknown; keep the source frame timing
+            cmd.extend(['-map', f"[v{i}]", '-fps_mode:v', 'passthrough'])
+            if self.has_audio:
+                cmd.extend(['-map', f"[a{i}]"])
+            cmd.extend(encoder_args(settings))
+            if threads:
+                cmd.extend(['-threads', str(threads)])
+            cmd.append(output_path)
+        return cmd
+
+def group_clips(spans: List[Tuple[float, float]], max_outputs: int, max_gap: float) -> List[List[int]]:
+    """Indices of clips (given as ``(start, end)``) grouped for batch renders, in timeline order.
+
+    A group is closed when it holds ``max_outputs`` clips, which bounds the
+    encoders (and their frame buffers) alive in one process, or when the next
+    clip starts more than ``max_gap`` seconds after the group ends, since
+    seeking over the gap is cheaper than decoding it.
+    """
+    groups: List[List[int]] = []
+    current: List[int] = []
+    current_end = 0.0
+    for i in sorted(range(len(spans)), key=lambda i: spans[i][0]):
+        start, end = spans[i]
+        if current and (len(current) >= max_outputs or start - current_end > max_gap):
+            groups.append(current)
+            current = []
+        if not current:
+            current_end = end
+        current.append(i)
+        current_end = max(current_end, end)
+    if current:
+        groups.append(current)
+    return groups
+
+def encoder_args(settings: Dict[str, Any]) -> List[str]:
+    """Encoder settings of one output"""
+    output_format = settings.get('format', 'mp4')
+    args = ['-c:v', settings.get('video_codec') or VIDEO_CODECS.get(output_format, 'libx264')]
+    if settings.get('bitrate'):
+        args.extend(['-b:v', settings['bitrate']])
+    else:
+        args.extend(['-crf', str(settings.get('crf', 23))])
+        if output_format == 'webm':
+            args.extend(['-b:v', '0'])
+    if output_format != 'webm':
+        args.extend(['-preset', settings.get('preset', 'fast')])
+
+    args.extend(['-c:a', settings.get('audio_codec') or AUDIO_CODECS.get(output_format, 'aac')])
+    args.extend(['-b:a', settings.get('audio_bitrate', '128k')])
+    if output_format in ('mp4', 'mov'):
+        args.extend(['-movflags', '+faststart'])
+    # Any further output options, passed through as given
+    args.extend(settings.get('extra_args', []))
+    return args
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from services.disk_lru import DiskLRUCache
+
+try:
+    from prometheus_client import Counter
+except ImportError:
+    Counter = None
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics (only when prometheus_client is installed)
+if Counter:
+    ai_cache_requests = Counter('ai_response_cache_requests_total', 'AI response cache lookups', ['provider', 'result'])
+
+class ResponseCache(DiskLRUCache):
+    """Persistent, content-addressed cache of parsed AI provider responses.
+
+    Entries are keyed by provider, model, the whitespace-normalized prompt
+    and a digest of the exact frame payloads sent, so re-running an analysis
+    on unchanged frames (or on a duplicated project) skips the provider call.
+    Each entry is a small JSON file; entries expire after ``ttl`` seconds and
+    the least recently used ones are evicted once the cache grows past
+    ``max_bytes``.
+    """
+
+    entry_glob = '*.json'
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        super().__init__(
+            cache_dir or os.getenv('AI_CACHE_DIR', Path(tempfile.gettempdir()) / "openclip_ai_cache"),
+            max_bytes or int(os.getenv('AI_CACHE_MAX_BYTES', 64 * 1024 ** 2))
+        )
+        self.ttl = ttl or float(os.getenv('AI_CACHE_TTL', 7 * 24 * 3600))
+
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def key(self, provider: str, model: str, prompt: str, payloads: Iterable[Union[bytes, str]] = ()) -> str:
+        """Content address of one provider request"""
+        hasher = hashlib.sha256()
+        for part in (provider, model, ' '.join(prompt.split())):
+            hasher.update(part.encode('utf-8'))
+            hasher.update(b'\0')
+        for payload in payloads:
+            hasher.update(payload.encode('utf-8') if isinstance(payload, str) else payload)
+            hasher.update(b'\0')
+        return hasher.hexdigest()
+
+    def lookup(self, provider: str, model: str, prompt: str,
+               payloads: Iterable[Union[bytes, str]] = ()) -> Tuple[str, Optional[Any]]:
+        """Return the request's key and its cached result (None on a miss)"""
+        key = self.key(provider, model, prompt, payloads)
+        return key, self.get(key, provider)
+
+    def get(self, key: str, provider: str = 'unknown') -> Optional[Any]:
+        """Return a cached result, or None when missing or expired"""
+        path = self._entry_path(key)
+        result = None
+        expired = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if time.time() - entry.get('stored_at', 0) <= self.ttl:
+                result = entry.get('result')
+            else:
+                expired = True
+        except (FileNotFoundError, ValueError, OSError):
+            pass
+
+        with self._stats_lock:
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        if expired:
+            self._discard(path)
+        elif result is not None:
+            self._touch(path)
+
+        if Counter:
+            ai_cache_requests.labels(provider=provider, result='hit' if result is not None else 'miss').inc()
+        return result
+
+    def put(self, key: str, result: Any):
+        """Store a parsed result and evict old entries if over budget"""
+        path = self._entry_path(key)
+        entry = {'stored_at': time.time(), 'result': result}
+        try:
+            self._write_entry(path, lambda f: json.dump(entry, f), mode='w')
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not cache AI response {key[:12]}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy and hit rate since startup"""
+        stats = super().stats()
+        with self._stats_lock:
+            lookups = self._hits + self._misses
+            stats.update({
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0
+            })
+        return stats
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+# Shared instance
+response_cache = ResponseCache()
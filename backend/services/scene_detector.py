@@ -0,0 +1,355 @@
+import re
+import logging
+import subprocess
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from services.frame_reader import FFmpegFrameReader
+from services.keyframe_index import KeyframeIndex
+
+logger = logging.getLogger(__name__)
+
+# Videos shorter than two chunks are scanned in a single pass
+SCENE_CHUNK_SECONDS = 60
+
+class SceneCutDetector:
+    """Streaming hard-cut detector working on tiny downscaled frames.
+
+    Frames arrive in fixed-size batches from one decode pipe (ffmpeg scales
+    them to ``width x height`` itself), so memory stays bounded however long
+    the video is. For each batch the HSV planes and histograms of all frames
+    are computed at once, and every frame is scored against its predecessor
+    as the geometric mean of the mean pixel difference and the histogram
+    distance: camera motion moves pixels but keeps the histogram, lighting
+    drifts change little of either, a cut changes both. A frame is a cut when
+    its score clears both the absolute ``threshold`` and an adaptive one
+    (rolling mean plus ``sensitivity`` standard deviations of the preceding
+    scores), which keeps busy footage from being reported as cuts.
+    """
+
+    HUE_BINS = 16
+    SAT_BINS = 8
+    VAL_BINS = 16
+
+    def __init__(self, frame_reader: Optional[FFmpegFrameReader] = None, width: int = 64, height: int = 36,
+                 batch_size: int = 256, window_seconds: float = 2.0, sensitivity: float = 3.0,
+                 min_scene_seconds: float = 0.5):
+        self.frame_reader = frame_reader
+        self.width = width
+        self.height = height
+        self.batch_size = batch_size
+        self.window_seconds = window_seconds
+        self.sensitivity = sensitivity
+        self.min_scene_seconds = min_scene_seconds
+
+    def detect(self, video_path: str, threshold: float = 0.12) -> List[Dict[str, Any]]:
+        """Return the detected cuts as ``{'frame_number', 'timestamp', 'confidence'}``"""
+        if self.frame_reader:
+            try:
+                fps = self.frame_reader.probe(video_path)['fps']
+                batches = self.frame_reader.iter_batches(
+                    video_path,
+                    f"scale={self.width}:{self.height}:flags=area",
+                    self.width, self.height,
+                    batch_size=self.batch_size
+                )
+                return self.detect_batches(batches, fps, threshold)
+            except Exception as e:
+                logger.warning(f"FFmpeg scene detection failed, falling back to OpenCV: {e}")
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise Exception(f"Could not open video file: {video_path}")
+        try:
+            return self.detect_batches(self._opencv_batches(cap), cap.get(cv2.CAP_PROP_FPS), threshold)
+        finally:
+            cap.release()
+
+    def detect_range(self, video_path: str, keyframes: KeyframeIndex, start_frame: int, end_frame: int,
+                     fps: float, threshold: float = 0.12) -> List[Dict[str, Any]]:
+        """Cuts among frames ``start_frame`` (a keyframe) up to ``end_frame``.
+
+        Decoding starts directly at the keyframe and stops once the range has
+        been read; frame numbers in the result are absolute.
+        """
+        input_args = []
+        if start_frame > 0:
+            input_args = ['-noaccurate_seek', '-ss', f"{keyframes.seek_time(start_frame):.3f}"]
+        batches = self.frame_reader.iter_batches(
+            video_path,
+            f"scale={self.width}:{self.height}:flags=area",
+            self.width, self.height,
+            batch_size=self.batch_size,
+            input_args=input_args
+        )
+        try:
+            return self.detect_batches(
+                self._take(batches, end_frame - start_frame), fps, threshold, frame_offset=start_frame
+            )
+        finally:
+            batches.close()
+
+    def window_frames(self, fps: float) -> int:
+        """Length of the adaptive threshold's history in frames"""
+        return max(8, int(fps * self.window_seconds)) if fps > 0 else 48
+
+    def min_gap_frames(self, fps: float) -> int:
+        """Minimum distance between two reported cuts in frames"""
+        return max(1, int(fps * self.min_scene_seconds)) if fps > 0 else 12
+
+    def detect_batches(self, batches: Iterator[np.ndarray], fps: float, threshold: float,
+                       frame_offset: int = 0) -> List[Dict[str, Any]]:
+        """Run detection over a stream of ``N x H x W x 3`` RGB batches"""
+        window = self.window_frames(fps)
+        min_gap = self.min_gap_frames(fps)
+
+        cuts = []
+        prev_hist = prev_planes = None
+        tail = np.empty(0, dtype=np.float64)
+        offset = frame_offset
+        last_cut = frame_offset - min_gap
+
+        for batch in batches:
+            hist, planes = self._features(batch)
+            if prev_hist is not None:
+                hist = np.concatenate([prev_hist, hist])
+                planes = np.concatenate([prev_planes, planes])
+                first_frame = offset
+            else:
+                first_frame = offset + 1
+
+            # Keep the last frame for the next batch (the batch buffer is reused)
+            prev_hist, prev_planes = hist[-1:].copy(), planes[-1:].copy()
+            offset += len(batch)
+
+            if len(hist) < 2:
+                continue
+
+            # Each per-channel histogram sums to 1, so the L1 distance over
+            # all three channels lies in [0, 6]
+            hist_diff = np.abs(np.diff(hist, axis=0)).sum(axis=1) / 6.0
+
+            # Hue is circular (OpenCV's 8-bit range is 0-179)
+            pixel_diff = np.abs(np.diff(planes, axis=0))
+            pixel_diff[..., 0] = np.minimum(pixel_diff[..., 0], 180.0 - pixel_diff[..., 0]) * (255.0 / 90.0)
+            pixel_diff = pixel_diff.mean(axis=(1, 2)) / 255.0
+
+            scores = np.sqrt(hist_diff * pixel_diff)
+
+            # Rolling statistics of the preceding ``window`` scores
+            series = np.concatenate([tail, scores])
+            positions = np.arange(len(tail), len(series))
+            starts = np.maximum(0, positions - window)
+            counts = positions - starts
+            sums = np.concatenate([[0.0], np.cumsum(series)])
+            squares = np.concatenate([[0.0], np.cumsum(series ** 2)])
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(counts > 0, (sums[positions] - sums[starts]) / counts, 0.0)
+                var = np.where(counts > 0, (squares[positions] - squares[starts]) / counts - mean ** 2, 0.0)
+            adaptive = mean + self.sensitivity * np.sqrt(np.maximum(var, 0.0))
+
+            for j in np.flatnonzero((scores > threshold) & (scores > adaptive)):
+                frame_number = first_frame + int(j)
+                if frame_number - last_cut < min_gap:
+                    continue
+                last_cut = frame_number
+                cuts.append({
+                    'frame_number': frame_number,
+                    'timestamp': frame_number / fps if fps > 0 else 0,
+                    'confidence': round(float(min(scores[j], 1.0)), 3)
+                })
+
+            tail = series[-window:]
+
+        return cuts
+
+    def _features(self, batch: np.ndarray):
+        """HSV histograms (``N x bins``) and HSV planes (``N x H*W x 3``) of a batch"""
+        n, height, width, _ = batch.shape
+        pixels = height * width
+
+        # One cvtColor call for the whole batch, stacked as a tall image
+        hsv = cv2.cvtColor(np.ascontiguousarray(batch).reshape(n * height, width, 3), cv2.COLOR_RGB2HSV)
+        hsv = hsv.reshape(n, pixels, 3).astype(np.int32)
+
+        bins = self.HUE_BINS + self.SAT_BINS + self.VAL_BINS
+        index = np.concatenate([
+            hsv[..., 0] * self.HUE_BINS // 180,
+            hsv[..., 1] * self.SAT_BINS // 256 + self.HUE_BINS,
+            hsv[..., 2] * self.VAL_BINS // 256 + self.HUE_BINS + self.SAT_BINS
+        ], axis=1) + (np.arange(n)[:, None] * bins)
+        hist = np.bincount(index.ravel(), minlength=n * bins).reshape(n, bins) / float(pixels)
+
+        return hist, hsv.astype(np.float32)
+
+    @staticmethod
+    def _take(batches: Iterator[np.ndarray], frames: int) -> Iterator[np.ndarray]:
+        """Truncate a batch stream after ``frames`` frames"""
+        if frames <= 0:
+            return
+        for batch in batches:
+            yield batch[:frames]
+            frames -= len(batch)
+            if frames <= 0:
+                break
+
+    def _opencv_batches(self, cap) -> Iterator[np.ndarray]:
+        """Downscaled RGB batches decoded with OpenCV"""
+        buffer = np.empty((self.batch_size, self.height, self.width, 3), dtype=np.uint8)
+        count = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            small = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+            buffer[count] = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+            count += 1
+            if count == self.batch_size:
+                yield buffer
+                count = 0
+        if count:
+            yield buffer[:count]
+
+class FFmpegSceneDetector:
+    """Scene cuts scored by ffmpeg's own ``select='gt(scene,T)'`` filter.
+
+    Frames are scaled down right after decoding and never leave ffmpeg; only
+    the log lines of frames whose scene score exceeds the threshold are read
+    back, line by line, from stderr as ffmpeg produces them.
+    """
+
+    _PTS_TIME = re.compile(r'pts_time:\s*(-?[\d.]+)')
+    _SCORE = re.compile(r'lavfi\.scene_score=([\d.]+)')
+    _DURATION = re.compile(r'Duration:\s*(\d+):(\d+):([\d.]+)')
+
+    def __init__(self, ffmpeg_path: str = 'ffmpeg', height: int = 180, min_scene_seconds: float = 0.5):
+        self.ffmpeg_path = ffmpeg_path
+        self.height = height
+        self.min_scene_seconds = min_scene_seconds
+
+    def iter_cuts(self, video_path: str, threshold: float = 0.3) -> Iterator[Dict[str, float]]:
+        """Yield ``{'timestamp', 'confidence'}`` for each cut as ffmpeg reports it"""
+        for kind, timestamp, score in self._events(video_path, threshold):
+            if kind == 'cut':
+                yield {'timestamp': timestamp, 'confidence': score}
+
+    def detect_scenes(self, video_path: str, threshold: float = 0.3) -> List[Dict[str, Any]]:
+        """Scenes between consecutive cuts, covering the whole video"""
+        duration = 0.0
+        cuts = []
+        for kind, timestamp, score in self._events(video_path, threshold):
+            if kind == 'duration':
+                duration = timestamp
+            else:
+                cuts.append((timestamp, score))
+
+        bounds = [(0.0, 1.0)] + cuts
+        end_times = [timestamp for timestamp, _ in cuts] + [max(duration, cuts[-1][0] if cuts else 0.0)]
+
+        scenes = []
+        for (start_time, confidence), end_time in zip(bounds, end_times):
+            if end_time <= start_time:
+                continue
+            scenes.append({
+                'scene_id': len(scenes) + 1,
+                'start_time': round(start_time, 3),
+                'end_time': round(end_time, 3),
+                'duration': round(end_time - start_time, 3),
+                'confidence': round(confidence, 3)
+            })
+        return scenes
+
+    def _events(self, video_path: str, threshold: float) -> Iterator[Tuple[str, float, float]]:
+        """Parse ffmpeg's stderr into ``('duration' | 'cut', seconds, score)`` events"""
+        video_filter = (
+            f"scale=-2:'min({self.height},ih)':flags=fast_bilinear,"
+            f"select='gt(scene,{threshold})',"
+            f"metadata=print:key=lavfi.scene_score,"
+            f"showinfo"
+        )
+        cmd = [
+            self.ffmpeg_path,
+            '-hide_banner', '-nostdin', '-nostats',
+            '-loglevel', 'info',
+            '-i', video_path,
+            '-an', '-sn', '-dn',
+            '-vf', video_filter,
+            '-f', 'null', '-'
+        ]
+        process = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors='ignore', bufsize=1
+        )
+
+        # metadata=print logs the score just before showinfo logs the frame
+        score = None
+        last_cut = None
+        tail = deque(maxlen=5)
+        try:
+            for line in process.stderr:
+                tail.append(line.strip())
+                if 'lavfi.scene_score=' in line:
+                    match = self._SCORE.search(line)
+                    score = float(match.group(1)) if match else None
+                elif 'Parsed_showinfo' in line and 'pts_time:' in line:
+                    match = self._PTS_TIME.search(line)
+                    if match:
+                        timestamp = float(match.group(1))
+                        # A flash or fade scores on consecutive frames; keep the first
+                        if last_cut is None or timestamp - last_cut >= self.min_scene_seconds:
+                            last_cut = timestamp
+                            yield 'cut', timestamp, min(score if score is not None else threshold, 1.0)
+                    score = None
+                elif 'Duration:' in line:
+                    match = self._DURATION.search(line)
+                    if match:
+                        hours, minutes, seconds = match.groups()
+                        yield 'duration', int(hours) * 3600 + int(minutes) * 60 + float(seconds), 0.0
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+        if process.returncode != 0:
+            raise Exception(f"ffmpeg scene detection failed: {' | '.join(tail)}")
+
+def plan_chunks(keyframes: KeyframeIndex, chunks: int, overlap_frames: int) -> List[Tuple[int, int, int]]:
+    """Split a video at keyframes into ``(decode_from, keep_from, keep_to)`` frame ranges.
+
+    Each chunk owns the cuts in ``[keep_from, keep_to)`` but starts decoding
+    at the keyframe at least ``overlap_frames`` earlier, so the transition
+    into its first frame and the adaptive threshold's history are covered.
+    """
+    total = keyframes.frame_count
+    bounds = [0]
+    for i in range(1, chunks):
+        frame = keyframes.keyframe_frame_before(total * i // chunks)
+        if frame > bounds[-1]:
+            bounds.append(frame)
+    bounds.append(total)
+
+    return [
+        (keyframes.keyframe_frame_before(max(keep_from - overlap_frames, 0)), keep_from, keep_to)
+        for keep_from, keep_to in zip(bounds, bounds[1:])
+        if keep_to > keep_from
+    ]
+
+def merge_chunk_cuts(plan: Sequence[Tuple[int, int, int]], results: Sequence[List[Dict[str, Any]]],
+                     min_gap: int) -> List[Dict[str, Any]]:
+    """Combine per-chunk cuts, dropping overlap duplicates and cuts closer than ``min_gap``"""
+    owned = [
+        cut
+        for (_, keep_from, keep_to), cuts in zip(plan, results)
+        for cut in cuts
+        if keep_from <= cut['frame_number'] < keep_to
+    ]
+    owned.sort(key=lambda cut: cut['frame_number'])
+
+    merged = []
+    for cut in owned:
+        if merged and cut['frame_number'] - merged[-1]['frame_number'] < min_gap:
+            continue
+        merged.append(cut)
+    return merged
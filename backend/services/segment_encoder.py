@@ -0,0 +1,194 @@
+import os
+import uuid
+import shutil
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.keyframe_index import KeyframeIndex
+from services.render_planner import RenderPlan, encoder_args
+from services.smart_cut import load_keyframe_index, run_media_command, seek_args, write_concat_list
+
+logger = logging.getLogger(__name__)
+
+# Output containers whose segments can be joined by the concat demuxer without re-encoding
+SEGMENT_FORMATS = ('mp4', 'mov', 'mkv')
+
+def plan_segments(index: KeyframeIndex, start: float, end: float, count: int) -> List[Tuple[int, int]]:
+    """Split the frames of ``[start, end)`` into up to ``count`` ``[first, stop)`` ranges of similar length.
+
+    Inner boundaries are snapped to the nearest source keyframe, so every
+    segment but the first starts decoding right at its first frame.
+    """
+    first = int(np.searchsorted(index.pts, start - 1e-6, side='left'))
+    stop = int(np.searchsorted(index.pts, end - 1e-6, side='left'))
+    keyframes = index.keyframe_frames
+    inside = keyframes[(keyframes > first) & (keyframes < stop)]
+    if stop <= first or count < 2 or not len(inside):
+        return [(first, stop)] if stop > first else []
+
+    boundaries = {first, stop}
+    for k in range(1, count):
+        target = first + (stop - first) * k / count
+        boundaries.add(int(inside[np.abs(inside - target).argmin()]))
+    ordered = sorted(boundaries)
+    return list(zip(ordered, ordered[1:]))
+
+class SegmentEncoder:
+    """Long renders split into time segments that are encoded concurrently.
+
+    The output timeline is cut at source keyframes into at most ``workers``
+    segments of at least ``min_segment`` seconds. Each segment is a separate
+    ffmpeg process that seeks straight to its first frame, runs the plan's
+    video graph with the frame timestamps it would have in a single-pass
+    render (so subtitles, fades and overlays line up) and encodes with the
+    same settings; the cores are shared out as encoder threads. The audio is
+    encoded once for the whole clip alongside them (loudness normalization
+    needs the whole programme), and the pieces are joined by the concat
+    demuxer with stream copy. Untrimmed plans are split over the whole
+    source, whose length comes from its keyframe index. Plans that are not
+    ``splittable``, short renders and other containers are left to the
+    caller's single encode.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str], ffprobe_path: Optional[str], temp_dir: str,
+                 workers: Optional[int] = None, min_segment: Optional[float] = None):
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.temp_dir = str(temp_dir)
+        self.workers = workers or int(os.getenv('SEGMENT_WORKERS', os.cpu_count() or 1))
+        self.min_segment = min_segment or float(os.getenv('SEGMENT_MIN_SECONDS', 20))
+
+    async def render(self, plan: RenderPlan, output_path: str,
+                     settings: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Render ``plan`` into ``output_path`` in parallel segments.
+
+        Returns a summary of the render, or None when segmenting does not
+        apply (or fails) and the caller should render in one pass instead.
+        """
+        settings = settings or {}
+        if (not self.ffmpeg_path or not self.ffprobe_path or not plan.splittable
+                or settings.get('format', 'mp4') not in SEGMENT_FORMATS):
+            return None
+        if plan.duration is not None and self._segment_count(plan.duration) < 2:
+            return None
+
+        index = await load_keyframe_index(plan.source, self.ffprobe_path)
+        if index is None:
+            return None
+        start = plan.start or 0.0
+        if plan.duration is not None:
+            end = start + plan.duration
+            count = self._segment_count(plan.duration)
+        else:
+            # Untrimmed: every frame from the start to the end of the source
+            end = float('inf')
+            count = self._segment_count(index.duration - start)
+        segments = plan_segments(index, start, end, count)
+        if len(segments) < 2:
+            return None
+
+        work_dir = os.path.join(self.temp_dir, f"segments_{uuid.uuid4().hex[:12]}")
+        os.makedirs(work_dir, exist_ok=True)
+        threads = max(1, (os.cpu_count() or 1) // len(segments))
+        try:
+            pieces = [os.path.join(work_dir, f"segment_{i:04d}.mp4") for i in range(len(segments))]
+            jobs = [
+                self._encode_segment(plan, index, first, stop, piece, settings, threads)
+                for (first, stop), piece in zip(segments, pieces)
+            ]
+            audio_path = None
+            if plan.has_audio:
+                audio_path = os.path.join(work_dir, 'audio.m4a')
+                jobs.append(self._encode_audio(plan, audio_path, settings))
+
+            # Let every encode finish before cleaning up, then report the first failure
+            for result in await asyncio.gather(*jobs, return_exceptions=True):
+                if isinstance(result, BaseException):
+                    raise result
+            starts = [self._output_time(plan, index, first) for first, _ in segments]
+            durations = [next_start - start for start, next_start in zip(starts, starts[1:])]
+            await self._concat(pieces, durations, audio_path, output_path, work_dir, settings)
+        except Exception as e:
+            logger.warning(f"Segmented render of {os.path.basename(output_path)} failed, rendering in one pass: {e}")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            return None
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        frames = segments[-1][1] - segments[0][0]
+        logger.info(
+            f"Rendered {os.path.basename(output_path)} as {len(segments)} parallel segments "
+            f"({frames} source frames, {threads} threads each)"
+        )
+        return {'path': output_path, 'segments': len(segments), 'frames': frames}
+
+    def _segment_count(self, duration: float) -> int:
+        """Number of segments for a render of ``duration`` seconds"""
+        return min(self.workers, int(duration // self.min_segment))
+
+    def _output_time(self, plan: RenderPlan, index: KeyframeIndex, first: int) -> float:
+        """Time of frame ``first`` in the rendered clip"""
+        offset = float(index.pts[first]) - (plan.start or 0.0)
+        if plan.frame_rate:
+            # The fps filter puts the first frame of a segment on its output grid
+            return round(offset * plan.frame_rate) / plan.frame_rate
+        return offset
+
+    async def _encode_segment(self, plan: RenderPlan, index: KeyframeIndex, first: int, stop: int,
+                              output_path: str, settings: Dict[str, Any], threads: int):
+        """Encode the video of source frames ``[first, stop)``"""
+        # Timestamps as in a single-pass render, which starts the clip at the trim start
+        offset = float(index.pts[first]) - (plan.start or 0.0)
+        pre = [f"trim=end_frame={stop - first}", f"setpts=PTS-STARTPTS+{offset:.6f}/TB"]
+        cmd = [self.ffmpeg_path, '-hide_banner', '-nostdin', *seek_args(index, first), '-i', plan.source]
+        if plan.watermark_path:
+            cmd.extend(['-i', plan.watermark_path])
+        cmd.extend([
+            '-filter_complex', plan.video_graph(pre=pre), '-map', '[vout]', '-an', '-sn',
+            '-fps_mode:v', 'passthrough', *encoder_args(settings), '-threads', str(threads),
+            '-avoid_negative_ts', 'make_zero', '-y', output_path
+        ])
+        await run_media_command(cmd, 'segment encode')
+
+    async def _encode_audio(self, plan: RenderPlan, output_path: str, settings: Dict[str, Any]):
+        """Encode the clip's audio in one piece, with the plan's audio filters"""
+        cmd = [self.ffmpeg_path, '-hide_banner', '-nostdin']
+        if plan.start:
+            cmd.extend(['-ss', f"{plan.start:.3f}"])
+        if plan.duration is not None:
+            cmd.extend(['-t', f"{plan.duration:.3f}"])
+        cmd.extend(['-i', plan.source, '-vn', '-sn'])
+        audio = plan.audio_filters()
+        if audio:
+            cmd.extend(['-filter_complex', f"[0:a]{','.join(audio)}[aout]", '-map', '[aout]'])
+        else:
+            cmd.extend(['-map', '0:a:0'])
+        cmd.extend([
+            '-c:a', settings.get('audio_codec') or 'aac', '-b:a', settings.get('audio_bitrate', '128k'),
+            '-y', output_path
+        ])
+        await run_media_command(cmd, 'audio encode')
+
+    async def _concat(self, pieces: List[str], durations: List[float], audio_path: Optional[str],
+                      output_path: str, work_dir: str, settings: Dict[str, Any]):
+        """Join the video segments and add the audio, both stream-copied.
+
+        Each segment but the last gets an explicit duration: the muxer does
+        not record how long a segment's last frame lasts, and without it the
+        next segment would start one frame early.
+        """
+        list_path = os.path.join(work_dir, 'segments.txt')
+        write_concat_list(list_path, pieces, durations)
+
+        cmd = [self.ffmpeg_path, '-hide_banner', '-nostdin', '-f', 'concat', '-safe', '0', '-i', list_path]
+        if audio_path:
+            cmd.extend(['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0'])
+        cmd.extend(['-c', 'copy'])
+        if settings.get('format', 'mp4') in ('mp4', 'mov'):
+            cmd.extend(['-movflags', '+faststart'])
+        cmd.extend(['-y', output_path])
+        await run_media_command(cmd, 'concat')
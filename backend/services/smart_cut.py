@@ -0,0 +1,227 @@
+import os
+import json
+import uuid
+import shutil
+import asyncio
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from services.keyframe_index import KeyframeIndex, build_keyframe_index, get_keyframe_index
+from services.media_executor import media_executor
+
+logger = logging.getLogger(__name__)
+
+# Source codecs whose partial GOPs can be re-encoded to splice with copied ones
+SMART_CUT_ENCODERS = {
+    'h264': 'libx264'
+}
+
+# Output containers able to carry the copied source bitstream
+SMART_CUT_FORMATS = ('mp4', 'mov', 'mkv')
+
+class CutPlan(NamedTuple):
+    """Frame ranges (``[first, last)`` in presentation order) of a smart cut"""
+    first: int
+    copy_start: int
+    copy_end: int
+    stop: int
+
+    @property
+    def copied_frames(self) -> int:
+        return self.copy_end - self.copy_start
+
+def plan_cut(index: KeyframeIndex, start: float, end: float) -> Optional[CutPlan]:
+    """Split ``[start, end)`` into a re-encoded head, copied whole GOPs and a re-encoded tail.
+
+    Returns None when no complete GOP lies inside the range (nothing to copy).
+    """
+    first = int(np.searchsorted(index.pts, start - 1e-6, side='left'))
+    stop = int(np.searchsorted(index.pts, end - 1e-6, side='left'))
+    keyframes = index.keyframe_frames
+    inside = keyframes[(keyframes >= first) & (keyframes <= stop)]
+    if len(inside) < 2:
+        return None
+    return CutPlan(first, int(inside[0]), int(inside[-1]), stop)
+
+def seek_args(index: KeyframeIndex, first: int) -> List[str]:
+    """Input options that make frame ``first`` the first decoded frame"""
+    if index.keyframe[first]:
+        # Starts on a keyframe: decode from it directly
+        return ['-noaccurate_seek', '-ss', f"{index.seek_time(first):.6f}"]
+    # Accurate seek to midway between the previous frame and the first one
+    return ['-ss', f"{(index.pts[first - 1] + index.pts[first]) / 2:.6f}"]
+
+async def load_keyframe_index(source: str, ffprobe_path: Optional[str]) -> Optional[KeyframeIndex]:
+    """The source's keyframe index, built (and stored) now if it has none yet"""
+    index = get_keyframe_index(source)
+    if index is None and ffprobe_path:
+        try:
+            index = await media_executor.run_io(build_keyframe_index, source, ffprobe_path)
+        except Exception as e:
+            logger.warning(f"Could not index keyframes for {source}: {e}")
+    return index
+
+def write_concat_list(path: str, pieces: List[str], durations: Sequence[float] = ()):
+    """Concat demuxer list of ``pieces``, with explicit durations for the first ``len(durations)``"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, piece in enumerate(pieces):
+            escaped = piece.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+            if i < len(durations):
+                f.write(f"duration {durations[i]:.6f}\n")
+
+async def run_media_command(cmd: List[str], action: str) -> str:
+    """Run an ffmpeg/ffprobe command and return its stdout; raise with the stderr tail on failure"""
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise Exception(f"FFmpeg {action} failed: {stderr.decode(errors='replace')[-2000:]}")
+    return stdout.decode(errors='replace')
+
+class SmartCutter:
+    """Frame-accurate trims that re-encode only the partial GOPs at the edges.
+
+    Every GOP that lies entirely inside the clip is stream-copied; only the
+    frames before the first keyframe inside the clip (head) and from the last
+    one to the end (tail) are decoded and re-encoded, with the source's codec,
+    profile and pixel format so the pieces splice cleanly. The pieces are
+    joined with the concat demuxer, which moves each piece's parameter sets
+    in-band; audio is cut once for the whole clip. Clips that contain
+    no whole GOP, sources without a supported codec and outputs that need
+    filters are left to the regular re-encoding path.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str], ffprobe_path: Optional[str], temp_dir: str):
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.temp_dir = str(temp_dir)
+
+    async def cut(self, source: str, start: float, end: float, output_path: str,
+                  settings: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Cut ``[start, end)`` of ``source`` into ``output_path``.
+
+        Returns a summary of the cut, or None when smart cutting does not
+        apply (or fails) and the caller should re-encode the clip instead.
+        """
+        settings = settings or {}
+        if not self.ffmpeg_path or settings.get('format', 'mp4') not in SMART_CUT_FORMATS:
+            return None
+
+        index = await load_keyframe_index(source, self.ffprobe_path)
+        stream = await self._probe_stream(source)
+        if index is None or stream is None or stream.get('codec_name') not in SMART_CUT_ENCODERS:
+            return None
+        plan = plan_cut(index, start, end)
+        if plan is None:
+            return None
+
+        work_dir = os.path.join(self.temp_dir, f"smartcut_{uuid.uuid4().hex[:12]}")
+        os.makedirs(work_dir, exist_ok=True)
+        try:
+            pieces = await asyncio.gather(
+                self._encode_piece(source, index, stream, plan.first, plan.copy_start,
+                                   os.path.join(work_dir, 'head.mp4'), settings),
+                self._copy_piece(source, index, plan.copy_start, plan.copy_end,
+                                 os.path.join(work_dir, 'middle.mp4')),
+                self._encode_piece(source, index, stream, plan.copy_end, plan.stop,
+                                   os.path.join(work_dir, 'tail.mp4'), settings)
+            )
+            await self._concat([piece for piece in pieces if piece], source, index, plan,
+                               output_path, work_dir, settings)
+        except Exception as e:
+            logger.warning(f"Smart cut of {os.path.basename(source)} failed, re-encoding instead: {e}")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            return None
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        total = plan.stop - plan.first
+        logger.info(
+            f"Smart cut {os.path.basename(output_path)}: copied {plan.copied_frames}/{total} frames, "
+            f"re-encoded {total - plan.copied_frames}"
+        )
+        return {
+            'path': output_path,
+            'frames': total,
+            'copied_frames': plan.copied_frames,
+            'reencoded_frames': total - plan.copied_frames
+        }
+
+    async def _probe_stream(self, source: str) -> Optional[Dict[str, Any]]:
+        """Codec parameters of the first video stream"""
+        if not self.ffprobe_path:
+            return None
+        stdout = await run_media_command([
+            self.ffprobe_path, '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'stream=codec_name,profile,level,pix_fmt,color_primaries,color_transfer,color_space',
+            '-of', 'json', source
+        ], 'probe')
+        streams = json.loads(stdout or '{}').get('streams') or []
+        return streams[0] if streams else None
+
+    async def _encode_piece(self, source: str, index: KeyframeIndex, stream: Dict[str, Any], first: int,
+                            stop: int, output_path: str, settings: Dict[str, Any]) -> Optional[str]:
+        """Re-encode frames ``[first, stop)`` to match the copied bitstream"""
+        if stop <= first:
+            return None
+        cmd = [
+            self.ffmpeg_path, '-hide_banner', '-nostdin', *seek_args(index, first), '-i', source,
+            '-map', '0:v:0', '-an', '-sn', '-frames:v', str(stop - first), '-fps_mode', 'passthrough',
+            '-c:v', SMART_CUT_ENCODERS[stream['codec_name']],
+            '-pix_fmt', stream.get('pix_fmt') or 'yuv420p',
+            '-crf', str(settings.get('crf', 18)), '-preset', settings.get('preset', 'fast')
+        ]
+        profile = (stream.get('profile') or '').lower()
+        if profile in ('baseline', 'constrained baseline', 'main', 'high'):
+            cmd.extend(['-profile:v', 'baseline' if 'baseline' in profile else profile])
+        if isinstance(stream.get('level'), int) and stream['level'] > 0:
+            cmd.extend(['-level:v', f"{stream['level'] / 10:g}"])
+        for key, option in (('color_primaries', '-color_primaries'), ('color_transfer', '-color_trc'),
+                            ('color_space', '-colorspace')):
+            if stream.get(key) and stream[key] != 'unknown':
+                cmd.extend([option, stream[key]])
+        cmd.extend(['-avoid_negative_ts', 'make_zero', '-y', output_path])
+        await run_media_command(cmd, 'edge encode')
+        return output_path
+
+    async def _copy_piece(self, source: str, index: KeyframeIndex, first: int, stop: int,
+                          output_path: str) -> str:
+        """Stream-copy the whole GOPs ``[first, stop)``"""
+        await run_media_command([
+            self.ffmpeg_path, '-hide_banner', '-nostdin',
+            '-ss', f"{index.seek_time(first):.6f}", '-i', source,
+            '-map', '0:v:0', '-an', '-sn', '-c:v', 'copy', '-copypriorss', '1', '-frames:v', str(stop - first),
+            '-avoid_negative_ts', 'make_zero', '-y', output_path
+        ], 'stream copy')
+        return output_path
+
+    async def _concat(self, pieces: List[str], source: str, index: KeyframeIndex, plan: CutPlan,
+                      output_path: str, work_dir: str, settings: Dict[str, Any]):
+        """Join the video pieces and add the clip's audio"""
+        list_path = os.path.join(work_dir, 'pieces.txt')
+        write_concat_list(list_path, pieces)
+
+        start = float(index.pts[plan.first])
+        end = float(index.pts[plan.stop]) if plan.stop < index.frame_count else None
+        audio_input = ['-ss', f"{start:.6f}"]
+        if end is not None:
+            audio_input.extend(['-t', f"{end - start:.6f}"])
+
+        cmd = [
+            self.ffmpeg_path, '-hide_banner', '-nostdin',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            *audio_input, '-i', source,
+            '-map', '0:v:0', '-map', '1:a:0?', '-c:v', 'copy',
+            '-c:a', settings.get('audio_codec') or 'aac', '-b:a', settings.get('audio_bitrate', '128k')
+        ]
+        if settings.get('format', 'mp4') in ('mp4', 'mov'):
+            cmd.extend(['-movflags', '+faststart'])
+        cmd.extend(['-y', output_path])
+        await run_media_command(cmd, 'concat')
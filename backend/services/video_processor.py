@@ -3,7 +3,7 @@ import asyncio
 import subprocess
 import json
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 import tempfile
 import shutil
@@ -11,7 +11,6 @@ from urllib.parse import urlparse
 from datetime import datetime
 import cv2
 import numpy as np
-from PIL import Image
 
 # For YouTube processing
 try:
@@ -19,7 +18,15 @@ try:
 except ImportError:
     yt_dlp = None
 
-from models.project import Clip, VideoData
+from models.project import VideoData
+from services.analysis_proxy import analysis_source
+from services.frame_batch import FrameBatch
+from services.frame_cache import frame_cache
+from services.frame_reader import FFmpegFrameReader
+from services.keyframe_index import KeyframeIndex, build_keyframe_index, get_keyframe_index
+from services.media_executor import media_executor
+from services.render_planner import group_clips
+from services.scene_detector import SCENE_CHUNK_SECONDS, SceneCutDetector, merge_chunk_cuts, plan_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +47,12 @@ class VideoProcessor:
         self.ffmpeg_path = self._find_ffmpeg()
         self.ffprobe_path = self._find_ffprobe()
         
+        # Single-pass rawvideo frame extraction (OpenCV is the fallback)
+        self.frame_reader = (
+            FFmpegFrameReader(self.ffmpeg_path, self.ffprobe_path)
+            if self.ffmpeg_path and self.ffprobe_path else None
+        )
+        
         self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.outputs_dir = os.path.join(self.base_dir, "outputs")
     
@@ -227,6 +240,18 @@ class VideoProcessor:
                 if not os.path.exists(file_path):
                     raise FileNotFoundError(f"Downloaded file not found: {file_path}")
             
+            # Hash the download once as its frame cache key, off the event loop
+            await media_executor.run_io(frame_cache.source_digest, file_path)
+            
+            # Index keyframes once so later seeks can land on them
+            keyframe_summary = None
+            if self.ffprobe_path:
+                try:
+                    index = await media_executor.run_io(build_keyframe_index, file_path, self.ffprobe_path)
+                    keyframe_summary = index.summary()
+                except Exception as e:
+                    logger.warning(f"Could not index keyframes for {file_path}: {e}")
+            
             # Extract metadata about the video
             metadata = await self.extract_metadata(file_path)
             
@@ -243,6 +268,7 @@ class VideoProcessor:
                 "duration": metadata.get('duration', 0),
                 "resolution": metadata.get('resolution', 'Unknown'),
                 "fps": metadata.get('fps', 0),
+                "keyframes": keyframe_summary,
             }
             
             return result
@@ -252,28 +278,44 @@ class VideoProcessor:
             raise
     
     async def extract_segments(self, file_path: str, segments: List[Dict]) -> List[str]:
-        """Extract video segments for analysis"""
+        """Extract video segments for analysis
+        
+        Segments are stream-copied with one ffmpeg process per group of up
+        to ``RENDER_BATCH_MAX_OUTPUTS`` segments. Each segment is its own
+        input, seeked on the input side to its keyframe: copy mode cannot
+        seek on the output side, which would drop the leading keyframe of
+        streams with B-frames.
+        """
         if not self.ffmpeg_path:
             raise Exception("FFmpeg not available for segment extraction")
         
-        segment_files = []
+        keyframes = get_keyframe_index(file_path)
+        spans = []
+        for segment in segments:
+            start_time = segment['start']
+            # Stream copy can only start on a keyframe
+            if keyframes:
+                start_time = keyframes.keyframe_before(start_time)
+            spans.append((start_time, segment['end']))
+        output_files = [
+            self.temp_dir / f"segment_{i}_{start_time}_{end_time - start_time}.mp4"
+            for i, (start_time, end_time) in enumerate(spans)
+        ]
         
         try:
-            for i, segment in enumerate(segments):
-                start_time = segment['start']
-                duration = segment['end'] - segment['start']
-                
-                output_file = self.temp_dir / f"segment_{i}_{start_time}_{duration}.mp4"
-                
-                cmd = [
-                    self.ffmpeg_path,
-                    '-i', file_path,
-                    '-ss', str(start_time),
-                    '-t', str(duration),
-                    '-c', 'copy',
-                    '-avoid_negative_ts', 'make_zero',
-                    str(output_file)
-                ]
+            groups = group_clips(spans, int(os.getenv('RENDER_BATCH_MAX_OUTPUTS', 8)), float('inf'))
+            for group in groups:
+                cmd = [self.ffmpeg_path]
+                for i in group:
+                    start_time, end_time = spans[i]
+                    cmd.extend(['-ss', str(start_time), '-t', str(end_time - start_time), '-i', file_path])
+                for input_index, i in enumerate(group):
+                    cmd.extend([
+                        '-map', f'{input_index}:v:0', '-map', f'{input_index}:a:0?',
+                        '-c', 'copy',
+                        '-avoid_negative_ts', 'make_zero',
+                        '-y', str(output_files[i])
+                    ])
                 
                 process = await asyncio.create_subprocess_exec(
                     *cmd,
@@ -283,86 +325,171 @@ class VideoProcessor:
                 
                 stdout, stderr = await process.communicate()
                 
-                if process.returncode == 0 and output_file.exists():
-                    segment_files.append(str(output_file))
-                else:
-                    logger.error(f"Failed to extract segment {i}: {stderr.decode()}")
+                if process.returncode != 0:
+                    logger.error(f"Failed to extract segments {group}: {stderr.decode()}")
             
-            return segment_files
+            return [str(output_file) for output_file in output_files if output_file.exists()]
             
         except Exception as e:
             logger.error(f"Error extracting segments: {e}")
             # Clean up any partial files
-            for file_path in segment_files:
+            for output_file in output_files:
                 try:
-                    os.remove(file_path)
+                    os.remove(output_file)
                 except:
                     pass
             raise
     
-    async def export_clips(self, video_path: str, clips: List[Dict[str, Any]], export_settings: Dict[str, Any]) -> Dict[str, Any]:
-        """Export clips from a video based on timestamps"""
+    async def export_clips(self, video_path: str, clips: List[Dict[str, Any]], export_settings: Dict[str, Any],
+                           progress_callback: Optional[Callable[[int, Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """Export clips from a video based on timestamps.
+        
+        Each clip is cut with input-side seeking (``-ss`` before ``-i``), so
+        ffmpeg jumps to the nearest keyframe instead of decoding from the
+        start of the file, and clips are encoded concurrently on a pool
+        sized to the available cores (``EXPORT_WORKERS``), each ffmpeg
+        getting an equal share of the encoder threads. Per-clip progress is
+        parsed from ffmpeg's ``-progress`` output and passed to
+        ``progress_callback(clip_index, progress)`` as it arrives.
+        """
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found: {video_path}")
+        if not self.ffmpeg_path:
+            raise Exception("FFmpeg not available for clip export")
         
         # Create output directory
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_dir = os.path.join(self.outputs_dir, f"export_{timestamp}")
         os.makedirs(output_dir, exist_ok=True)
         
+        output_format = export_settings.get("format", "mp4")
+        cores = os.cpu_count() or 1
+        workers = max(1, min(len(clips), int(os.getenv('EXPORT_WORKERS', cores))))
+        threads = max(1, cores // workers)
+        pool = asyncio.Semaphore(workers)
+        
+        async def export_one(index: int, clip: Dict[str, Any]) -> Dict[str, Any]:
+            start_time = float(clip.get("start_time", 0))
+            end_time = float(clip.get("end_time", 0))
+            title = clip.get("title", f"Clip {index}")
+            output_filename = f"clip_{index}_{self._sanitize_filename(title).replace(' ', '_')}.{output_format}"
+            result = {
+                "index": index,
+                "title": title,
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": end_time - start_time,
+                "output_path": os.path.join(output_dir, output_filename),
+                "filename": output_filename
+            }
+            if end_time <= start_time:
+                return {**result, "status": "failed", "error": "Clip ends before it starts"}
+            
+            async with pool:
+                cmd = self._build_export_command(
+                    video_path, start_time, end_time - start_time, result["output_path"],
+                    {**export_settings, "threads": threads}
+                )
+                started = datetime.now()
+                try:
+                    await self._run_export(cmd, index, end_time - start_time, progress_callback)
+                except Exception as e:
+                    logger.error(f"Export of clip {index} failed: {e}")
+                    return {**result, "status": "failed", "error": str(e)}
+            
+            return {
+                **result,
+                "status": "completed",
+                "file_size": os.path.getsize(result["output_path"]),
+                "elapsed": (datetime.now() - started).total_seconds()
+            }
+        
+        exported = await asyncio.gather(*[export_one(i + 1, clip) for i, clip in enumerate(clips)])
+        
         results = {
             "output_dir": output_dir,
-            "clips": [],
-            "format": export_settings.get("format", "mp4"),
-            "total_clips": len(clips)
+            "clips": list(exported),
+            "format": output_format,
+            "total_clips": len(clips),
+            "exported": sum(1 for clip in exported if clip["status"] == "completed"),
+            "failed": sum(1 for clip in exported if clip["status"] == "failed"),
+            "workers": workers
         }
         
-        # Mock export for now - in production, use ffmpeg to cut clips
-        for i, clip in enumerate(clips):
-            # Simulate processing
-            await asyncio.sleep(1)
-            
-            output_filename = f"clip_{i+1}_{clip.get('title', '').replace(' ', '_')}.{export_settings.get('format', 'mp4')}"
-            output_path = os.path.join(output_dir, output_filename)
-            
-            # In production, you would run ffmpeg here to extract the clip
-            # For mock purposes, we'll just create an empty file
-            with open(output_path, 'w') as f:
-                f.write("")
-            
-            results["clips"].append({
-                "index": i + 1,
-                "title": clip.get("title", f"Clip {i+1}"),
-                "start_time": clip.get("start_time", 0),
-                "end_time": clip.get("end_time", 0),
-                "duration": clip.get("end_time", 0) - clip.get("start_time", 0),
-                "output_path": output_path,
-                "filename": output_filename
-            })
-        
-        logger.info(f"Exported {len(clips)} clips to {output_dir}")
+        logger.info(f"Exported {results['exported']}/{len(clips)} clips to {output_dir} on {workers} workers")
         return results
     
-    def _build_export_command(self, source_file: str, clip: Clip, 
+    async def _run_export(self, cmd: List[str], index: int, duration: float,
+                          progress_callback: Optional[Callable[[int, Dict[str, Any]], Any]]):
+        """Run one ffmpeg export, forwarding its ``-progress`` reports"""
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        async def read_progress():
+            # -progress writes key=value lines, one block per update ending in progress=...
+            report: Dict[str, str] = {}
+            async for raw_line in process.stdout:
+                key, _, value = raw_line.decode(errors='replace').strip().partition('=')
+                if not key:
+                    continue
+                report[key] = value
+                if key != 'progress':
+                    continue
+                try:
+                    out_seconds = int(report.get('out_time_us') or report.get('out_time_ms') or 0) / 1e6
+                except ValueError:
+                    out_seconds = 0.0
+                progress = {
+                    "progress": 1.0 if value == 'end' else min(max(out_seconds / duration, 0.0), 1.0),
+                    "out_time": out_seconds,
+                    "speed": report.get('speed', '').strip(),
+                    "fps": report.get('fps'),
+                    "done": value == 'end'
+                }
+                if progress_callback:
+                    outcome = progress_callback(index, progress)
+                    if asyncio.iscoroutine(outcome):
+                        await outcome
+                report = {}
+        
+        try:
+            _, stderr = await asyncio.gather(read_progress(), process.stderr.read())
+            await process.wait()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        
+        if process.returncode != 0:
+            raise Exception(stderr.decode(errors='replace').strip() or f"ffmpeg exited with {process.returncode}")
+    
+    def _build_export_command(self, source_file: str, start_time: float, duration: float,
                              output_file: str, settings: Dict[str, Any]) -> List[str]:
         """Build FFmpeg command for clip export"""
-        cmd = [self.ffmpeg_path]
+        cmd = [self.ffmpeg_path, '-hide_banner', '-nostats', '-loglevel', 'error']
         
-        # Input file
+        # Time range: seeking on the input jumps to the preceding keyframe
+        # instead of decoding everything before the clip
+        cmd.extend(['-ss', f"{start_time:.3f}"])
         cmd.extend(['-i', source_file])
-        
-        # Time range
-        cmd.extend(['-ss', str(clip.start_time)])
-        cmd.extend(['-t', str(clip.end_time - clip.start_time)])
+        cmd.extend(['-t', f"{duration:.3f}"])
         
         # Video settings
         quality = settings.get('quality', 'high')
         if quality == 'high':
-            cmd.extend(['-crf', '18'])
+            crf = '18'
         elif quality == 'medium':
-            cmd.extend(['-crf', '23'])
+            crf = '23'
         else:  # low
-            cmd.extend(['-crf', '28'])
+            crf = '28'
+        
+        if settings.get('format', 'mp4') == 'webm':
+            cmd.extend(['-c:v', 'libvpx-vp9', '-crf', crf, '-b:v', '0', '-row-mt', '1'])
+        else:
+            cmd.extend(['-c:v', 'libx264', '-preset', settings.get('preset', 'veryfast'), '-crf', crf])
         
         # Resolution
         if 'resolution' in settings and settings['resolution']:
@@ -373,10 +500,20 @@ class VideoProcessor:
             cmd.extend(['-r', str(settings['fps'])])
         
         # Audio settings
-        cmd.extend(['-c:a', 'aac', '-b:a', '128k'])
+        if settings.get('format', 'mp4') == 'webm':
+            cmd.extend(['-c:a', 'libopus', '-b:a', '128k'])
+        else:
+            cmd.extend(['-c:a', 'aac', '-b:a', '128k'])
+        
+        # Encoder threads (a share of the cores when clips run in parallel)
+        if settings.get('threads'):
+            cmd.extend(['-threads', str(settings['threads'])])
         
         # Output settings
         cmd.extend(['-avoid_negative_ts', 'make_zero'])
+        if settings.get('format', 'mp4') in ('mp4', 'mov'):
+            cmd.extend(['-movflags', '+faststart'])
+        cmd.extend(['-progress', 'pipe:1'])
         cmd.extend(['-y'])  # Overwrite output file
         
         # Output file
@@ -402,10 +539,11 @@ class VideoProcessor:
         try:
             thumbnail_file = self.temp_dir / f"thumb_{timestamp}_{os.path.basename(file_path)}.jpg"
             
+            # Input-side seek: jump to the preceding keyframe and decode forward
             cmd = [
                 self.ffmpeg_path,
-                '-i', file_path,
                 '-ss', str(timestamp),
+                '-i', file_path,
                 '-vframes', '1',
                 '-q:v', '2',
                 str(thumbnail_file)
@@ -451,63 +589,153 @@ class VideoProcessor:
         """Check if file format is supported"""
         return Path(file_path).suffix.lower() in self.supported_formats
     
-    async def extract_frames(self, video_path: str, num_frames: int = 10) -> List[Dict[str, Any]]:
+    async def extract_frames(self, video_path: str, num_frames: int = 10) -> FrameBatch:
         """Extract frames from video for AI analysis"""
         try:
             if not os.path.exists(video_path):
                 raise FileNotFoundError(f"Video file not found: {video_path}")
             
-            # Use OpenCV to extract frames
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise Exception(f"Could not open video file: {video_path}")
-            
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            duration = total_frames / fps if fps > 0 else 0
-            
-            # Calculate frame intervals
-            if total_frames <= num_frames:
-                frame_indices = list(range(total_frames))
-            else:
-                frame_indices = [int(i * total_frames / num_frames) for i in range(num_frames)]
+            # Decode the low-resolution proxy once it exists
+            source = analysis_source(video_path)
             
-            frames = []
-            for i, frame_idx in enumerate(frame_indices):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
-                
-                if ret:
-                    # Convert BGR to RGB
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    
-                    # Resize for analysis (maintain aspect ratio)
-                    height, width = frame_rgb.shape[:2]
-                    max_size = 512
-                    if max(height, width) > max_size:
-                        scale = max_size / max(height, width)
-                        new_width = int(width * scale)
-                        new_height = int(height * scale)
-                        frame_rgb = cv2.resize(frame_rgb, (new_width, new_height))
-                    
-                    # Convert to PIL Image
-                    pil_image = Image.fromarray(frame_rgb)
-                    
-                    frames.append({
-                        'index': i,
-                        'frame_number': frame_idx,
-                        'timestamp': frame_idx / fps if fps > 0 else 0,
-                        'image': pil_image,
-                        'width': frame_rgb.shape[1],
-                        'height': frame_rgb.shape[0]
-                    })
-            
-            cap.release()
-            return frames
+            # Decoding runs in the shared media process pool
+            return await media_executor.run_cpu(self._sample_frames, source, num_frames)
             
         except Exception as e:
             logger.error(f"Error extracting frames from {video_path}: {e}")
-            return []
+            return FrameBatch.empty()
+    
+    def _read_frame_count(self, video_path: str) -> Tuple[int, float]:
+        """Frame count and rate of a video, read with OpenCV"""
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise Exception(f"Could not open video file: {video_path}")
+        
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+        return total_frames, fps
+    
+    def _sample_frames(self, video_path: str, num_frames: int) -> FrameBatch:
+        """Blocking part of ``extract_frames``: decode ``num_frames`` evenly spaced frames"""
+        total_frames, fps = self._read_frame_count(video_path)
+        frame_indices = self._sample_frame_indices(total_frames, num_frames)
+        decoded = self._decode_frames(video_path, frame_indices, fps, cache=True)
+        return self._build_frame_batch(frame_indices, decoded, fps)
+    
+    def _sample_frame_indices(self, total_frames: int, num_frames: int) -> List[int]:
+        """Evenly spaced frame indices used for analysis sampling"""
+        if total_frames <= num_frames:
+            return list(range(total_frames))
+        return [int(i * total_frames / num_frames) for i in range(num_frames)]
+    
+    def _decode_frames(self, video_path: str, frame_indices: List[int], fps: float,
+                       max_size: int = 512, cache: bool = False) -> Dict[int, np.ndarray]:
+        """Decode the given frames in a single forward pass over the video.
+        
+        Returns RGB frames downscaled to ``max_size`` keyed by frame index.
+        With ``cache``, frames are read from and written to the shared frame
+        cache and only cache misses are decoded; the source digest is
+        resolved here, in the worker, since hashing a new file reads all of
+        it. Misses go through one ffmpeg rawvideo pipe when ffmpeg is
+        available, and through OpenCV otherwise.
+        """
+        decoded = {}
+        digest = frame_cache.source_digest(video_path) if cache else None
+        
+        pending = []
+        for frame_idx in sorted(set(frame_indices)):
+            cached = frame_cache.get(digest, frame_idx / fps if fps > 0 else 0, max_size) if digest else None
+            if cached is not None:
+                decoded[frame_idx] = cached
+            else:
+                pending.append(frame_idx)
+        
+        if not pending:
+            return decoded
+        
+        keyframes = get_keyframe_index(video_path)
+        fresh = None
+        if self.frame_reader:
+            try:
+                batch, delivered = self.frame_reader.read_frames(
+                    video_path, pending, max_size=max_size, keyframes=keyframes
+                )
+                fresh = dict(zip(delivered, batch))
+            except Exception as e:
+                logger.warning(f"FFmpeg frame extraction failed, falling back to OpenCV: {e}")
+        if fresh is None:
+            fresh = self._decode_frames_opencv(video_path, pending, fps, max_size, keyframes=keyframes)
+        
+        for frame_idx, frame_rgb in fresh.items():
+            decoded[frame_idx] = frame_rgb
+            if digest:
+                frame_cache.put(digest, frame_idx / fps if fps > 0 else 0, max_size, frame_rgb)
+        
+        return decoded
+    
+    def _decode_frames_opencv(self, video_path: str, frame_indices: List[int], fps: float,
+                              max_size: int = 512,
+                              keyframes: Optional[KeyframeIndex] = None) -> Dict[int, np.ndarray]:
+        """OpenCV decoder for ``_decode_frames``.
+        
+        Indices are visited in ascending order. Short gaps are crossed with
+        grab() so the decoder keeps streaming; only long gaps pay for a seek.
+        With a keyframe index, a seek is only made when a keyframe lies
+        between the current position and the target, and it lands on that
+        keyframe before decoding forward.
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise Exception(f"Could not open video file: {video_path}")
+        
+        seek_threshold = max(int(fps * 2), 30)
+        decoded = {}
+        position = 0
+        
+        for frame_idx in sorted(frame_indices):
+            gap = frame_idx - position
+            if keyframes:
+                keyframe_idx = keyframes.keyframe_frame_before(frame_idx)
+                if gap < 0 or keyframe_idx > position:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe_idx)
+                    gap = frame_idx - keyframe_idx
+                for _ in range(gap):
+                    if not cap.grab():
+                        break
+            elif gap < 0 or gap > seek_threshold:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            else:
+                for _ in range(gap):
+                    if not cap.grab():
+                        break
+            
+            ret, frame = cap.read()
+            position = frame_idx + 1
+            if not ret:
+                continue
+            
+            # Convert BGR to RGB
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            
+            # Resize for analysis (maintain aspect ratio)
+            height, width = frame_rgb.shape[:2]
+            if max(height, width) > max_size:
+                scale = max_size / max(height, width)
+                new_width = int(width * scale)
+                new_height = int(height * scale)
+                frame_rgb = cv2.resize(frame_rgb, (new_width, new_height))
+            
+            decoded[frame_idx] = frame_rgb
+        
+        cap.release()
+        return decoded
+    
+    def _build_frame_batch(self, frame_indices: List[int], decoded: Dict[int, np.ndarray],
+                           fps: float) -> FrameBatch:
+        """Build the frame batch consumed by the analysis code"""
+        available = [frame_idx for frame_idx in frame_indices if decoded.get(frame_idx) is not None]
+        return FrameBatch.from_arrays([decoded[frame_idx] for frame_idx in available], available, fps)
     
     async def extract_audio_segment(self, video_path: str, start_time: float, duration: float) -> Optional[str]:
         """Extract audio segment from video for analysis"""
@@ -550,69 +778,68 @@ class VideoProcessor:
             logger.error(f"Error extracting audio segment: {e}")
             return None
     
-    async def detect_scene_changes(self, video_path: str, threshold: float = 0.3) -> List[Dict[str, Any]]:
-        """Detect scene changes in video using computer vision"""
+    async def detect_scene_changes(self, video_path: str, threshold: float = 0.12) -> List[Dict[str, Any]]:
+        """Detect hard cuts across the whole video with the streaming scene-cut detector"""
         try:
             if not os.path.exists(video_path):
                 raise FileNotFoundError(f"Video file not found: {video_path}")
             
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise Exception(f"Could not open video file: {video_path}")
-            
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            source = analysis_source(video_path)
             
-            scene_changes = []
-            prev_frame = None
-            frame_count = 0
-            
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Convert to grayscale for comparison
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                
-                if prev_frame is not None:
-                    # Calculate frame difference
-                    diff = cv2.absdiff(gray, prev_frame)
-                    mean_diff = np.mean(diff)
-                    
-                    # Normalize by frame size
-                    normalized_diff = mean_diff / (gray.shape[0] * gray.shape[1])
-                    
-                    # Detect scene change
-                    if normalized_diff > threshold:
-                        timestamp = frame_count / fps if fps > 0 else 0
-                        scene_changes.append({
-                            'frame_number': frame_count,
-                            'timestamp': timestamp,
-                            'confidence': min(normalized_diff / threshold, 1.0)
-                        })
-                
-                prev_frame = gray
-                frame_count += 1
-                
-                # Limit processing for performance
-                if frame_count > 10000:  # Process max 10k frames
-                    break
+            # Long videos are split at keyframes and scanned on all workers
+            keyframes = get_keyframe_index(source)
+            if (self.frame_reader and keyframes and media_executor.cpu.workers > 1
+                    and keyframes.duration >= 2 * SCENE_CHUNK_SECONDS):
+                try:
+                    return await self._detect_scene_changes_chunked(source, keyframes, threshold)
+                except Exception as e:
+                    logger.warning(f"Chunked scene detection failed, scanning in one pass: {e}")
             
-            cap.release()
-            return scene_changes
+            # Decoding runs in the shared media process pool
+            return await media_executor.run_cpu(self._detect_scene_changes_sync, source, threshold)
             
         except Exception as e:
             logger.error(f"Error detecting scene changes: {e}")
             return []
     
+    def _detect_scene_changes_sync(self, video_path: str, threshold: float) -> List[Dict[str, Any]]:
+        """Blocking part of ``detect_scene_changes``"""
+        return SceneCutDetector(self.frame_reader).detect(video_path, threshold)
+    
+    async def _detect_scene_changes_chunked(self, video_path: str, keyframes: KeyframeIndex,
+                                            threshold: float) -> List[Dict[str, Any]]:
+        """Scene detection over keyframe-aligned chunks in parallel"""
+        fps = (await media_executor.run_io(self.frame_reader.probe, video_path))['fps']
+        detector = SceneCutDetector(self.frame_reader)
+        
+        # A couple of chunks per worker evens out chunks that decode slower
+        chunks = min(media_executor.cpu.workers * 2, int(keyframes.duration // SCENE_CHUNK_SECONDS))
+        plan = plan_chunks(keyframes, chunks, detector.window_frames(fps) + 1)
+        
+        results = await asyncio.gather(*[
+            media_executor.run_cpu(self._detect_scene_chunk_sync, video_path, decode_from, keep_to, fps, threshold)
+            for decode_from, _, keep_to in plan
+        ])
+        logger.info(f"Scene detection ran in {len(plan)} chunks for {video_path}")
+        return merge_chunk_cuts(plan, results, detector.min_gap_frames(fps))
+    
+    def _detect_scene_chunk_sync(self, video_path: str, start_frame: int, end_frame: int,
+                                 fps: float, threshold: float) -> List[Dict[str, Any]]:
+        """Blocking scan of one chunk (the keyframe index is loaded in the worker)"""
+        keyframes = get_keyframe_index(video_path)
+        if keyframes is None:
+            raise Exception(f"Keyframe index missing for {video_path}")
+        return SceneCutDetector(self.frame_reader).detect_range(
+            video_path, keyframes, start_frame, end_frame, fps, threshold
+        )
+    
     async def analyze_video_quality(self, video_path: str) -> Dict[str, Any]:
         """Analyze video quality metrics"""
         try:
             if not os.path.exists(video_path):
                 raise FileNotFoundError(f"Video file not found: {video_path}")
             
-            # Get metadata
+            # Get metadata (of the original, not the analysis proxy)
             metadata = await self.extract_metadata(video_path)
             
             # Extract sample frames for quality analysis
@@ -626,29 +853,24 @@ class VideoProcessor:
                 'frame_quality': []
             }
             
-            # Analyze frame quality
-            for frame in frames:
-                if 'image' in frame:
-                    pil_image = frame['image']
-                    # Convert to numpy array for analysis
-                    img_array = np.array(pil_image)
-                    
-                    # Calculate sharpness (Laplacian variance)
-                    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-                    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
-                    
-                    # Calculate brightness
-                    brightness = np.mean(gray)
-                    
-                    # Calculate contrast
-                    contrast = np.std(gray)
-                    
-                    quality_metrics['frame_quality'].append({
-                        'timestamp': frame.get('timestamp', 0),
-                        'sharpness': sharpness,
-                        'brightness': brightness,
-                        'contrast': contrast
-                    })
+            # Analyze frame quality straight from the decoded pixels
+            for timestamp, _, pixels in frames:
+                # Calculate sharpness (Laplacian variance)
+                gray = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+                sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+                
+                # Calculate brightness
+                brightness = np.mean(gray)
+                
+                # Calculate contrast
+                contrast = np.std(gray)
+                
+                quality_metrics['frame_quality'].append({
+                    'timestamp': timestamp,
+                    'sharpness': sharpness,
+                    'brightness': brightness,
+                    'contrast': contrast
+                })
             
             # Calculate overall quality score
             scores = [
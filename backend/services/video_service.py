@@ -6,6 +6,10 @@ import asyncio
 from PIL import Image
 import ffmpeg
 
+from services.analysis_proxy import analysis_source
+from services.frame_cache import frame_cache
+from services.keyframe_index import get_keyframe_index
+
 class VideoService:
     def __init__(self):
         pass
@@ -31,6 +35,8 @@ class VideoService:
     async def extract_frames(self, file_path: Path, num_frames: int = 10) -> List[Dict[str, Any]]:
         """Extract frames from video for analysis"""
         try:
+            # Decode the low-resolution analysis proxy once it exists
+            file_path = Path(analysis_source(str(file_path)))
             cap = cv2.VideoCapture(str(file_path))
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             fps = cap.get(cv2.CAP_PROP_FPS)
@@ -42,35 +48,55 @@ class VideoService:
             else:
                 frame_indices = [int(i * total_frames / num_frames) for i in range(num_frames)]
             
+            digest = await asyncio.to_thread(frame_cache.source_digest, str(file_path))
+            max_size = 512
+            keyframes = get_keyframe_index(str(file_path))
+            position = 0
+            
             frames = []
             for i, frame_idx in enumerate(frame_indices):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
+                timestamp = frame_idx / fps if fps > 0 else 0
+                frame_rgb = frame_cache.get(digest, timestamp, max_size)
                 
-                if ret:
+                if frame_rgb is None:
+                    if keyframes:
+                        # Seek only when a keyframe lies ahead, then decode forward
+                        keyframe_idx = keyframes.keyframe_frame_before(frame_idx)
+                        if keyframe_idx > position or frame_idx < position:
+                            cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe_idx)
+                            position = keyframe_idx
+                        while position < frame_idx and cap.grab():
+                            position += 1
+                    else:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                    ret, frame = cap.read()
+                    position = frame_idx + 1
+                    if not ret:
+                        continue
+                    
                     # Convert BGR to RGB
                     frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                     
                     # Resize for analysis (maintain aspect ratio)
                     height, width = frame_rgb.shape[:2]
-                    max_size = 512
                     if max(height, width) > max_size:
                         scale = max_size / max(height, width)
                         new_width = int(width * scale)
                         new_height = int(height * scale)
                         frame_rgb = cv2.resize(frame_rgb, (new_width, new_height))
                     
-                    # Convert to base64
-                    pil_image = Image.fromarray(frame_rgb)
-                    
-                    frames.append({
-                        'index': i,
-                        'frame_number': frame_idx,
-                        'timestamp': frame_idx / fps if fps > 0 else 0,
-                        'image': pil_image,
-                        'width': frame_rgb.shape[1],
-                        'height': frame_rgb.shape[0]
-                    })
+                    frame_cache.put(digest, timestamp, max_size, frame_rgb)
+                
+                pil_image = Image.fromarray(frame_rgb)
+                
+                frames.append({
+                    'index': i,
+                    'frame_number': frame_idx,
+                    'timestamp': timestamp,
+                    'image': pil_image,
+                    'width': frame_rgb.shape[1],
+                    'height': frame_rgb.shape[0]
+                })
             
             cap.release()
             return frames
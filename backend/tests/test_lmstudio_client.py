@@ -0,0 +1,128 @@
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.lmstudio_client import LMStudioClient
+
+class StubLMStudio:
+    """Minimal LM Studio server: ``/v1/models`` and ``/v1/chat/completions`` with keep-alive"""
+
+    def __init__(self, models):
+        self.models = models
+        self.requests = []
+        self.connections = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+
+            def do_GET(self):
+                stub.requests.append(self.path)
+                if self.path == '/v1/models':
+                    self._reply({'data': [{'id': model, 'object': 'model'} for model in stub.models]})
+                else:
+                    self._reply({'error': 'not found'}, 404)
+
+            def do_POST(self):
+                stub.requests.append(self.path)
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                time.sleep(0.05)
+                self._reply({'choices': [{'message': {'content': f"echo {body['model']}"}}]})
+
+            def _reply(self, payload, status=200):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub():
+    server = StubLMStudio(['llava-v1.6-mistral-7b', 'qwen2.5-7b-instruct'])
+    yield server
+    server.close()
+
+def run(coro_fn):
+    """Run a test coroutine with a fresh client that is closed afterwards"""
+    async def main():
+        client = LMStudioClient(ttl=60, max_connections=4)
+        try:
+            return await coro_fn(client)
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+def test_registry_discovers_models_once(stub):
+    async def scenario(client):
+        assert await client.has_vision(stub.base_url)
+        models = await client.models(stub.base_url + '/')
+        return models
+
+    models = run(scenario)
+    assert [model['id'] for model in models] == ['llava-v1.6-mistral-7b', 'qwen2.5-7b-instruct']
+    assert [model['has_vision'] for model in models] == [True, False]
+    assert stub.requests.count('/v1/models') == 1
+
+def test_concurrent_first_use_shares_one_discovery(stub):
+    async def scenario(client):
+        await asyncio.gather(*(client.has_vision(stub.base_url) for _ in range(10)))
+
+    run(scenario)
+    assert stub.requests.count('/v1/models') == 1
+
+def test_stale_entry_is_served_while_refreshing(stub):
+    async def scenario(client):
+        await client.models(stub.base_url)
+        client.ttl = 0
+        stub.models = ['llava-next']
+        stale = await client.models(stub.base_url)
+        # The background refresh replaces the entry shortly after
+        await asyncio.sleep(0.2)
+        return stale, await client.models(stub.base_url)
+
+    stale, fresh = run(scenario)
+    assert len(stale) == 2
+    assert [model['id'] for model in fresh] == ['llava-next']
+
+def test_chat_reuses_pooled_connections(stub):
+    async def scenario(client):
+        payload = {'model': 'llava-v1.6-mistral-7b', 'messages': []}
+        responses = await asyncio.gather(*(client.chat(stub.base_url, payload) for _ in range(12)))
+        for _ in range(4):
+            responses.append(await client.chat(stub.base_url, payload))
+        return responses
+
+    responses = run(scenario)
+    assert all(response.status_code == 200 for response in responses)
+    assert stub.requests.count('/v1/chat/completions') == 16
+    # 16 requests over at most max_connections keep-alive connections
+    assert stub.connections <= 4
+
+def test_unreachable_server_reports_disconnected():
+    async def scenario(client):
+        return await client.status('http://127.0.0.1:9', refresh=True)
+
+    status = run(scenario)
+    assert status['connected'] is False
+    assert status['models'] == []
+    assert status['error']